@@ -5,51 +5,125 @@
 import numpy as np
 import random
 from config import *
+from game.observation import OBS_DTYPE, SPEED_INPUT, obstacle_features, shared_rows, fill_player_ys
 
 # Arquitectura MLP (Perceptrón Multicapa):
 # 6 Entradas -> 5 Neuronas Ocultas -> 2 Salidas (Salto y Agacharse)
 
+# Todo el ADN de un agente cabe en un solo vector plano de números:
+# W1 (5x6) + B1 (5) + W2 (2x5) + B2 (2) = 47 parámetros
+PARAM_SHAPES = ((HIDDEN_SIZE, INPUT_SIZE), (HIDDEN_SIZE,), (OUTPUT_SIZE, HIDDEN_SIZE), (OUTPUT_SIZE,))
+PARAM_SIZES = tuple(int(np.prod(shape)) for shape in PARAM_SHAPES)
+PARAM_COUNT = sum(PARAM_SIZES)
+# Dónde vive cada tensor dentro del vector plano
+_offsets = np.cumsum((0,) + PARAM_SIZES)
+PARAM_SLICES = tuple(slice(int(a), int(b)) for a, b in zip(_offsets[:-1], _offsets[1:]))
+W1_SLICE, B1_SLICE, W2_SLICE, B2_SLICE = PARAM_SLICES
+
+def pack_params(w1, b1, w2, b2):
+    """Aplana los cuatro tensores en un solo vector de PARAM_COUNT números."""
+    return np.concatenate([np.ravel(w1), np.ravel(b1), np.ravel(w2), np.ravel(b2)]).astype(float)
+
+def random_params(rng, n=None):
+    """
+    Parámetros al azar en [-1, 1]: un vector (o una matriz de n filas).
+    Para un solo genoma se tiran en el mismo orden que antes (W1, B1, W2, B2).
+    """
+    if n is None:
+        return rng.uniform(-1, 1, PARAM_COUNT)
+    return rng.uniform(-1, 1, (n, PARAM_COUNT))
+
 class Genome:
     """
     El Genoma es como el ADN de cada corredor. 
     Contiene los pesos y sesgos que definen cómo reacciona el cerebro.
+    Por dentro es un solo vector de 47 números (self.params); w1, b1, w2 y b2
+    son vistas a pedazos de ese vector. Si el genoma vive dentro de una Population,
+    self.params es directamente una fila de la matriz de la población.
     """
-    def __init__(self, w1=None, b1=None, w2=None, b2=None):
-        if w1 is None:
+    def __init__(self, w1=None, b1=None, w2=None, b2=None, rng=None, params=None):
+        if params is not None:
+            # Vista a una fila de la matriz de la población (no copiamos nada)
+            self.params = params
+        elif w1 is None:
             # Si no nos dan ADN, creamos uno al azar (primera generación)
-            # W1: Conecta la entrada con la capa oculta
-            self.w1 = np.random.uniform(-1, 1, (HIDDEN_SIZE, INPUT_SIZE))
-            # B1: Sesgos de la primera capa
-            self.b1 = np.random.uniform(-1, 1, (HIDDEN_SIZE,))
-            # W2: Conecta la capa oculta con la salida
-            self.w2 = np.random.uniform(-1, 1, (OUTPUT_SIZE, HIDDEN_SIZE))
-            # B2: Sesgos de la salida
-            self.b2 = np.random.uniform(-1, 1, (OUTPUT_SIZE,))
+            # rng: generador de NumPy del GA (si no hay, usamos el global)
+            self.params = random_params(rng if rng is not None else np.random)
         else:
-            # Si ya tenemos ADN (por herencia o cruce), lo usamos
-            self.w1 = w1
-            self.b1 = b1
-            self.w2 = w2
-            self.b2 = b2
+            # Si ya tenemos ADN (por herencia, cruce o un archivo), lo aplanamos
+            self.params = pack_params(w1, b1, w2, b2)
+
+    # W1: Conecta la entrada con la capa oculta
+    @property
+    def w1(self):
+        return self.params[W1_SLICE].reshape(PARAM_SHAPES[0])
+
+    # B1: Sesgos de la primera capa
+    @property
+    def b1(self):
+        return self.params[B1_SLICE]
+
+    # W2: Conecta la capa oculta con la salida
+    @property
+    def w2(self):
+        return self.params[W2_SLICE].reshape(PARAM_SHAPES[2])
+
+    # B2: Sesgos de la salida
+    @property
+    def b2(self):
+        return self.params[B2_SLICE]
+
+    def __getstate__(self):
+        # Al copiar o mandar a otro proceso, solo viaja el vector (ya no es vista de nadie)
+        return {"params": np.array(self.params)}
+
+    def __setstate__(self, state):
+        self.params = state["params"]
 
-    def mutate(self, rate):
+    def mutate(self, rate, rng=None):
         """
         La mutación es lo que permite a la IA probar cosas nuevas.
         Es como un error en la copia del ADN que a veces ayuda.
         """
         def apply_mutation(param):
-            if random.random() < rate:
+            roll = rng.random() if rng is not None else random.random()
+            if roll < rate:
                 # Metemos un poco de ruido gaussiano para cambiar los valores
-                noise = np.random.normal(0, MUTATION_STD, param.shape)
+                noise = (rng if rng is not None else np.random).normal(0, MUTATION_STD, param.shape)
                 param += noise
                 # Evitamos que los números se vuelvan locos (los limitamos)
                 np.clip(param, -W_MAX, W_MAX, out=param)
         
+        # Las vistas escriben directo en self.params
         apply_mutation(self.w1)
         apply_mutation(self.b1)
         apply_mutation(self.w2)
         apply_mutation(self.b2)
 
+class Population:
+    """
+    Toda la población como UNA matriz (N, PARAM_COUNT): una fila por agente.
+    Se usa como una lista de Genome, pero cada Genome que entrega es una vista
+    a su fila, así que el GA puede trabajar con la matriz entera de golpe.
+    """
+    def __init__(self, weights):
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.weights)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return Population(self.weights[i])
+        return Genome(params=self.weights[i])
+
+    def __setitem__(self, i, genome):
+        self.weights[i] = genome.params
+
+    def __iter__(self):
+        for row in self.weights:
+            yield Genome(params=row)
+
 class NeuralNetwork:
     """
     Esta es la red que procesa la información en tiempo real durante el juego.
@@ -84,3 +158,87 @@ class NeuralNetwork:
         
         # El resultado es un vector [probabilidad_saltar, probabilidad_agacharse]
         return output
+
+class PopulationBrain:
+    """
+    El cerebro de TODA la población a la vez.
+    En lugar de llamar a activate() una vez por corredor (dos np.dot chiquitos por agente),
+    apilamos los pesos de todos los genomas en tensores y hacemos una sola
+    multiplicación de matrices por frame para todos los agentes vivos.
+    """
+    def __init__(self, genomes):
+        # genomes puede ser una Population, una lista de Genome o directamente la matriz (N, PARAM_COUNT)
+        if isinstance(genomes, Population):
+            params = genomes.weights
+        elif isinstance(genomes, np.ndarray):
+            params = genomes
+        else:
+            params = [g.params for g in genomes]
+        # Copia propia: el GA puede reemplazar la población mientras esta generación corre
+        params = np.array(params, dtype=float).reshape(-1, PARAM_COUNT)
+        n = len(params)
+        # W1: (N, HIDDEN, INPUT) | B1: (N, HIDDEN) | W2: (N, OUTPUT, HIDDEN) | B2: (N, OUTPUT)
+        self.w1 = params[:, W1_SLICE].reshape(n, *PARAM_SHAPES[0])
+        self.b1 = params[:, B1_SLICE]
+        self.w2 = params[:, W2_SLICE].reshape(n, *PARAM_SHAPES[2])
+        self.b2 = params[:, B2_SLICE]
+        self.size = n
+
+    def __len__(self):
+        return self.size
+
+    def activate(self, inputs, indices=None):
+        """
+        Pasada hacia adelante de todos los agentes juntos.
+        inputs: matriz (K, INPUT_SIZE), una fila por agente.
+        indices: a qué agentes de la población corresponde cada fila (None = todos).
+        Devuelve una matriz (K, OUTPUT_SIZE) con [probabilidad_saltar, probabilidad_agacharse].
+        """
+        if indices is None:
+            w1, b1, w2, b2 = self.w1, self.b1, self.w2, self.b2
+        else:
+            w1, b1, w2, b2 = self.w1[indices], self.b1[indices], self.w2[indices], self.b2[indices]
+
+        # Capa 1: (K, H, I) @ (K, I, 1) -> (K, H)
+        z1 = np.matmul(w1, inputs[:, :, None])[:, :, 0] + b1
+        h = np.maximum(0, z1)
+
+        # Capa 2: (K, O, H) @ (K, H, 1) -> (K, O)
+        z2 = np.matmul(w2, h[:, :, None])[:, :, 0] + b2
+        return 1 / (1 + np.exp(-z2))
+
+    def decide(self, inputs, indices=None):
+        """
+        Igual que activate(), pero ya nos da las decisiones como máscaras booleanas:
+        (saltar, agacharse), cada una de tamaño K.
+        """
+        output = self.activate(inputs, indices)
+        return output[:, 0] > JUMP_THRESHOLD, output[:, 1] > CROUCH_THRESHOLD
+
+
+# obstacle_features y la normalización viven en game/observation.py (las usa también Engine)
+
+def build_inputs(state, player_ys):
+    """
+    Arma la matriz de entradas (K, INPUT_SIZE) para K agentes vivos.
+    Todos ven el mismo obstáculo y la misma velocidad; lo único que cambia
+    entre agentes es su altura (PlayerY, índice 4).
+    Con un Engine a mano es mejor engine.get_observations() (reusa su buffer).
+    """
+    return build_inputs_batch([obstacle_features(state["next_obstacle"])], [state["speed"]], player_ys)
+
+def build_inputs_batch(features, speeds, player_ys):
+    """
+    Entradas de K agentes durante T frames de una sola vez.
+    features: T tuplas de obstacle_features | speeds: T velocidades | player_ys: K alturas.
+    Devuelve una matriz (T * K, INPUT_SIZE): primero las K filas del frame 0, luego las del 1, etc.
+    """
+    # Mismos números que Engine.get_observations (float32, todo entre 0 y 1)
+    rows = shared_rows(features, speeds) # DistX, ObsY, ObsW, ObsH, Speed
+    player_ys = np.asarray(player_ys, dtype=float)
+    frames, agents = len(rows), len(player_ys)
+
+    inputs = np.empty((frames, agents, INPUT_SIZE), dtype=OBS_DTYPE)
+    inputs[:] = rows[:, None, :]
+    fill_player_ys(inputs, player_ys) # PlayerY
+    return inputs.reshape(frames * agents, INPUT_SIZE)
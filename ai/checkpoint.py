@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# checkpoint.py - Puntos de guardado de TODO el entrenamiento (no solo del campeón)
+# Antes solo se podía guardar al mejor genoma: si se caía el proceso o se reiniciaba la sesión
+# de Streamlit, perdíamos la población, el historial, el contador de estancamiento y el azar.
+# Un checkpoint guarda el estado completo del GeneticAlgorithm (GeneticAlgorithm.state_dict):
+#   - checkpoint_gen<N>.npz: la población como una sola matriz (N, 47) y el campeón,
+#     más el resto del estado (historial, estrategia, estado del generador de azar) como JSON.
+#   - manifest.jsonl: un renglón por checkpoint, solo se le agregan renglones al final.
+# Cada .npz se escribe en un archivo temporal y se renombra al final (os.replace), así que
+# un corte a medias nunca deja un checkpoint roto; un renglón cortado del manifiesto se ignora.
+
+import json
+import os
+import time
+import numpy as np
+from .genetic_algo import GeneticAlgorithm, GENOMES_DIR
+
+CHECKPOINTS_DIR = os.path.join(GENOMES_DIR, "checkpoints")
+CHECKPOINT_MANIFEST = "manifest.jsonl"
+CHECKPOINT_VERSION = 1
+KEEP_CHECKPOINTS = 5 # Cuántos checkpoints dejamos en disco (los más viejos se borran)
+
+class CheckpointManager:
+    """
+    Guarda y recupera checkpoints de un GeneticAlgorithm en una carpeta.
+    extra: un diccionario (JSON) para lo que quiera guardar quien entrena
+    (ej: HeadlessTrainer guarda su historial completo).
+    """
+    def __init__(self, directory=CHECKPOINTS_DIR, keep=KEEP_CHECKPOINTS):
+        self.directory = directory
+        self.keep = keep # 0 o None = no borrar nunca
+        self.manifest_path = os.path.join(directory, CHECKPOINT_MANIFEST)
+
+    def save(self, ga, extra=None):
+        """Escribe un checkpoint del estado actual del GA. Devuelve su ruta."""
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        state = ga.state_dict()
+        arrays = state.pop("arrays")
+        meta = {"version": CHECKPOINT_VERSION, "ga": state, "extra": extra or {}}
+
+        filename = f"checkpoint_gen{ga.generation:06d}.npz"
+        path = os.path.join(self.directory, filename)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        entry = {
+            "file": filename,
+            "generation": ga.generation,
+            "global_best_fitness": ga.global_best_fitness,
+            "population": len(ga.population),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with open(self.manifest_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._prune()
+        return path
+
+    def entries(self):
+        """Los renglones del manifiesto cuyo archivo todavía existe, del más viejo al más nuevo."""
+        if not os.path.exists(self.manifest_path):
+            return []
+        entries = {} # archivo -> renglón (si se guardó dos veces la misma generación, vale el último)
+        with open(self.manifest_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue # Renglón cortado (se cayó justo al escribirlo)
+                entries.pop(entry["file"], None)
+                entries[entry["file"]] = entry
+        return [entry for entry in entries.values() if os.path.exists(os.path.join(self.directory, entry["file"]))]
+
+    def latest(self):
+        """Ruta del checkpoint más nuevo, o None si no hay."""
+        entries = self.entries()
+        return os.path.join(self.directory, entries[-1]["file"]) if entries else None
+
+    def load(self, path=None, ga=None):
+        """
+        Recupera un checkpoint (el más nuevo si path = None) en ga (o en un GA nuevo).
+        Devuelve (ga, extra), o (None, None) si no hay checkpoints.
+        """
+        path = path or self.latest()
+        if path is None:
+            return None, None
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta["version"] > CHECKPOINT_VERSION:
+                raise ValueError(f"{path} es de una versión más nueva del juego")
+            state = dict(meta["ga"])
+            state["arrays"] = {name: data[name] for name in data.files if name != "meta"}
+        if ga is None:
+            ga = GeneticAlgorithm()
+        ga.load_state_dict(state)
+        return ga, meta["extra"]
+
+    def _prune(self):
+        if not self.keep:
+            return
+        for entry in self.entries()[:-self.keep]:
+            try:
+                os.remove(os.path.join(self.directory, entry["file"]))
+            except OSError:
+                pass
@@ -2,30 +2,28 @@
 # genetic_algo.py - El algoritmo de Selección Natural
 # Aquí es donde ocurre la magia de la evolución: los mejores sobreviven y tienen hijos.
 
-import random
-import copy
 import numpy as np
-import pickle
 import os
-import glob
-from .brain import Genome
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from .brain import Genome, Population, PARAM_COUNT, PARAM_SLICES, random_params
+from .genome_store import GENOMES_DIR, BEST_GENOME_FILE, get_store, read_pickle
 from config import *
 
-# Carpeta donde guardamos a los campeones
-GENOMES_DIR = "saved_genomes"
-# Archivo legacy (para compatibilidad con guardados anteriores)
-BEST_GENOME_FILE = "best_genome.pkl"
-
 class GeneticAlgorithm:
-    def __init__(self):
+    def __init__(self, seed=None):
+        # El GA tiene su propio generador de azar: misma semilla = misma evolución
+        self.rng = np.random.default_rng(seed)
+
         # Cargamos la configuración que definimos en config.py
         self.population_size = POPULATION_SIZE
         self.mutation_rate = MUTATION_RATE
         self.selection_ratio = SELECTION_RATIO
         self.elitism_count = ELITISM_COUNT
         
-        # Creamos la primera generación con ADN aleatorio
-        self.population = [Genome() for _ in range(self.population_size)]
+        # Creamos la primera generación con ADN aleatorio.
+        # Toda la población es una sola matriz (N, 47); self.population la ve como lista de Genome
+        self.population = Population(random_params(self.rng, self.population_size))
         self.generation = 1
         self.best_fitness = 0
         self.avg_fitness = 0
@@ -37,17 +35,69 @@ class GeneticAlgorithm:
         self.strategy = "HOF" # Por defecto: Guardar al mejor de siempre (Hall of Fame)
         self.stagnation_counter = 0
 
+        # Evaluación en paralelo: cuántos procesos usamos para simular la población
+        self.workers = 1
+        self._executor = None
+
+    def evaluate(self, seed=None, vectorized=True, course=None, **limits):
+        """
+        Simula a toda la población (sin dibujar) y devuelve (fitnesses, frames).
+        Si self.workers > 1, partimos la población en pedazos (shards) y cada uno
+        corre en su propio proceso con su propio Engine. Todos reciben la misma pista
+        pregrabada, así que todos los agentes enfrentan los mismos obstáculos.
+        limits (max_frames, fitness_cap, fast_forward) se pasan tal cual a run_generation.
+        """
+        # Imports locales para evitar un import circular (trainer importa este módulo)
+        from .trainer import evaluate_shard
+        from game.course import generate_course
+
+        if course is None:
+            course = generate_course(self.course_seed() if seed is None else seed)
+
+        n = len(self.population)
+        num_shards = max(1, min(self.workers, n))
+        shards = [idx for idx in np.array_split(np.arange(n), num_shards) if len(idx) > 0]
+        # A cada proceso le mandamos sus filas de la matriz de pesos
+        tasks = [(self.population.weights[idx], course, vectorized, limits) for idx in shards]
+
+        if len(tasks) == 1:
+            results = [evaluate_shard(tasks[0])]
+        else:
+            # Mantenemos el pool vivo entre generaciones para no pagar el arranque cada vez
+            if self._executor is None or self._executor_workers != self.workers:
+                self.close()
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._executor_workers = self.workers
+            results = list(self._executor.map(evaluate_shard, tasks))
+
+        # Juntamos los fitness en el mismo orden que la población
+        fitnesses = []
+        for shard_fitnesses, _ in results:
+            fitnesses.extend(shard_fitnesses)
+        frames = max(shard_frames for _, shard_frames in results)
+        return fitnesses, frames
+
+    def course_seed(self):
+        """Nueva semilla para la pista de la siguiente evaluación (sale del azar del GA)."""
+        return int(self.rng.integers(2 ** 31))
+
+    def close(self):
+        """Apaga el pool de procesos (si lo había)."""
+        if getattr(self, "_executor", None) is not None:
+            self._executor.shutdown()
+            self._executor = None
+
     def next_generation(self, fitnesses):
         """
         Esta función crea la siguiente generación basándose en qué tan bien le fue a cada uno.
         """
-        # Juntamos a cada dino con su puntuación (fitness)
-        results = list(zip(self.population, fitnesses))
-        # Los ordenamos de mejor a peor
-        results.sort(key=lambda x: x[1], reverse=True)
+        # Todo se hace sobre la matriz de pesos (N, 47), sin recorrer genomas uno por uno
+        weights = self.population.weights
+        fitnesses = np.asarray(fitnesses, dtype=float)
+        # Los ordenamos de mejor a peor (estable: en empate gana el que iba primero)
+        order = np.argsort(-fitnesses, kind="stable")
         
-        current_best_fitness = results[0][1]
-        current_best_genome = results[0][0]
+        current_best_fitness = float(fitnesses[order[0]])
         
         # Revisamos si hemos mejorado el récord histórico
         if current_best_fitness <= self.global_best_fitness:
@@ -55,10 +105,10 @@ class GeneticAlgorithm:
         else:
             self.stagnation_counter = 0
             self.global_best_fitness = current_best_fitness
-            self.global_best_genome = copy.deepcopy(current_best_genome)
+            self.global_best_genome = Genome(params=weights[order[0]].copy())
             
         self.best_fitness = current_best_fitness
-        self.avg_fitness = sum(fitnesses) / len(fitnesses)
+        self.avg_fitness = float(fitnesses.mean())
         # Guardamos el progreso para la gráfica
         self.history.append({"gen": self.generation, "best": self.best_fitness, "avg": self.avg_fitness})
         
@@ -69,8 +119,6 @@ class GeneticAlgorithm:
             self.history = self.history[-MAX_HISTORY:]
 
         
-        new_population = []
-        
         # Si elegimos modo DYNAMIC y la IA no mejora, subimos la mutación para que "arriesgue" más
         eff_mutation = self.mutation_rate
         if self.strategy == "DYNAMIC" and self.stagnation_counter > 10:
@@ -81,45 +129,38 @@ class GeneticAlgorithm:
         # - HOF: Siempre pasa el mejor de TODOS los tiempos
         # - GEN: Solo usa los mejores de ESTA generación (más diversidad)
         # - DYNAMIC: Como HOF pero con mutación adaptativa
-        
-        if self.strategy == "HOF":
-             if self.global_best_genome:
-                 new_population.append(copy.deepcopy(self.global_best_genome))
-        elif self.strategy == "GEN":
-             # No agregamos el mejor histórico, solo usamos los de esta ronda
-             # Esto permite más exploración y diversidad genética
-             pass
-        elif self.strategy == "DYNAMIC" and self.stagnation_counter < 15:
-             if self.global_best_genome:
-                 new_population.append(copy.deepcopy(self.global_best_genome))
+        keep_champion = self.global_best_genome is not None and (
+            self.strategy == "HOF" or (self.strategy == "DYNAMIC" and self.stagnation_counter < 15))
+        num_champion = 1 if keep_champion else 0
             
         # 2. Llenamos los espacios de "élite" con los mejores de esta ronda
-        current_elite_idx = 0
-        while len(new_population) < self.elitism_count and current_elite_idx < len(results):
-            new_population.append(copy.deepcopy(results[current_elite_idx][0]))
-            current_elite_idx += 1
+        num_elite = max(0, min(self.elitism_count - num_champion, len(order)))
+        num_children = max(0, self.population_size - num_champion - num_elite)
+
+        new_weights = np.empty((num_champion + num_elite + num_children, PARAM_COUNT))
+        if keep_champion:
+            new_weights[0] = self.global_best_genome.params
+        new_weights[num_champion:num_champion + num_elite] = weights[order[:num_elite]]
             
         # 3. Cruzamos a los sobrevivientes para crear al resto de la población
-        num_to_select = max(1, int(len(results) * self.selection_ratio))
-        pool = [r[0] for r in results[:num_to_select]] # Grupo de padres potenciales
+        num_to_select = max(1, int(len(order) * self.selection_ratio))
+        pool = order[:num_to_select] # Grupo de padres potenciales
         
-        while len(new_population) < self.population_size:
-            # En modo DYNAMIC, a veces metemos "sangre nueva" (agentes al azar)
-            if self.strategy == "DYNAMIC" and self.stagnation_counter > 15 and random.random() < 0.15:
-                 new_population.append(Genome())
-                 continue
+        # Elegimos dos padres al azar del grupo de los mejores para cada hijo
+        parents1 = pool[self.rng.integers(len(pool), size=num_children)]
+        parents2 = pool[self.rng.integers(len(pool), size=num_children)]
+        # Tienen un hijo (mezcla de sus ADNs)
+        children = self.crossover(weights[parents1], weights[parents2])
+        # El hijo puede mutar un poquito
+        self.mutate(children, eff_mutation)
 
-            # Elegimos dos padres al azar del grupo de los mejores
-            parent1 = random.choice(pool)
-            parent2 = random.choice(pool)
-            
-            # Tienen un hijo (mezcla de sus ADNs)
-            child = self.crossover(parent1, parent2)
-            # El hijo puede mutar un poquito
-            child.mutate(eff_mutation)
-            new_population.append(child)
-            
-        self.population = new_population
+        # En modo DYNAMIC, a veces metemos "sangre nueva" (agentes al azar)
+        if self.strategy == "DYNAMIC" and self.stagnation_counter > 15:
+            fresh = self.rng.random(num_children) < 0.15
+            children[fresh] = random_params(self.rng, int(fresh.sum()))
+
+        new_weights[num_champion + num_elite:] = children
+        self.population = Population(new_weights)
         self.generation += 1
         return self.population
 
@@ -127,18 +168,32 @@ class GeneticAlgorithm:
         """
         Cruce uniforme: para cada conexión neuronal, 
         el hijo elige al azar si hereda la del padre 1 o la del padre 2.
+        p1 y p2 son matrices (K, 47) (o dos Genome sueltos): se cruzan todas las parejas a la vez.
         """
-        def mix_params(m1, m2):
-            # Creamos una máscara de 0s y 1s para elegir de quién heredar
-            mask = np.random.randint(0, 2, m1.shape).astype(float)
-            return m1 * mask + m2 * (1 - mask)
-            
-        new_w1 = mix_params(p1.w1, p2.w1)
-        new_b1 = mix_params(p1.b1, p2.b1)
-        new_w2 = mix_params(p1.w2, p2.w2)
-        new_b2 = mix_params(p1.b2, p2.b2)
-        
-        return Genome(new_w1, new_b1, new_w2, new_b2)
+        if isinstance(p1, Genome):
+            return Genome(params=self.crossover(p1.params[None], p2.params[None])[0])
+        # Una máscara de bits al azar para elegir de quién heredar cada número
+        bits = self.rng.integers(0, 256, (len(p1), (PARAM_COUNT + 7) // 8), dtype=np.uint8)
+        mask = np.unpackbits(bits, axis=1, count=PARAM_COUNT).view(bool)
+        return np.where(mask, p1, p2)
+
+    def mutate(self, weights, rate):
+        """
+        Mutación de toda una matriz (K, 47) en su lugar.
+        Igual que Genome.mutate: cada tensor (W1, B1, W2, B2) de cada hijo muta
+        con probabilidad `rate`, y si muta recibe ruido gaussiano y se limita a [-W_MAX, W_MAX].
+        """
+        gate = self.rng.random((len(weights), len(PARAM_SLICES))) < rate
+        for group, cols in enumerate(PARAM_SLICES):
+            rows = np.flatnonzero(gate[:, group])
+            if len(rows) == 0:
+                continue
+            # Solo tiramos ruido para los hijos a los que les tocó mutar este tensor
+            block = weights[rows, cols]
+            block += self.rng.normal(0, MUTATION_STD, block.shape)
+            np.clip(block, -W_MAX, W_MAX, out=block)
+            weights[rows, cols] = block
+        return weights
 
     def set_params(self, pop_size, mutation_rate, selection_ratio, elitism):
         # Para cambiar los números desde la interfaz de Streamlit
@@ -149,173 +204,151 @@ class GeneticAlgorithm:
         
         # Ajustamos el tamaño de la población si es necesario
         if len(self.population) < self.population_size:
-            for _ in range(self.population_size - len(self.population)):
-                self.population.append(Genome())
+            extra = random_params(self.rng, self.population_size - len(self.population))
+            self.population = Population(np.vstack([self.population.weights, extra]))
         elif len(self.population) > self.population_size:
             self.population = self.population[:self.population_size]
 
-    def save_best_genome(self, name=None):
+    def state_dict(self):
         """
-        Guarda el mejor genoma de todos los tiempos en la carpeta de campeones.
+        Todo el estado del GA para un checkpoint (ai/checkpoint.py): la población como una
+        sola matriz, el campeón, el historial, la estrategia y el estado del generador de azar.
+        Los arreglos van en "arrays"; todo lo demás se puede guardar como JSON.
+        """
+        best = self.global_best_genome
+        return {
+            "arrays": {
+                "population": np.asarray(self.population.weights),
+                "global_best": best.params if best is not None else np.empty(0),
+            },
+            "generation": self.generation,
+            "best_fitness": self.best_fitness,
+            "avg_fitness": self.avg_fitness,
+            "global_best_fitness": self.global_best_fitness,
+            "history": list(self.history),
+            "strategy": self.strategy,
+            "stagnation_counter": self.stagnation_counter,
+            "population_size": self.population_size,
+            "mutation_rate": self.mutation_rate,
+            "selection_ratio": self.selection_ratio,
+            "elitism_count": self.elitism_count,
+            "rng_state": self.rng.bit_generator.state,
+        }
+
+    def load_state_dict(self, state):
+        """Deja al GA exactamente como estaba cuando se sacó state (misma evolución de ahí en adelante)."""
+        arrays = state["arrays"]
+        self.population = Population(np.array(arrays["population"], dtype=float))
+        best = arrays["global_best"]
+        self.global_best_genome = Genome(params=np.array(best, dtype=float)) if len(best) else None
+        self.generation = int(state["generation"])
+        self.best_fitness = state["best_fitness"]
+        self.avg_fitness = state["avg_fitness"]
+        self.global_best_fitness = state["global_best_fitness"]
+        self.history = list(state["history"])
+        self.strategy = state["strategy"]
+        self.stagnation_counter = int(state["stagnation_counter"])
+        self.population_size = int(state["population_size"])
+        self.mutation_rate = state["mutation_rate"]
+        self.selection_ratio = state["selection_ratio"]
+        self.elitism_count = int(state["elitism_count"])
+        self.rng.bit_generator.state = state["rng_state"]
+
+    def save_best_genome(self, name=None, directory=GENOMES_DIR):
+        """
+        Guarda el mejor genoma de todos los tiempos en la base de campeones (ai/genome_store.py).
         El nombre incluye el fitness para fácil identificación.
         """
         if self.global_best_genome is None:
             return False, "No hay ningún genoma campeón para guardar todavía."
         
-        # Crear carpeta si no existe
-        if not os.path.exists(GENOMES_DIR):
-            os.makedirs(GENOMES_DIR)
-        
         try:
             # Generar nombre automático con fitness si no se proporciona
             if name is None:
                 name = f"campeon_{int(self.global_best_fitness)}pts"
             
-            filepath = os.path.join(GENOMES_DIR, f"{name}.pkl")
-            
-            data = {
-                "genome": {
-                    "w1": self.global_best_genome.w1,
-                    "b1": self.global_best_genome.b1,
-                    "w2": self.global_best_genome.w2,
-                    "b2": self.global_best_genome.b2,
-                },
-                "fitness": self.global_best_fitness,
-                "generation": self.generation,
-                "name": name
-            }
-            with open(filepath, "wb") as f:
-                pickle.dump(data, f)
+            get_store(directory).save(name, self.global_best_genome, self.global_best_fitness, self.generation)
             return True, f"¡Campeón guardado! {name}"
         except Exception as e:
             return False, f"Error al guardar: {str(e)}"
 
-    def load_best_genome(self, filepath=None):
+    def load_best_genome(self, genome_id=None, directory=GENOMES_DIR):
         """
-        Carga un genoma campeón desde un archivo.
+        Carga un genoma campeón de la base: por su id (el que da list_saved_genomes),
+        por su nombre, o directo de un archivo .pkl (train.py --load).
         Lo pone como el mejor histórico y también lo mete a la población actual.
         """
-        if filepath is None:
-            return False, "No se especificó archivo a cargar."
-            
-        if not os.path.exists(filepath):
-            return False, "El archivo no existe."
+        if genome_id is None:
+            return False, "No se especificó campeón a cargar."
         
         try:
-            with open(filepath, "rb") as f:
-                data = pickle.load(f)
-            
-            # Recreamos el genoma desde los datos guardados
-            loaded_genome = Genome(
-                w1=data["genome"]["w1"],
-                b1=data["genome"]["b1"],
-                w2=data["genome"]["w2"],
-                b2=data["genome"]["b2"]
-            )
+            if isinstance(genome_id, str) and genome_id.endswith(".pkl") and os.path.exists(genome_id):
+                params, name, fitness, _ = read_pickle(genome_id)
+                loaded_genome = Genome(params=params)
+            else:
+                store = get_store(directory)
+                if isinstance(genome_id, str):
+                    genome_id = store.id_of(genome_id)
+                loaded = store.load(genome_id) if genome_id is not None else None
+                if loaded is None:
+                    return False, "El campeón no existe."
+                loaded_genome, name, fitness, _ = loaded
             
             # Lo ponemos como el mejor histórico
             self.global_best_genome = loaded_genome
-            self.global_best_fitness = data["fitness"]
+            self.global_best_fitness = fitness
             
             # También lo metemos a la población actual para que compita
             if len(self.population) > 0:
-                self.population[0] = copy.deepcopy(loaded_genome)
+                self.population[0] = loaded_genome
             
-            name = data.get("name", "desconocido")
-            return True, f"¡Campeón '{name}' cargado! Fitness: {int(data['fitness'])}"
+            return True, f"¡Campeón '{name}' cargado! Fitness: {int(fitness)}"
         except Exception as e:
             return False, f"Error al cargar: {str(e)}"
 
-    def list_saved_genomes(self):
+    def list_saved_genomes(self, directory=GENOMES_DIR):
         """
-        Lista todos los genomas guardados en la carpeta.
-        Retorna lista de tuplas: (nombre_display, filepath, fitness)
+        Lista todos los genomas guardados (una consulta, sin leer los pesos).
+        Retorna lista de tuplas: (nombre_display, id, fitness), de mayor a menor fitness
         """
-        saved = []
-        
-        # Buscar en la nueva carpeta
-        if os.path.exists(GENOMES_DIR):
-            for filepath in glob.glob(os.path.join(GENOMES_DIR, "*.pkl")):
-                try:
-                    with open(filepath, "rb") as f:
-                        data = pickle.load(f)
-                    name = data.get("name", os.path.basename(filepath))
-                    fitness = data.get("fitness", 0)
-                    saved.append((f"🏆 {name} ({int(fitness)} pts)", filepath, fitness))
-                except:
-                    pass
-        
-        # Buscar archivo legacy (best_genome.pkl en raíz)
-        if os.path.exists(BEST_GENOME_FILE):
-            try:
-                with open(BEST_GENOME_FILE, "rb") as f:
-                    data = pickle.load(f)
-                fitness = data.get("fitness", 0)
-                saved.append((f"📁 Legacy ({int(fitness)} pts)", BEST_GENOME_FILE, fitness))
-            except:
-                pass
-        
-        # Ordenar por fitness (mayor primero)
-        saved.sort(key=lambda x: x[2], reverse=True)
-        
-        return saved
+        try:
+            rows = get_store(directory).list()
+        except Exception:
+            return []
+        return [(f"🏆 {name} ({int(fitness)} pts)", genome_id, fitness) for genome_id, name, fitness, _ in rows]
 
-    def has_saved_genome(self):
+    def has_saved_genome(self, directory=GENOMES_DIR):
         """Revisa si ya existe algún campeón guardado."""
-        return len(self.list_saved_genomes()) > 0
+        return self.get_saved_fitness(directory) is not None
     
-    def get_saved_fitness(self):
+    def get_saved_fitness(self, directory=GENOMES_DIR):
         """Obtiene el fitness del mejor campeón guardado."""
-        saved = self.list_saved_genomes()
-        if saved:
-            return saved[0][2]  # El primer elemento (mayor fitness)
-        return None
+        try:
+            best = get_store(directory).best()
+        except Exception:
+            return None
+        return best[2] if best is not None else None
 
-    def rename_genome(self, old_filepath, new_name):
-        """
-        Renombra un genoma guardado.
-        Actualiza tanto el nombre en el archivo como el nombre del archivo.
-        """
-        if not os.path.exists(old_filepath):
-            return False, "El archivo no existe."
-        
+    def rename_genome(self, genome_id, new_name, directory=GENOMES_DIR):
+        """Renombra un genoma guardado."""
         try:
-            # Cargar datos existentes
-            with open(old_filepath, "rb") as f:
-                data = pickle.load(f)
-            
-            # Actualizar el nombre interno
-            data["name"] = new_name
-            
-            # Crear nuevo filepath
-            new_filepath = os.path.join(GENOMES_DIR, f"{new_name}.pkl")
-            
-            # Guardar con nuevo nombre
-            with open(new_filepath, "wb") as f:
-                pickle.dump(data, f)
-            
-            # Eliminar archivo viejo si es diferente
-            if old_filepath != new_filepath and os.path.exists(old_filepath):
-                os.remove(old_filepath)
-            
+            if not get_store(directory).rename(genome_id, new_name):
+                return False, "El campeón no existe."
             return True, f"Renombrado a '{new_name}'"
+        except sqlite3.IntegrityError:
+            return False, f"Ya hay un campeón llamado '{new_name}'"
         except Exception as e:
             return False, f"Error al renombrar: {str(e)}"
 
-    def delete_genome(self, filepath):
+    def delete_genome(self, genome_id, directory=GENOMES_DIR):
         """
         Elimina un genoma guardado.
         """
-        if not os.path.exists(filepath):
-            return False, "El archivo no existe."
-        
         try:
-            # Obtener nombre para el mensaje
-            with open(filepath, "rb") as f:
-                data = pickle.load(f)
-            name = data.get("name", os.path.basename(filepath))
-            
-            os.remove(filepath)
-            return True, f"'{name}' eliminado"
+            store = get_store(directory)
+            loaded = store.load(genome_id)
+            if loaded is None or not store.delete(genome_id):
+                return False, "El campeón no existe."
+            return True, f"'{loaded[1]}' eliminado"
         except Exception as e:
             return False, f"Error al eliminar: {str(e)}"
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# genome_store.py - Todos los campeones en una sola base de datos SQLite
+# Antes cada campeón era un .pkl en saved_genomes/ y para armar la lista de la barra lateral
+# había que abrir (unpickle) TODOS los archivos en cada rerun de Streamlit.
+# Ahora hay una tabla con una fila por campeón: nombre, fitness y generación en columnas
+# (con índices) y los 47 pesos como un blob de float32. Listar es una sola consulta.
+# Los .pkl viejos (y el best_genome.pkl legacy) se importan solos la primera vez.
+
+import glob
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+from .brain import Genome, PARAM_COUNT, pack_params
+
+# Carpeta donde guardamos a los campeones
+GENOMES_DIR = "saved_genomes"
+# Archivo legacy (para compatibilidad con guardados anteriores)
+BEST_GENOME_FILE = "best_genome.pkl"
+# La base de datos vive junto a los .pkl viejos
+GENOME_DB_FILE = "genomes.db"
+# Versión del esquema (PRAGMA user_version): si cambian las tablas, se sube y se migra en _migrate_schema
+SCHEMA_VERSION = 1
+WEIGHTS_DTYPE = np.float32
+
+def read_pickle(path):
+    """Lee un campeón en el formato .pkl viejo: (params, name, fitness, generation)."""
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    params = pack_params(data["genome"]["w1"], data["genome"]["b1"], data["genome"]["w2"], data["genome"]["b2"])
+    name = data.get("name") or os.path.splitext(os.path.basename(path))[0]
+    return params, name, data.get("fitness", 0), data.get("generation")
+
+class GenomeStore:
+    """
+    Campeones guardados en SQLite. Cada fila: id, name (único), fitness, generation,
+    created (timestamp), param_count y weights (blob de PARAM_COUNT float32).
+    Abre una conexión por operación: Streamlit llama desde hilos distintos en cada rerun.
+    """
+    def __init__(self, path, legacy_files=None):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._connect() as conn:
+            self._migrate_schema(conn)
+        # Importamos los .pkl de la carpeta (y los legacy) que todavía no estén en la base
+        pkl_files = sorted(glob.glob(os.path.join(directory or ".", "*.pkl")))
+        self.import_pickles(pkl_files + list(legacy_files or []))
+
+    @contextmanager
+    def _connect(self):
+        """Conexión para una operación: confirma los cambios si todo salió bien y siempre se cierra."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _migrate_schema(self, conn):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"{self.path} es de una versión más nueva del juego (esquema {version})")
+        if version < 1:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS genomes (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE,
+                    fitness REAL NOT NULL,
+                    generation INTEGER,
+                    created REAL NOT NULL,
+                    param_count INTEGER NOT NULL,
+                    weights BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS genomes_fitness ON genomes (fitness DESC);
+                CREATE INDEX IF NOT EXISTS genomes_generation ON genomes (generation);
+                -- Los .pkl ya importados (para no volver a importar uno que borraron de la base)
+                CREATE TABLE IF NOT EXISTS imported_files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL
+                );
+            """)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # --- Migración de los .pkl ---
+
+    def import_pickles(self, paths):
+        """Importa los .pkl que no se hayan importado antes (o que cambiaron). Devuelve cuántos."""
+        imported = 0
+        with self._connect() as conn:
+            for path in paths:
+                if not os.path.exists(path):
+                    continue
+                stat = os.stat(path)
+                key = os.path.abspath(path)
+                row = conn.execute("SELECT size, mtime_ns FROM imported_files WHERE path = ?", (key,)).fetchone()
+                if row is not None and (row["size"], row["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                try:
+                    params, name, fitness, generation = read_pickle(path)
+                except Exception:
+                    continue # Un .pkl roto o de otro formato: lo dejamos como está
+                self._put(conn, name, params, fitness, generation, stat.st_mtime)
+                conn.execute("INSERT OR REPLACE INTO imported_files VALUES (?, ?, ?)",
+                             (key, stat.st_size, stat.st_mtime_ns))
+                imported += 1
+        return imported
+
+    # --- Escritura ---
+
+    @staticmethod
+    def _put(conn, name, params, fitness, generation, created):
+        blob = np.asarray(params, dtype=WEIGHTS_DTYPE).tobytes()
+        # Mismo nombre = lo reemplaza (igual que sobrescribir el .pkl)
+        conn.execute("""
+            INSERT INTO genomes (name, fitness, generation, created, param_count, weights)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET fitness = excluded.fitness, generation = excluded.generation,
+                created = excluded.created, param_count = excluded.param_count, weights = excluded.weights
+        """, (name, float(fitness), generation, created, len(params), blob))
+        return conn.execute("SELECT id FROM genomes WHERE name = ?", (name,)).fetchone()[0]
+
+    def save(self, name, genome, fitness, generation=None):
+        """Guarda un genoma (o lo reemplaza si ya hay uno con ese nombre). Devuelve su id."""
+        with self._connect() as conn:
+            return self._put(conn, name, genome.params, fitness, generation, time.time())
+
+    def rename(self, genome_id, new_name):
+        """Devuelve False si no existe ese id. Lanza sqlite3.IntegrityError si el nombre ya está usado."""
+        with self._connect() as conn:
+            return conn.execute("UPDATE genomes SET name = ? WHERE id = ?", (new_name, genome_id)).rowcount > 0
+
+    def delete(self, genome_id):
+        with self._connect() as conn:
+            return conn.execute("DELETE FROM genomes WHERE id = ?", (genome_id,)).rowcount > 0
+
+    # --- Lectura (sin tocar los pesos, salvo en load) ---
+
+    def list(self, limit=None):
+        """[(id, name, fitness, generation)] de mayor a menor fitness (usa el índice de fitness)."""
+        query = "SELECT id, name, fitness, generation FROM genomes ORDER BY fitness DESC"
+        with self._connect() as conn:
+            if limit is not None:
+                return [tuple(row) for row in conn.execute(query + " LIMIT ?", (limit,))]
+            return [tuple(row) for row in conn.execute(query)]
+
+    def best(self):
+        """(id, name, fitness, generation) del mejor campeón, o None si no hay ninguno."""
+        rows = self.list(limit=1)
+        return rows[0] if rows else None
+
+    def find(self, generation=None, min_fitness=None):
+        """Los campeones de una generación y/o con al menos min_fitness, de mayor a menor fitness."""
+        conditions, args = [], []
+        if generation is not None:
+            conditions.append("generation = ?")
+            args.append(generation)
+        if min_fitness is not None:
+            conditions.append("fitness >= ?")
+            args.append(min_fitness)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._connect() as conn:
+            return [tuple(row) for row in conn.execute(
+                f"SELECT id, name, fitness, generation FROM genomes {where} ORDER BY fitness DESC", args)]
+
+    def id_of(self, name):
+        """El id del campeón con ese nombre, o None."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT id FROM genomes WHERE name = ?", (name,)).fetchone()
+        return row[0] if row is not None else None
+
+    def load(self, genome_id):
+        """(Genome, name, fitness, generation), o None si no existe ese id."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT name, fitness, generation, param_count, weights FROM genomes WHERE id = ?",
+                               (genome_id,)).fetchone()
+        if row is None:
+            return None
+        if row["param_count"] != PARAM_COUNT:
+            raise ValueError(f"'{row['name']}' tiene {row['param_count']} pesos y la red usa {PARAM_COUNT}")
+        params = np.frombuffer(row["weights"], dtype=WEIGHTS_DTYPE).astype(float)
+        return Genome(params=params), row["name"], row["fitness"], row["generation"]
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM genomes").fetchone()[0]
+
+# Un store por carpeta y por proceso: la migración de los .pkl corre una sola vez
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(directory=GENOMES_DIR):
+    """El GenomeStore de esa carpeta (se crea, y migra los .pkl, la primera vez)."""
+    path = os.path.abspath(os.path.join(directory, GENOME_DB_FILE))
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            # El best_genome.pkl legacy solo acompaña a la carpeta de siempre
+            legacy = [BEST_GENOME_FILE] if os.path.abspath(directory) == os.path.abspath(GENOMES_DIR) else []
+            store = _stores[path] = GenomeStore(path, legacy_files=legacy)
+        return store
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+# trainer.py - Entrenamiento "sin cabeza" (headless)
+# Aquí evolucionamos a los corredores a toda velocidad: sin Streamlit, sin dibujar nada
+# y sin esperar a que el navegador reciba los frames. Ideal para dejarlo entrenando de noche.
+
+import json
+import os
+import time
+import numpy as np
+from config import *
+from game.engine import Engine
+from game.vector_engine import VectorEngine
+from game.course import generate_course
+from .brain import PopulationBrain, build_inputs_batch, obstacle_features
+from .genetic_algo import GeneticAlgorithm, GENOMES_DIR
+from .checkpoint import CheckpointManager
+
+# Máximo de frames que adelantamos de una vez cuando no hay límite de frames
+FAST_FORWARD_CHUNK = 1000
+
+def run_generation(engine, brain, seed=None, course=None, max_frames=None, fitness_cap=None,
+                   fast_forward=False):
+    """
+    Simula una generación completa hasta que todos los agentes chocan.
+    Es el mismo bucle que app.py pero sin dibujar ni dormir entre frames.
+    seed fija la pista de obstáculos (None = al azar); course es una pista
+    pregrabada (game/course.py) que se repite tal cual (si se acaba, siguen obstáculos
+    al azar con una semilla que sale de la pista, así la ronda siempre termina).
+
+    Límites opcionales (los que sigan vivos se quedan con la distancia recorrida):
+    - max_frames: cortamos la ronda después de tantos frames.
+    - fitness_cap: cortamos la ronda cuando la distancia llega a este valor.
+    fast_forward: los tramos donde nadie tiene que reaccionar se adelantan sin mover
+    a los dinos (ver fast_forward_idle). El resultado es exactamente el mismo.
+    Devuelve (fitnesses, frames_simulados).
+    """
+    engine.reset(num_dinos=len(brain), seed=seed, course=course)
+    frames = 0
+    while not engine.game_over:
+        if max_frames is not None and frames >= max_frames:
+            break
+        if fitness_cap is not None and engine.distance_traveled >= fitness_cap:
+            break
+
+        alive = engine.alive_indices()
+        inputs = engine.get_observations(alive)
+        jump, crouch = brain.decide(inputs, alive)
+
+        if fast_forward:
+            limit = FAST_FORWARD_CHUNK if max_frames is None else max_frames - frames
+            skipped = fast_forward_idle(engine, brain, alive, jump, crouch, limit, fitness_cap)
+            if skipped:
+                frames += skipped
+                continue
+
+        engine.apply_actions(alive, jump, crouch)
+        engine.update()
+        frames += 1
+    return engine.get_fitnesses(), frames
+
+def fast_forward_idle(engine, brain, alive, jump, crouch, limit, fitness_cap=None):
+    """
+    Si todos los vivos están quietos en el suelo (sin saltar y sin cambiar de postura),
+    un frame sin obstáculos en su columna no les cambia nada: solo avanza el mundo.
+    Así que adelantamos el mundo (velocidad, distancia, obstáculos y spawns) mientras
+    el camino siga libre, anotando lo que la red vería en cada frame. Después evaluamos
+    a todos los agentes en todos esos frames con UNA sola pasada de la red, y si alguien
+    habría reaccionado antes, regresamos el mundo hasta justo ese frame.
+    Devuelve cuántos frames adelantamos (0 = ninguno).
+    """
+    if jump.any() or not engine.idle_dinos(alive, crouch):
+        return 0
+
+    if not engine.path_clear():
+        return 0
+
+    player_ys = engine.get_player_ys(alive)
+    world = engine.save_world()
+    features, speeds = [], []
+    steps = 0
+    while steps < limit and engine.path_clear():
+        engine.skip_frames(1)
+        steps += 1
+        if fitness_cap is not None and engine.distance_traveled >= fitness_cap:
+            break
+        features.append(obstacle_features(engine.next_obstacle()))
+        speeds.append(engine.game_speed)
+    if steps <= 1:
+        return steps
+
+    # Decisiones en los frames intermedios (en el último, el bucle normal decide como siempre)
+    frames = steps - 1
+    inputs = build_inputs_batch(features[:frames], speeds[:frames], player_ys)
+    jump_all, crouch_all = brain.decide(inputs, np.tile(alive, frames))
+    still_idle = (~jump_all & (crouch_all == np.tile(crouch, frames))).reshape(frames, -1).all(axis=1)
+    if still_idle.all():
+        return steps
+
+    # Alguien reacciona en el frame `reaction`: volvemos atrás y avanzamos solo hasta ahí
+    reaction = int(np.argmin(still_idle)) + 1
+    engine.restore_world(world)
+    engine.skip_frames(reaction)
+    return reaction
+
+def evaluate_shard(args):
+    """
+    Evalúa un pedazo (shard) de la población en un proceso aparte.
+    args = (weights, course, vectorized, limits), con las filas (K, 47) de la matriz de pesos
+    del shard y limits = dict con max_frames / fitness_cap / fast_forward para run_generation.
+    Todos los procesos reciben la misma pista pregrabada, así que
+    cada shard enfrenta exactamente los mismos obstáculos.
+    Devuelve (fitnesses, frames_simulados).
+    """
+    weights, course, vectorized, limits = args
+    engine = VectorEngine() if vectorized else Engine()
+    return run_generation(engine, PopulationBrain(weights), course=course, **limits)
+
+class HeadlessTrainer:
+    """
+    Junta el Engine, el GeneticAlgorithm y el PopulationBrain en un bucle de entrenamiento
+    que no depende de la interfaz. Guarda el historial y los campeones en saved_genomes/.
+    Con checkpoint_every > 0 guarda además un checkpoint de todo el GA (ai/checkpoint.py)
+    en output_dir/checkpoints; resume() sigue desde el último sin repetir generaciones.
+    """
+    def __init__(self, population_size=POPULATION_SIZE, strategy="HOF", vectorized=True,
+                 output_dir=GENOMES_DIR, save_every=10, verbose=True, workers=1, seed=None,
+                 course=None, max_frames=None, fitness_cap=None, fast_forward=True,
+                 checkpoint_every=0):
+        # Con la misma semilla, dos entrenamientos dan exactamente el mismo historial
+        self.ga = GeneticAlgorithm(seed=seed)
+        self.ga.set_params(population_size, self.ga.mutation_rate, self.ga.selection_ratio, self.ga.elitism_count)
+        self.ga.strategy = strategy
+        self.ga.workers = workers # Procesos para evaluar la población en paralelo
+        # Para poblaciones grandes el motor vectorizado es mucho más rápido
+        self.vectorized = vectorized
+        self.engine = VectorEngine() if vectorized else Engine()
+        # Pista fija para todas las generaciones (None = una pista nueva por generación)
+        self.course = course
+        # Límites de la evaluación (para que un campeón solitario no se coma toda la corrida)
+        self.limits = {"max_frames": max_frames, "fitness_cap": fitness_cap, "fast_forward": fast_forward}
+        self.output_dir = output_dir
+        self.save_every = save_every # Cada cuántas generaciones guardamos (0 = solo al final)
+        self.checkpoint_every = checkpoint_every # Cada cuántas generaciones sacamos checkpoint (0 = nunca)
+        self.checkpoints = CheckpointManager(os.path.join(output_dir, "checkpoints"))
+        self.verbose = verbose
+
+        # Historial completo (el del GA solo guarda las últimas 100 generaciones)
+        self.history = []
+        self.run_name = time.strftime("%Y%m%d_%H%M%S")
+        self._last_saved_fitness = 0
+
+    def run_generation(self):
+        """Evalúa la población actual y crea la siguiente generación."""
+        start = time.perf_counter()
+        # Cada generación corre en una pista nueva, pero derivada de la semilla del GA.
+        # La generamos una sola vez y la compartimos con todos los procesos.
+        course = self.course if self.course is not None else generate_course(self.ga.course_seed())
+        if self.ga.workers > 1:
+            # Repartimos la población entre varios procesos (misma pista para todos)
+            fitnesses, frames = self.ga.evaluate(vectorized=self.vectorized, course=course, **self.limits)
+        else:
+            brain = PopulationBrain(self.ga.population)
+            fitnesses, frames = run_generation(self.engine, brain, course=course, **self.limits)
+        generation = self.ga.generation
+        self.ga.next_generation(fitnesses)
+        elapsed = time.perf_counter() - start
+
+        record = {
+            "gen": generation,
+            "best": self.ga.best_fitness,
+            "avg": self.ga.avg_fitness,
+            "global_best": self.ga.global_best_fitness,
+            "frames": frames,
+            "seconds": round(elapsed, 4),
+        }
+        self.history.append(record)
+        if self.verbose:
+            print(f"Gen {generation:4d} | mejor {record['best']:10.1f} | promedio {record['avg']:9.1f} | "
+                  f"récord {record['global_best']:10.1f} | {frames:6d} frames en {elapsed:6.2f}s")
+        return record
+
+    def train(self, generations):
+        """Entrena durante N generaciones, guardando historial y campeones de vez en cuando."""
+        try:
+            for i in range(generations):
+                self.run_generation()
+                if self.save_every and (i + 1) % self.save_every == 0:
+                    self.save()
+                if self.checkpoint_every and (self.ga.generation - 1) % self.checkpoint_every == 0:
+                    self.save_checkpoint()
+        finally:
+            # Aunque lo cortemos con Ctrl+C, no perdemos lo aprendido
+            self.save()
+            if self.checkpoint_every:
+                self.save_checkpoint()
+            self.ga.close()
+        return self.history
+
+    def save_checkpoint(self):
+        """Checkpoint del GA completo más nuestro historial (el del GA solo tiene 100 generaciones)."""
+        extra = {"history": self.history, "run_name": self.run_name,
+                 "last_saved_fitness": self._last_saved_fitness}
+        path = self.checkpoints.save(self.ga, extra)
+        if self.verbose:
+            print(f"Checkpoint: {path}")
+        return path
+
+    def resume(self, path=None):
+        """
+        Sigue desde un checkpoint (el más nuevo de output_dir/checkpoints si path = None).
+        Devuelve False si no había ninguno. Los parámetros del GA (población, mutación,
+        estrategia...) y su azar vuelven a ser los del checkpoint.
+        """
+        workers = self.ga.workers
+        ga, extra = self.checkpoints.load(path, self.ga)
+        if ga is None:
+            return False
+        self.ga.workers = workers
+        self.history = extra.get("history", [])
+        self.run_name = extra.get("run_name", self.run_name)
+        self._last_saved_fitness = extra.get("last_saved_fitness", 0)
+        if self.verbose:
+            print(f"Reanudando desde la generación {self.ga.generation} "
+                  f"(récord {self.ga.global_best_fitness:.1f})")
+        return True
+
+    def save(self):
+        """Guarda el historial y, si mejoró desde la última vez, el campeón actual."""
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+
+        history_path = os.path.join(self.output_dir, f"historial_{self.run_name}.json")
+        with open(history_path, "w") as f:
+            json.dump(self.history, f, indent=2)
+
+        if self.ga.global_best_fitness > self._last_saved_fitness:
+            success, msg = self.ga.save_best_genome(directory=self.output_dir)
+            if success:
+                self._last_saved_fitness = self.ga.global_best_fitness
+            if self.verbose:
+                print(msg)
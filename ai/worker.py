@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+# worker.py - Simulación en un hilo aparte
+# En app.py todo pasaba en fila: simular, dibujar, mandar la imagen al navegador y dormir.
+# Si el navegador tardaba, el entrenamiento también. Aquí la simulación corre sola en su
+# propio hilo y de vez en cuando publica una "foto" (snapshot) del mundo; la interfaz
+# solo toma la última foto cuando le toca dibujar, a su propio ritmo.
+
+import queue
+import threading
+import time
+from config import *
+from .brain import Genome, PopulationBrain
+
+class SimulationWorker:
+    """
+    Corre el bucle de entrenamiento (entradas -> red -> acciones -> Engine.update ->
+    siguiente generación) en un hilo de fondo y publica en self.latest un diccionario con:
+    seq, world (Engine.snapshot()), generation, alive, networks, global_best, distance,
+    steps_per_second, history, best_genome y game_over.
+
+    Mientras corre, el engine, el GA y el cerebro son del hilo: cualquier cambio desde
+    afuera (aparecer obstáculos, cambiar parámetros...) se manda con submit() y se aplica
+    entre dos frames.
+    steps_per_second = None corre lo más rápido que pueda.
+    Con checkpoints (un CheckpointManager) y checkpoint_every > 0, guarda un checkpoint
+    del GA cada tantas generaciones desde el mismo hilo.
+    """
+    def __init__(self, engine, ga, brain=None, steps_per_second=None, publish_interval=1 / 60,
+                 checkpoints=None, checkpoint_every=0):
+        self.engine = engine
+        self.ga = ga
+        self.brain = brain
+        self.steps_per_second = steps_per_second
+        self.publish_interval = publish_interval # Cada cuánto sacamos una foto nueva (segundos)
+        self.checkpoints = checkpoints
+        self.checkpoint_every = checkpoint_every
+        self.latest = None
+        self.error = None # Si el hilo se cae, aquí queda la excepción
+        self.steps = 0
+        self._commands = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._seq = 0
+
+    # --- Control desde la interfaz ---
+
+    def start(self):
+        if self.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="SimulationWorker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Detiene el hilo (termina el frame que esté simulando)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, func, *args):
+        """Pide que el hilo ejecute func(*args) entre dos frames (o ya mismo si no está corriendo)."""
+        if self.is_alive():
+            self._commands.put((func, args))
+        else:
+            func(*args)
+
+    def skip_generation(self):
+        """Termina la generación actual ya (el botón "Next Gen")."""
+        self.submit(self._new_generation)
+
+    # --- Dentro del hilo ---
+
+    def _run(self):
+        try:
+            self._ensure_generation()
+            self._publish()
+            last_publish = time.perf_counter()
+            last_rate = (last_publish, self.steps)
+            rate = 0.0
+            next_step = last_publish
+            while not self._stop.is_set():
+                self._drain_commands()
+                self._step()
+
+                now = time.perf_counter()
+                if now - last_rate[0] >= 1.0:
+                    rate = (self.steps - last_rate[1]) / (now - last_rate[0])
+                    last_rate = (now, self.steps)
+                if self.engine.game_over or now - last_publish >= self.publish_interval:
+                    self._publish(now - last_publish, rate)
+                    last_publish = now
+                if self.engine.game_over:
+                    self._new_generation()
+
+                # Con límite de velocidad, esperamos al siguiente paso (wait despierta si nos detienen)
+                if self.steps_per_second:
+                    next_step = max(next_step + 1.0 / self.steps_per_second, now - 0.1)
+                    self._stop.wait(max(0.0, next_step - time.perf_counter()))
+        except Exception as e:
+            self.error = e
+            self._stop.set()
+
+    def _drain_commands(self):
+        while True:
+            try:
+                func, args = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            func(*args)
+
+    def _ensure_generation(self):
+        """Si el cerebro no corresponde a los dinos del motor, empezamos una generación nueva."""
+        if self.brain is None or len(self.brain) != len(self.engine.dinos):
+            self.engine.reset(num_dinos=len(self.ga.population))
+            self.brain = PopulationBrain(self.ga.population)
+
+    def _new_generation(self):
+        """¡Evolución! Igual que en app.py: los mejores tienen hijos y reiniciamos el motor."""
+        self.ga.next_generation(self.engine.get_fitnesses())
+        if self.checkpoints is not None and self.checkpoint_every and \
+                (self.ga.generation - 1) % self.checkpoint_every == 0:
+            self.checkpoints.save(self.ga)
+        self.engine.reset(num_dinos=len(self.ga.population))
+        self.brain = PopulationBrain(self.ga.population)
+
+    def _step(self):
+        """Un frame de simulación (el mismo cuerpo que el bucle de app.py y de trainer.py)."""
+        engine = self.engine
+        alive = engine.alive_indices()
+        if len(alive):
+            inputs = engine.get_observations(alive)
+            jump, crouch = self.brain.decide(inputs, alive)
+            engine.apply_actions(alive, jump, crouch)
+        engine.update()
+        self.steps += 1
+
+    def _publish(self, dt=0.0, rate=0.0):
+        """Saca la foto del mundo y la deja lista para la interfaz."""
+        # Las animaciones de los dinos avanzan con el tiempo real, no con los frames
+        # (tope de 0.1s para que no den saltos enormes)
+        for dino in self.engine.visible_dinos():
+            dino.update_animation(min(dt, 0.1))
+        world = self.engine.snapshot()
+
+        self._seq += 1
+        self.latest = {
+            "seq": self._seq,
+            "world": world,
+            "generation": self.ga.generation,
+            "alive": self.engine.count_alive(),
+            "networks": len(self.brain) if self.brain is not None else 0,
+            "global_best": self.ga.global_best_fitness,
+            "distance": self.engine.distance_traveled,
+            "steps_per_second": rate,
+            "history": list(self.ga.history),
+            "best_genome": Genome(params=self.ga.population.weights[0].copy()),
+            "game_over": self.engine.game_over,
+        }
@@ -4,6 +4,7 @@
 
 import streamlit as st
 import os
+import io
 
 # Configuramos un driver "fantasma" para que Pygame no intente abrir una ventana real,
 # ya que Streamlit corre en el servidor y no tiene pantalla física.
@@ -24,9 +25,15 @@ if pygame.display.get_surface() is None:
 
 # Importamos las piezas de nuestro propio rompecabezas
 from game.engine import Engine
-from game.assets import AssetManager
+from game.vector_engine import VectorEngine
+from game.assets import AssetManager, sprite_cache
+from game.profiler import FrameProfiler
+from game.renderer import LayeredRenderer
+from game.streaming import FrameEncoder, MJPEGServer, VideoRecorder
 from ai.genetic_algo import GeneticAlgorithm
-from ai.brain import NeuralNetwork
+from ai.brain import PopulationBrain
+from ai.worker import SimulationWorker
+from ai.checkpoint import CheckpointManager
 from config import *
 
 # Esto es por si queremos jugar nosotros mismos con el teclado
@@ -46,77 +53,97 @@ if 'engine' not in st.session_state:
     st.session_state.ga = GeneticAlgorithm() # El algoritmo que hace evolucionar a los dinos
     st.session_state.running = False # ¿Está el juego corriendo?
     st.session_state.generation_complete = False
-    st.session_state.networks = [] # Aquí guardamos los "cerebros" de la generación actual
+    st.session_state.brain = None # El "cerebro" de toda la generación actual (una sola red apilada)
     st.session_state.start_time = time.time()
     st.session_state.frame_count = 0
     st.session_state.assets = {} # Donde guardamos las fotos del juego
 
     st.session_state.assets = {} # Store pygame surfaces
 
-# Cargamos los dibujos (assets) si aún no están listos
+# Sesiones viejas guardaban una lista de redes; ahora usamos un solo cerebro apilado
+if 'brain' not in st.session_state:
+    st.session_state.brain = None
+
+# Preparamos los dibujos (assets) si aún no están listos.
+# No cargamos nada aquí: cada dibujo se abre la primera vez que hace falta dibujarlo,
+# y mientras tanto un hilo los va cargando en segundo plano. La página responde de una vez.
 if 'assets' not in st.session_state or not st.session_state.assets:
-    st.session_state.assets = {}
     assets_dir = os.path.join(os.getcwd(), "assets")
-    if os.path.exists(assets_dir):
-        # 1. Cargamos las animaciones del Dino
-        spritesheet_json = os.path.join(assets_dir, "dino_run_spritesheet.json")
-        if os.path.exists(spritesheet_json):
-             frames = AssetManager.load_spritesheet(spritesheet_json, assets_dir)
-             if frames:
-                 st.session_state.assets["dino_run"] = frames
-                 # Use first frame as default static dino if not present
-                 if "dino" not in st.session_state.assets:
-                     st.session_state.assets["dino"] = frames[0]
-
-        # 1.5 Cargamos animaciones humanas (las que agregamos nuevas)
-        human_anim = AssetManager.load_human_animation(assets_dir)
-        if human_anim:
-            st.session_state.assets["human_anim"] = human_anim
-            st.session_state.last_time = time.time()
-
-        # 1.6 Los fondos (playa, etc.)
-        bg_surfs = AssetManager.load_backgrounds(assets_dir)
-        if bg_surfs:
-            st.session_state.assets["backgrounds"] = bg_surfs
-
-        # 1.7 Animación especial "coachwalk"
-        coachwalk_frames = AssetManager.load_coachwalk_animation(assets_dir)
-        if coachwalk_frames:
-             st.session_state.assets["coachwalk"] = coachwalk_frames
-
-        # 2. Cargamos todas las imágenes sueltas de los obstáculos
-        asset_files = {
-            "dino": "dino.png",
-            # "dino_run1": "dino_run1.png", # Deprecated if spritesheet exists
-            # "dino_run2": "dino_run2.png", 
-            "dino_jump": "dino_jump.png",
-            "car_0": "car_0.png",
-            "car_1": "car_1.png",
-            "car_2": "car_2.png",
-            "car_3": "car_3.png",
-            "car_4": "car_4.png",
-            "dron": "dron.png",
-            "cone": "cone.png",
-            "beach_ball": "beach_ball.png",
-            "cooler": "cooler.png",
-            "dumbbell": "dumbbell.png",
-            "surfboard": "surfboard.png",
-            "dumbbell_box": "dumbbell_box.png",
-            "ground": "ground.png",
-            "beach_net": "beach_net.png",
-            "bar_crouch": "bar_crouch.png"
-        }
-        
-        for key, filename in asset_files.items():
-            path = os.path.join(assets_dir, filename)
-            if os.path.exists(path):
-                # Don't overwrite if spritesheet already provided dino static
-                if key == "dino" and "dino" in st.session_state.assets:
-                    continue
-                    
-                surf = AssetManager.load_image(path)
-                if surf:
-                    st.session_state.assets[key] = surf
+    st.session_state.assets = AssetManager.load_lazy(assets_dir, prefetch=True, scale=STREAM_WIDTH / SCREEN_WIDTH)
+
+# --- SIMULACIÓN EN SEGUNDO PLANO ---
+# Si está activa, el engine, el GA y el cerebro los maneja un hilo aparte (ai/worker.py)
+# y la página solo va mostrando la última foto que publica.
+if 'worker' not in st.session_state:
+    st.session_state.worker = None
+
+def run_on_sim(func, *args):
+    """Ejecuta func(*args) sobre la simulación: en el hilo si está corriendo, o ya mismo si no."""
+    if st.session_state.worker is not None:
+        st.session_state.worker.submit(func, *args)
+    else:
+        func(*args)
+
+def stop_worker():
+    """Detiene el hilo de simulación y nos devolvemos el cerebro de la generación en curso."""
+    worker = st.session_state.worker
+    if worker is not None:
+        worker.stop()
+        st.session_state.brain = worker.brain
+        st.session_state.worker = None
+
+# --- TRANSMISIÓN Y GRABACIÓN (game/streaming.py) ---
+# Un hilo pasa el último lienzo a JPEG a ritmo fijo; el servidor MJPEG y la grabación usan esos JPEG.
+if 'encoder' not in st.session_state:
+    st.session_state.encoder = None
+    st.session_state.stream_server = None
+    st.session_state.recorder = None
+
+def update_streaming(stream_on, record_on):
+    """Prende o apaga el codificador, el servidor MJPEG y la grabación según los checkboxes."""
+    state = st.session_state
+    if (stream_on or record_on) and state.encoder is None:
+        state.encoder = FrameEncoder()
+        state.encoder.start()
+
+    if stream_on and state.stream_server is None:
+        server = MJPEGServer(state.encoder)
+        try:
+            server.start()
+            state.stream_server = server
+        except OSError as e:
+            st.sidebar.error(f"No se pudo abrir el puerto {server.port}: {e}")
+    elif not stream_on and state.stream_server is not None:
+        state.stream_server.stop()
+        state.stream_server = None
+
+    if record_on and state.recorder is None:
+        os.makedirs("recordings", exist_ok=True)
+        path = os.path.join("recordings", time.strftime("partida_%Y%m%d_%H%M%S.mjpeg"))
+        state.recorder = VideoRecorder(state.encoder, path)
+    elif not record_on and state.recorder is not None:
+        state.recorder.close()
+        st.sidebar.success(f"🎬 Video guardado: {state.recorder.path} ({state.recorder.frames_written} frames)")
+        state.recorder = None
+
+    if not stream_on and not record_on and state.encoder is not None:
+        state.encoder.stop()
+        state.encoder = None
+    if state.encoder is not None and state.encoder.error is not None:
+        # El codificador se cayó: apagamos el servidor y la grabación (se reintenta en el próximo rerun)
+        st.sidebar.error(f"La transmisión se detuvo por un error: {state.encoder.error}")
+        if state.stream_server is not None:
+            state.stream_server.stop()
+            state.stream_server = None
+        if state.recorder is not None:
+            state.recorder.close()
+            state.recorder = None
+        state.encoder.stop()
+        state.encoder = None
+
+# --- CHECKPOINTS (toda la población, no solo el campeón: ai/checkpoint.py) ---
+if 'checkpoints' not in st.session_state:
+    st.session_state.checkpoints = CheckpointManager()
 
 # --- BARRA LATERAL (Los controles para el usuario) ---
 st.sidebar.header("Parámetros de Entrenamiento")
@@ -131,10 +158,43 @@ bird_prob = st.sidebar.slider("Probabilidad de Pájaros", 0.0, 0.5, BIRD_PROBABI
 
 st.sidebar.header("Simulación")
 sim_speed = st.sidebar.select_slider("Velocidad de Simulación", options=[1, 2, 4, 8, 16], value=1)
+vector_mode = st.sidebar.checkbox("⚡ Motor Vectorizado (NumPy)", value=False,
+    help="Guarda el estado de todos los agentes en arreglos de NumPy. Recomendado para poblaciones grandes.")
+background_mode = st.sidebar.checkbox("🧵 Simulación en segundo plano", value=False,
+    help="Simula en un hilo aparte; la página solo muestra la última foto del juego. "
+         "Así el entrenamiento no espera a que los frames lleguen al navegador.")
+unlimited_speed = st.sidebar.checkbox("🚀 Sin límite de velocidad", value=False, disabled=not background_mode,
+    help="El hilo simula lo más rápido que pueda (en vez de 30 frames por segundo x Velocidad de Simulación).")
+stream_mode = st.sidebar.checkbox("📡 Transmisión MJPEG", value=False,
+    help=f"Muestra el juego como un video MJPEG servido en http://{STREAM_HOST}:{STREAM_PORT}/stream.mjpg "
+         "en vez de mandar cada frame como imagen por Streamlit (el navegador tiene que estar en esta máquina).")
+record_mode = st.sidebar.checkbox("🎬 Grabar partida (.mjpeg)", value=False,
+    help="Guarda los frames en la carpeta recordings/ (se abre con VLC o se pasa a mp4 con ffmpeg).")
 
 st.sidebar.markdown("---")
 manual_mode = st.sidebar.checkbox("🎮 Modo Manual (@Jared Play)", value=False)
 debug_mode = st.sidebar.checkbox("🟥 Mostrar Hitboxes", value=False)
+profile_mode = st.sidebar.checkbox("⏱️ Perfilador de Frames", value=False,
+                                   help="Mide cuánto tarda cada fase del frame (IA, motor, dibujo, envío) "
+                                        "para ajustar la velocidad de simulación y la población.")
+
+# Cronómetros por fase del bucle principal (apagados = no miden nada)
+if 'profiler' not in st.session_state:
+    st.session_state.profiler = FrameProfiler()
+profiler = st.session_state.profiler
+profiler.enabled = profile_mode
+update_streaming(stream_mode, record_mode)
+if profile_mode:
+    with st.sidebar.expander("⏱️ Tiempos por fase (ms)", expanded=True):
+        profiler_panel = st.empty()
+        if profiler.frames:
+            profiler_panel.dataframe(pd.DataFrame(profiler.table()), hide_index=True)
+        csv_buffer = io.StringIO()
+        profiler.export_csv(csv_buffer)
+        st.download_button("📥 Exportar CSV", csv_buffer.getvalue(), file_name="perfil_frames.csv",
+                           mime="text/csv", disabled=not profiler.frames)
+        if st.button("🔄 Reiniciar Mediciones"):
+            profiler.reset()
 
 st.sidebar.markdown("---")
 st.sidebar.header("🧬 Estrategia de Evolución")
@@ -160,6 +220,7 @@ if st.session_state.ga.stagnation_counter > 5:
 st.sidebar.markdown("---")
 st.sidebar.header("💾 Guardar/Cargar Campeón")
 
+auto_checkpoint = False
 # Verificar si el objeto GA tiene los nuevos métodos (por si hay una sesión vieja)
 if not hasattr(st.session_state.ga, 'list_saved_genomes'):
     st.sidebar.warning("⚠️ Sesión vieja detectada. Usa el botón de emergencia:")
@@ -212,11 +273,11 @@ else:
     
     # Preparar opciones para el selector
     options = ["❌ Ninguno (empezar de cero)"]
-    genome_map = {options[0]: None}  # Mapa de opción -> filepath
+    genome_map = {options[0]: None}  # Mapa de opción -> id en la base de campeones
     
-    for display_name, filepath, fitness in saved_genomes:
+    for display_name, genome_id, fitness in saved_genomes:
         options.append(display_name)
-        genome_map[display_name] = filepath
+        genome_map[display_name] = genome_id
     
     # Selector de campeón
     selected = st.sidebar.selectbox(
@@ -227,8 +288,9 @@ else:
     
     # Botón para aplicar la selección
     if st.sidebar.button("✅ Aplicar Campeón", type="primary"):
-        filepath = genome_map.get(selected)
-        if filepath is None:
+        stop_worker() # Cambia la población: el hilo arranca de nuevo con la generación nueva
+        genome_id = genome_map.get(selected)
+        if genome_id is None:
             # Opción "Ninguno" - resetear a genoma aleatorio
             st.session_state.ga.global_best_genome = None
             st.session_state.ga.global_best_fitness = 0
@@ -236,7 +298,7 @@ else:
             st.session_state.generation_complete = True
         else:
             # Cargar el genoma seleccionado
-            success, msg = st.session_state.ga.load_best_genome(filepath)
+            success, msg = st.session_state.ga.load_best_genome(genome_id)
             if success:
                 st.sidebar.success(msg)
                 st.session_state.generation_complete = True
@@ -247,15 +309,37 @@ else:
     if st.session_state.ga.global_best_genome is not None:
         st.sidebar.info(f"🧠 En memoria: {int(st.session_state.ga.global_best_fitness)} pts")
     
+    # --- CHECKPOINTS: toda la población, el historial y el azar (sobreviven a un reinicio) ---
+    with st.sidebar.expander("📦 Checkpoints de la Población"):
+        auto_checkpoint = st.checkbox(f"Guardar cada {CHECKPOINT_EVERY} generaciones", value=False,
+                                      key="auto_checkpoint")
+        if st.button("📦 Guardar Checkpoint Ahora"):
+            # Si el hilo está corriendo, se guarda entre dos frames (el GA es suyo)
+            run_on_sim(st.session_state.checkpoints.save, st.session_state.ga)
+            st.success(f"Checkpoint de la generación {st.session_state.ga.generation}")
+        entries = st.session_state.checkpoints.entries()
+        if entries:
+            last = entries[-1]
+            st.caption(f"Último: generación {last['generation']}, récord {int(last['global_best_fitness'])} "
+                       f"pts ({last['time']})")
+            if st.button("♻️ Reanudar Último Checkpoint"):
+                stop_worker()
+                try:
+                    st.session_state.checkpoints.load(ga=st.session_state.ga)
+                    st.session_state.generation_complete = True # Start arranca con la población recuperada
+                    st.success(f"Reanudado en la generación {st.session_state.ga.generation}")
+                except Exception as e:
+                    st.error(f"Error al reanudar: {str(e)}")
+    
     # --- GESTIÓN DE GENOMAS (Renombrar/Eliminar) ---
     if saved_genomes and hasattr(st.session_state.ga, 'rename_genome'):
         with st.sidebar.expander("⚙️ Gestionar Genomas"):
             # Selector de genoma a gestionar
-            manage_options = [f"{name}" for name, fp, fit in saved_genomes]
-            manage_map = {f"{name}": fp for name, fp, fit in saved_genomes}
+            manage_options = [f"{name}" for name, genome_id, fit in saved_genomes]
+            manage_map = {f"{name}": genome_id for name, genome_id, fit in saved_genomes}
             
             selected_manage = st.selectbox("Seleccionar genoma:", manage_options, key="manage_genome")
-            selected_filepath = manage_map.get(selected_manage)
+            selected_id = manage_map.get(selected_manage)
             
             # Campo de texto para nuevo nombre
             new_name = st.text_input("Nuevo nombre:", key="new_genome_name", 
@@ -266,7 +350,7 @@ else:
             with col_rename:
                 if st.button("✏️ Renombrar"):
                     if new_name.strip():
-                        success, msg = st.session_state.ga.rename_genome(selected_filepath, new_name.strip())
+                        success, msg = st.session_state.ga.rename_genome(selected_id, new_name.strip())
                         if success:
                             st.success(msg)
                         else:
@@ -276,12 +360,16 @@ else:
             
             with col_delete:
                 if st.button("🗑️ Eliminar", type="secondary"):
-                    success, msg = st.session_state.ga.delete_genome(selected_filepath)
+                    success, msg = st.session_state.ga.delete_genome(selected_id)
                     if success:
                         st.success(msg)
                     else:
                         st.error(msg)
 
+# El modo manual (y apagar el segundo plano) vuelve al bucle de siempre
+if manual_mode or not background_mode:
+    stop_worker()
+
 if manual_mode and keyboard is None:
     st.sidebar.error("Librería 'keyboard' no instalada. Ejecuta: pip install keyboard")
 
@@ -311,71 +399,114 @@ with col_d1:
             "Barra Libre": BarraLibreObstacle
         }
         new_obs = obs_map[obs_to_spawn](SCREEN_WIDTH // 2) # Spawn in the middle for visibility
-        st.session_state.engine.obstacles.append(new_obs)
+        # add_obstacle busca la cola de obstáculos al correr (reset o Limpiar la cambian por otra)
+        run_on_sim(st.session_state.engine.add_obstacle, new_obs)
         st.session_state.render_trigger = time.time() # Force a render
 
 with col_d2:
     if st.button("🗑️ Limpiar"):
-        st.session_state.engine.clear_obstacles()
+        run_on_sim(st.session_state.engine.clear_obstacles)
         st.session_state.render_trigger = time.time()
 # -------------------------
 
 # Manual uploaders removed as per user request. Assets are loaded from assets/ directory.
 
 # Actualizamos los números en el Algoritmo Genético según lo que el usuario puso en la sidebar
-st.session_state.ga.set_params(pop_size, mutation_rate, selection_ratio, elitism)
+# (si el hilo está corriendo, se aplica entre dos frames para no cambiar la población a medio paso)
+run_on_sim(st.session_state.ga.set_params, pop_size, mutation_rate, selection_ratio, elitism)
+
+def ensure_engine_mode():
+    """Usa el motor vectorizado si se pidió (el modo manual siempre usa el motor normal)."""
+    engine_cls = VectorEngine if vector_mode and not manual_mode else Engine
+    if type(st.session_state.engine) is not engine_cls:
+        st.session_state.engine = engine_cls()
+
+def start_worker():
+    """Arranca (o reusa) el hilo de simulación con el engine, el GA y el cerebro de la sesión."""
+    engine_cls = VectorEngine if vector_mode else Engine
+    steps_per_second = None if unlimited_speed else 30 * sim_speed
+    worker = st.session_state.worker
+    if worker is not None and worker.is_alive() and type(worker.engine) is engine_cls:
+        worker.steps_per_second = steps_per_second
+        worker.checkpoint_every = CHECKPOINT_EVERY if auto_checkpoint else 0
+        return worker
+
+    stop_worker()
+    ensure_engine_mode()
+    # Si hay que empezar una generación nueva (o cambió el motor), el hilo la arma solo
+    brain = None if st.session_state.generation_complete else st.session_state.brain
+    st.session_state.generation_complete = False
+    worker = SimulationWorker(st.session_state.engine, st.session_state.ga, brain, steps_per_second,
+                              checkpoints=st.session_state.checkpoints,
+                              checkpoint_every=CHECKPOINT_EVERY if auto_checkpoint else 0)
+    worker.start()
+    st.session_state.worker = worker
+    return worker
 
 # --- BOTONES DE CONTROL ---
 col1, col2, col3, col4 = st.columns(4)
 with col1:
     if st.button("Start / Resume", key="start_btn"):
         st.session_state.running = True
+        ensure_engine_mode()
         
         # Enforce Manual Mode Setup
         if manual_mode:
             # If we are in manual mode but have wrong number of dinos or just switching
             if len(st.session_state.engine.dinos) != 1:
                 st.session_state.engine.reset(num_dinos=1)
-                st.session_state.networks = []
+                st.session_state.brain = None
                 st.session_state.generation_complete = False
         
-        elif st.session_state.generation_complete or len(st.session_state.engine.dinos) == 0:
+        elif st.session_state.worker is None and (st.session_state.generation_complete or
+                                                  len(st.session_state.engine.dinos) == 0):
             # Empezamos una nueva generación de IA
             genomes = st.session_state.ga.population
             st.session_state.engine.reset(num_dinos=len(genomes))
-            st.session_state.networks = [NeuralNetwork(g) for g in genomes]
+            st.session_state.brain = PopulationBrain(genomes)
             st.session_state.generation_complete = False
 
 with col2:
     if st.button("Pause"):
+        stop_worker()
         st.session_state.running = False
 
 with col3:
     if st.button("Reset All"):
+        stop_worker()
         st.session_state.engine = Engine()
         st.session_state.ga = GeneticAlgorithm()
         st.session_state.running = False
         st.session_state.generation_complete = False
-        st.session_state.networks = []
+        st.session_state.brain = None
         st.session_state.assets = {} # Reset to clear manual overrides?
+        sprite_cache.clear() # Los sprites escalados eran de los dibujos viejos
         # Re-load defaults? Simple way:
         st.cache_data.clear() # Maybe too aggressive. 
         # For now, just reset session state flags. User can refresh page to reload defaults.
 
 with col4:
     if st.button("Next Gen (Skip)"):
-        if not st.session_state.generation_complete:
+        if st.session_state.worker is not None:
+            # El hilo termina la generación entre dos frames
+            st.session_state.worker.skip_generation()
+        elif not st.session_state.generation_complete:
             # Saltamos a la siguiente generación manualmente
-            fitnesses = [d.fitness if hasattr(d, "fitness") else st.session_state.engine.distance_traveled for d in st.session_state.engine.dinos]
+            fitnesses = st.session_state.engine.get_fitnesses()
             st.session_state.ga.next_generation(fitnesses)
+            ensure_engine_mode()
             st.session_state.engine.reset(num_dinos=len(st.session_state.ga.population))
-            st.session_state.networks = [NeuralNetwork(g) for i, g in enumerate(st.session_state.ga.population)]
+            st.session_state.brain = PopulationBrain(st.session_state.ga.population)
 
 # --- DISEÑO DE LA PÁGINA (Juego a la izquierda, Stats a la derecha) ---
 game_col, stats_col = st.columns([2, 1])
 
 with game_col:
     game_placeholder = st.empty() # Espacio vacío donde pondremos el juego
+    if st.session_state.stream_server is not None:
+        # Con la transmisión prendida, el navegador pide el video directo al servidor MJPEG
+        game_placeholder.markdown(f'<img src="{st.session_state.stream_server.url}" width="100%">',
+                                  unsafe_allow_html=True)
     
 with stats_col:
     st.subheader("Estadísticas")
@@ -384,6 +515,7 @@ with stats_col:
     nn_count_text = st.empty()
     best_text = st.empty()
     curr_fit_text = st.empty()
+    sps_text = st.empty()
     
     st.subheader("Progreso de Fitness")
     chart_placeholder = st.empty()
@@ -392,10 +524,200 @@ with stats_col:
 with st.expander("Ver Red Neuronal del Mejor Agente"):
     graph_placeholder = st.empty()
 
+def update_shared_animations():
+    """
+    Avanza las animaciones compartidas (human_anim) con el tiempo real.
+    Devuelve el dt usado, o None si no hay animaciones cargadas.
+    """
+    if "human_anim" not in st.session_state.assets:
+        return None
+    # Calculate real dt for smooth animation
+    now = time.time()
+    # If last_time not in session (e.g. reload), init it
+    if 'last_time' not in st.session_state: st.session_state.last_time = now
+
+    anim_dt = now - st.session_state.last_time
+    st.session_state.last_time = now
+    # Cap dt to prevent huge jumps on lag
+    if anim_dt > 0.1: anim_dt = 0.1
+
+    with profiler.phase("animaciones"):
+        st.session_state.assets["human_anim"].update(anim_dt)
+    return anim_dt
+
+def render_world(world, surface, renderer):
+    """
+    Dibuja un engine (o una foto del hilo de simulación) y lo manda a la página.
+    Con el mismo renderer en cada frame solo se repinta lo que cambió (game/renderer.py).
+    """
+    # --- OPTIMIZACIÓN: Dibujar directo a la resolución que mandamos ---
+    # El lienzo ya es de STREAM_WIDTH x STREAM_HEIGHT (400x200): el renderer dibuja con
+    # sprites ya escalados, así que no hay que dibujar a 800x400 y luego reducir.
+    with profiler.phase("Engine.draw"):
+        world.draw(surface, st.session_state.assets, debug_mode, renderer)
+    show_surface(surface)
+
+def show_surface(surface):
+    """Manda el lienzo a la página sin copiarlo: pixels3d es una vista de los pixeles."""
+    encoder = st.session_state.encoder
+    if encoder is not None:
+        with profiler.phase("stream.push"):
+            encoder.push(surface)
+        if st.session_state.stream_server is not None:
+            return # El navegador ya ve el video MJPEG: no mandamos la imagen por Streamlit
+
+    # (W, H, C) -> (H, W, C) con transpose es otra vista, tampoco copia
+    with profiler.phase("surfarray.pixels3d"):
+        img_data = pygame.surfarray.pixels3d(surface).transpose(1, 0, 2)
+
+    # Mostramos la imagen en la web
+    with profiler.phase("imagen (JPEG + envío)"):
+        try:
+            # width="stretch" hará que se vea de nuevo en tamaño completo
+            game_placeholder.image(img_data, channels="RGB", output_format="JPEG", width="stretch")
+        except Exception:
+            pass
+    # Mientras exista la vista el lienzo queda bloqueado: hay que soltarla antes de dibujar otra vez
+    del img_data
+
+def draw_network_graph(best_genome):
+    """Dibuja el cerebro (Red Neuronal) de un genoma como un MLP por capas (Layered MLP Visualization)."""
+    with profiler.phase("red neuronal (matplotlib)"):
+        fig = plt.figure(figsize=(8, 6))
+        ax = fig.add_subplot(111)
+        ax.axis('off')
+
+        # Layout Config
+        layer_sizes = [INPUT_SIZE, HIDDEN_SIZE, OUTPUT_SIZE]
+        layer_names = ["Input", "Hidden", "Output"]
+        node_labels = [
+            ["DistX", "ObsY", "ObsW", "ObsH", "PlyY", "Spd"],
+            ["H1", "H2", "H3", "H4", "H5"],
+            ["Jump", "Crouch"]
+        ]
+
+        v_spacing = 1.0 / max(layer_sizes)
+        h_spacing = 0.8
+
+        # Node Positions
+        # Dict: (layer_idx, node_idx) -> (x, y)
+        positions = {}
+        for l in range(len(layer_sizes)):
+            n = layer_sizes[l]
+            x = l * h_spacing
+            for i in range(n):
+                # Center vertically
+                y = 0.5 + (n - 1) * v_spacing / 2.0 - i * v_spacing
+                positions[(l, i)] = (x, y)
+
+                # Draw Node
+                circle = plt.Circle((x, y), 0.04, color='skyblue', ec='black', zorder=4)
+                ax.add_patch(circle)
+                # Label
+                lbl = node_labels[l][i] if i < len(node_labels[l]) else ""
+                ax.text(x - 0.08 if l==0 else x + 0.08 if l==2 else x, y + 0.06, lbl, 
+                        ha='center', fontsize=8, zorder=5)
+
+        # Dibujamos las conexiones (pesos de las neuronas) strictly (Fully Connected)
+        # Input -> Hidden (W1)
+        w1 = best_genome.w1 #(Hidden, Input)
+        max_w = np.max(np.abs(w1)) if w1.size > 0 else 1.0
+
+        for i in range(INPUT_SIZE):
+            for h in range(HIDDEN_SIZE):
+                weight = w1[h, i]
+                # Alpha/Thickness based on magnitude
+                alpha = min(1.0, abs(weight) / max_w)
+                color = 'red' if weight < 0 else 'green'
+                linewidth = 0.5 + 2 * (abs(weight) / max_w)
+
+                p1 = positions[(0, i)]
+                p2 = positions[(1, h)]
+                ax.plot([p1[0], p2[0]], [p1[1], p2[1]], color=color, alpha=alpha, linewidth=linewidth, zorder=1)
+
+        # Hidden -> Output (W2)
+        w2 = best_genome.w2 # (Output, Hidden)
+        # We can re-calc max_w or use same scale. Let's re-calc strict per layer or global?
+        # Per layer is fine.
+        max_w2 = np.max(np.abs(w2)) if w2.size > 0 else 1.0
+
+        for h in range(HIDDEN_SIZE):
+            for o in range(OUTPUT_SIZE):
+                weight = w2[o, h]
+                alpha = min(1.0, abs(weight) / max_w2)
+                color = 'red' if weight < 0 else 'green'
+                linewidth = 0.5 + 2 * (abs(weight) / max_w2)
+
+                p1 = positions[(1, h)]
+                p2 = positions[(2, o)]
+                ax.plot([p1[0], p2[0]], [p1[1], p2[1]], color=color, alpha=alpha, linewidth=linewidth, zorder=1)
+
+        graph_placeholder.pyplot(fig)
+        plt.close(fig)
+
+def limit_display_rate(frame_start_time):
+    """Limitamos los FPS para no saturar al servidor de Streamlit, y cerramos el frame del perfilador."""
+    elapsed_frame = time.time() - frame_start_time
+    target_frame_time = 1.0 / 30.0
+    if elapsed_frame < target_frame_time:
+        with profiler.phase("sleep"):
+            time.sleep(target_frame_time - elapsed_frame)
+
+    # Cerramos el frame del perfilador y refrescamos su tabla de vez en cuando
+    profiler.end_frame()
+    if profile_mode and st.session_state.frame_count % 30 == 0:
+        profiler_panel.dataframe(pd.DataFrame(profiler.table()), hide_index=True)
+
+# --- BUCLE DE PANTALLA (con la simulación en segundo plano) ---
+# Aquí no simulamos nada: solo tomamos la última foto que publicó el hilo cuando nos toca dibujar.
+if st.session_state.running and background_mode and not manual_mode:
+    surface = pygame.Surface((STREAM_WIDTH, STREAM_HEIGHT))
+    renderer = LayeredRenderer()
+    worker = start_worker()
+    last_seq = None
+    last_generation = None
+
+    while st.session_state.running:
+        frame_start_time = time.time()
+
+        if worker.error is not None:
+            stop_worker()
+            st.session_state.running = False
+            st.error(f"La simulación se detuvo por un error: {worker.error}")
+            break
+
+        snapshot = worker.latest
+        if snapshot is not None and snapshot["seq"] != last_seq:
+            last_seq = snapshot["seq"]
+            update_shared_animations()
+            render_world(snapshot["world"], surface, renderer)
+
+            st.session_state.frame_count += 1
+            if st.session_state.frame_count % 5 == 0:
+                with profiler.phase("estadísticas"):
+                    gen_text.metric("Generación", snapshot["generation"])
+                    alive_text.metric("Agentes Vivos", snapshot["alive"])
+                    nn_count_text.metric("Redes Neuronales Activas", snapshot["networks"])
+                    best_text.metric("Mejor Histórico", f"{int(snapshot['global_best'])}")
+                    curr_fit_text.metric("Fitness Actual", f"{int(snapshot['distance'])}")
+                    sps_text.metric("Pasos de Simulación / s", f"{int(snapshot['steps_per_second'])}")
+
+            # Gráfica y cerebro solo cuando cambia la generación
+            if snapshot["generation"] != last_generation:
+                last_generation = snapshot["generation"]
+                with profiler.phase("gráfica de fitness"):
+                    if snapshot["history"]:
+                        df = pd.DataFrame(snapshot["history"])
+                        chart_placeholder.line_chart(df.set_index("gen"))
+                draw_network_graph(snapshot["best_genome"])
+
+        limit_display_rate(frame_start_time)
+
 # --- BUCLE PRINCIPAL DEL JUEGO (Game Loop) ---
-if st.session_state.running:
+elif st.session_state.running:
     # Creamos un lienzo de Pygame del tamaño de la pantalla
-    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    surface = pygame.Surface((STREAM_WIDTH, STREAM_HEIGHT))
+    renderer = LayeredRenderer() # Recuerda qué pintó en el lienzo para no repintarlo todo
     
     while st.session_state.running:
         frame_start_time = time.time()
@@ -405,15 +727,11 @@ if st.session_state.running:
         for _ in range(sim_speed):
             if not st.session_state.running: break
             
-            # 1. Obtenemos el estado actual del juego (dónde están los obstáculos)
-            state = st.session_state.engine.get_game_state()
-            obs = state["next_obstacle"]
-            
-            # 2. Decisión de la IA (o control manual)
+            # 1 y 2. Decisión de la IA (o control manual)
             if manual_mode and keyboard:
                  # CONTROL MANUAL CON TECLADO
                  for dino in st.session_state.engine.dinos:
-                     if getattr(dino, "dead", False): continue
+                     if dino.dead: continue
                      
                      if keyboard.is_pressed('up') or keyboard.is_pressed('space') or keyboard.is_pressed('w'):
                          dino.jump()
@@ -423,247 +741,95 @@ if st.session_state.running:
                      else:
                          dino.stop_crouch()
                          
-            elif st.session_state.networks and len(st.session_state.networks) == len(st.session_state.engine.dinos):
+            elif st.session_state.brain is not None and len(st.session_state.brain) == len(st.session_state.engine.dinos):
                 # CONTROL POR IA (Redes Neuronales)
-                # 2. Strict Input Definition (6 Normalized Features)
-                # DistanceX_norm, ObsY_norm, ObsW_norm, ObsH_norm, PlayerY_norm, Speed_norm
-                
-                # Recolectamos lo que la IA "ve" (inputs)
-                dist_x = 0
-                obs_y = 0
-                obs_w = 0
-                obs_h = 0
-                
-                if obs:
-                    # distanceX = (ox - (px + pw))
-                    # We assume dino is at PLAYER_X. ox is obs.x (left edge).
-                    # Dino width is PLAYER_WIDTH (approx).
-                    # IMPORTANTE: Usamos obs.rect (hitbox) en lugar de obs.x/y/width/height (visual)
-                    # Esto hace que la IA "vea" el peligro real, no la imagen
-                    dist_raw = obs.rect.x - (PLAYER_X + PLAYER_WIDTH)
-                    dist_x = max(0, dist_raw)
-                    obs_y = obs.rect.y        # Posición Y del HITBOX (donde realmente te mata)
-                    obs_w = obs.rect.width    # Ancho del HITBOX
-                    obs_h = obs.rect.height   # Alto del HITBOX
-                else:
-                    # Null obstacle
-                    dist_x = WORLD_W # Max distance
-                    obs_y = GROUND_Y # En el suelo
-                    obs_w = 0
-                    obs_h = 0
-
-                # Normalizamos los datos para que la IA entienda mejor (entre 0 y 1)
-                inputs = np.zeros(INPUT_SIZE) # Size 6
-                inputs[0] = np.clip(dist_x / WORLD_W, 0, 1) # DistX
-                inputs[1] = np.clip(obs_y / WORLD_H, 0, 1)  # ObsY
-                inputs[2] = np.clip(obs_w / WORLD_W, 0, 1)  # ObsW
-                inputs[3] = np.clip(obs_h / WORLD_H, 0, 1)  # ObsH
-                
-                # PlayerY and Speed are per dino / global
-                norm_speed = np.clip((state["speed"] - SPEED_MIN) / (SPEED_MAX - SPEED_MIN), 0, 1)
-                inputs[5] = norm_speed # Speed is idx 5
-                
-                # Cada dino procesa sus propios datos
-                for i, dino in enumerate(st.session_state.engine.dinos):
-                    if getattr(dino, "dead", False): continue
-                    
-                    inputs[4] = np.clip(dino.y / WORLD_H, 0, 1) # PlayerY is idx 4
-                    
-                    # Activamos la Red Neuronal (Returns [p_jump, p_crouch])
-                    preds = st.session_state.networks[i].activate(inputs)
-                    
-                    # Si la neurona dice que salte o se agache, lo hace
-                    jump = preds[0] > JUMP_THRESHOLD
-                    crouch = preds[1] > CROUCH_THRESHOLD
-                    
-                    if jump:
-                        dino.jump()
-                    
-                    if crouch:
-                        dino.crouch()
-                    else:
-                        dino.stop_crouch()
+                # 6 entradas normalizadas: DistX, ObsY, ObsW, ObsH, PlayerY, Speed
+                # --- OPTIMIZACIÓN: Una sola pasada de la red para TODOS los agentes vivos ---
+                # Antes llamábamos a activate() dino por dino; ahora el engine nos da la matriz
+                # (vivos x 6) ya normalizada y el PopulationBrain decide por todos con una multiplicación.
+                engine = st.session_state.engine
+                alive = engine.alive_indices()
+                if len(alive):
+                    with profiler.phase("entradas"):
+                        inputs = engine.get_observations(alive)
+                    with profiler.phase("red neuronal"):
+                        jump, crouch = st.session_state.brain.decide(inputs, alive)
+                    # Aplicamos las máscaras de golpe (saltar / agacharse)
+                    with profiler.phase("acciones"):
+                        engine.apply_actions(alive, jump, crouch)
             
             # 3. Actualizamos el motor (físicas, colisiones, etc.)
-            st.session_state.engine.update()
+            with profiler.phase("Engine.update"):
+                st.session_state.engine.update()
             
             if st.session_state.engine.game_over:
                  break
         
         # 3.5 Actualizamos animaciones (Once per render frame)
-        if "human_anim" in st.session_state.assets:
-             # Calculate real dt for smooth animation
-             now = time.time()
-             # If last_time not in session (e.g. reload), init it
-             if 'last_time' not in st.session_state: st.session_state.last_time = now
-             
-             anim_dt = now - st.session_state.last_time
-             st.session_state.last_time = now
-             # Cap dt to prevent huge jumps on lag
-             if anim_dt > 0.1: anim_dt = 0.1
-             
-             st.session_state.assets["human_anim"].update(anim_dt)
-             
+        anim_dt = update_shared_animations()
+        if anim_dt is not None:
              # Also update per-dino animations (coachwalk)
-             for dino in st.session_state.engine.dinos:
-                 if not getattr(dino, "dead", False):
-                     # We can add a method to dino to handle its own animation state
-                     if hasattr(dino, "update_animation"):
-                        dino.update_animation(anim_dt)
+             # Solo los que se dibujan (en VectorEngine los demás no tienen el estado al día)
+             for dino in st.session_state.engine.visible_dinos():
+                 # We can add a method to dino to handle its own animation state
+                 if hasattr(dino, "update_animation"):
+                    dino.update_animation(anim_dt)
         
-        # 4. Dibujamos todo en el lienzo
-        st.session_state.engine.draw(surface, st.session_state.assets, debug_mode)
-        
-        # --- OPTIMIZACIÓN: Reducir resolución para Streamlit ---
-        # Enviamos una imagen más pequeña (400x200) y dejamos que el navegador la estire.
-        # Esto ahorra mucho ancho de banda y procesamiento en el navegador.
-        surface_small = pygame.transform.scale(surface, (400, 200))
-        
-        # Convertimos el dibujo de Pygame a algo que Streamlit pueda mostrar
-        # Usamos array3d sobre la imagen pequeña
-        img_data = pygame.surfarray.array3d(surface_small)
-        img_data = img_data.transpose([1, 0, 2]) # (W, H, C) -> (H, W, C)
-        
-        # Mostramos la imagen en la web
-        try:
-            # width="stretch" hará que se vea de nuevo en tamaño completo
-            game_placeholder.image(img_data, channels="RGB", output_format="JPEG", width="stretch")
-        except Exception:
-            pass
+        # 4. Dibujamos todo en el lienzo y lo mandamos al navegador
+        render_world(st.session_state.engine, surface, renderer)
         
         # Actualizamos los textos de estadísticas cada 5 frames para no saturar Streamlit
         st.session_state.frame_count += 1
         if st.session_state.frame_count % 5 == 0:
-            alive_count = sum(1 for d in st.session_state.engine.dinos if not getattr(d, "dead", False))
-            gen_text.metric("Generación", st.session_state.ga.generation)
-            alive_text.metric("Agentes Vivos", alive_count)
-            nn_count_text.metric("Redes Neuronales Activas", len(st.session_state.networks))
-            best_text.metric("Mejor Histórico", f"{int(st.session_state.ga.global_best_fitness)}")
-            curr_fit_text.metric("Fitness Actual", f"{int(st.session_state.engine.distance_traveled)}")
+            with profiler.phase("estadísticas"):
+                alive_count = st.session_state.engine.count_alive()
+                gen_text.metric("Generación", st.session_state.ga.generation)
+                alive_text.metric("Agentes Vivos", alive_count)
+                nn_count_text.metric("Redes Neuronales Activas", len(st.session_state.brain) if st.session_state.brain else 0)
+                best_text.metric("Mejor Histórico", f"{int(st.session_state.ga.global_best_fitness)}")
+                curr_fit_text.metric("Fitness Actual", f"{int(st.session_state.engine.distance_traveled)}")
         
         # Si todos murieron o se acabó el tiempo, pasamos a la siguiente generación
         if st.session_state.engine.game_over:
             if manual_mode:
                 # Just reset for another run
                 st.session_state.engine.reset(num_dinos=1)
-                st.session_state.networks = []
+                st.session_state.brain = None
                 time.sleep(1)
             else:
                 # ¡Evolución! Los mejores tienen hijos, los peores se van. (AI Mode)
-                fitnesses = [d.fitness for d in st.session_state.engine.dinos]
-                st.session_state.ga.next_generation(fitnesses)
+                with profiler.phase("next_generation"):
+                    fitnesses = st.session_state.engine.get_fitnesses()
+                    st.session_state.ga.next_generation(fitnesses)
+                if auto_checkpoint and (st.session_state.ga.generation - 1) % CHECKPOINT_EVERY == 0:
+                    st.session_state.checkpoints.save(st.session_state.ga)
                 
                 # Dibujamos la gráfica de progreso
-                if st.session_state.ga.history:
-                    df = pd.DataFrame(st.session_state.ga.history)
-                    chart_placeholder.line_chart(df.set_index("gen"))
-                
-                # --- OPTIMIZACIÓN: Limpiamos cachés de sprites viejos ---
-                # Los dinos de la generación anterior tenían sprites en memoria
-                # que ya no necesitamos. Esto evita fugas de memoria.
-                for old_dino in st.session_state.engine.dinos:
-                    if hasattr(old_dino, "_sprite_cache"):
-                        old_dino._sprite_cache.clear()
+                with profiler.phase("gráfica de fitness"):
+                    if st.session_state.ga.history:
+                        df = pd.DataFrame(st.session_state.ga.history)
+                        chart_placeholder.line_chart(df.set_index("gen"))
                 
                 # Reseteamos el juego con la nueva población
+                ensure_engine_mode()
                 genomes = st.session_state.ga.population
                 st.session_state.engine.reset(num_dinos=len(genomes))
-                st.session_state.networks = [NeuralNetwork(g) for g in genomes]
-                
-                best_genome = st.session_state.ga.population[0]
-
-                
-                # Dibujamos el cerebro (Red Neuronal) del mejor de esta ronda (Layered MLP Visualization)
-                best_genome = st.session_state.ga.population[0]
+                st.session_state.brain = PopulationBrain(genomes)
                 
-                fig = plt.figure(figsize=(8, 6))
-                ax = fig.add_subplot(111)
-                ax.axis('off')
-                
-                # Layout Config
-                layer_sizes = [INPUT_SIZE, HIDDEN_SIZE, OUTPUT_SIZE]
-                layer_names = ["Input", "Hidden", "Output"]
-                node_labels = [
-                    ["DistX", "ObsY", "ObsW", "ObsH", "PlyY", "Spd"],
-                    ["H1", "H2", "H3", "H4", "H5"],
-                    ["Jump", "Crouch"]
-                ]
-                
-                v_spacing = 1.0 / max(layer_sizes)
-                h_spacing = 0.8
-                
-                # Node Positions
-                # Dict: (layer_idx, node_idx) -> (x, y)
-                positions = {}
-                for l in range(len(layer_sizes)):
-                    n = layer_sizes[l]
-                    x = l * h_spacing
-                    for i in range(n):
-                        # Center vertically
-                        y = 0.5 + (n - 1) * v_spacing / 2.0 - i * v_spacing
-                        positions[(l, i)] = (x, y)
-                        
-                        # Draw Node
-                        circle = plt.Circle((x, y), 0.04, color='skyblue', ec='black', zorder=4)
-                        ax.add_patch(circle)
-                        # Label
-                        lbl = node_labels[l][i] if i < len(node_labels[l]) else ""
-                        ax.text(x - 0.08 if l==0 else x + 0.08 if l==2 else x, y + 0.06, lbl, 
-                                ha='center', fontsize=8, zorder=5)
-
-                # Dibujamos las conexiones (pesos de las neuronas) strictly (Fully Connected)
-                # Input -> Hidden (W1)
-                w1 = best_genome.w1 #(Hidden, Input)
-                max_w = np.max(np.abs(w1)) if w1.size > 0 else 1.0
-                
-                for i in range(INPUT_SIZE):
-                    for h in range(HIDDEN_SIZE):
-                        weight = w1[h, i]
-                        # Alpha/Thickness based on magnitude
-                        alpha = min(1.0, abs(weight) / max_w)
-                        color = 'red' if weight < 0 else 'green'
-                        linewidth = 0.5 + 2 * (abs(weight) / max_w)
-                        
-                        p1 = positions[(0, i)]
-                        p2 = positions[(1, h)]
-                        ax.plot([p1[0], p2[0]], [p1[1], p2[1]], color=color, alpha=alpha, linewidth=linewidth, zorder=1)
-
-                # Hidden -> Output (W2)
-                w2 = best_genome.w2 # (Output, Hidden)
-                # We can re-calc max_w or use same scale. Let's re-calc strict per layer or global?
-                # Per layer is fine.
-                max_w2 = np.max(np.abs(w2)) if w2.size > 0 else 1.0
-                
-                for h in range(HIDDEN_SIZE):
-                    for o in range(OUTPUT_SIZE):
-                        weight = w2[o, h]
-                        alpha = min(1.0, abs(weight) / max_w2)
-                        color = 'red' if weight < 0 else 'green'
-                        linewidth = 0.5 + 2 * (abs(weight) / max_w2)
-                        
-                        p1 = positions[(1, h)]
-                        p2 = positions[(2, o)]
-                        ax.plot([p1[0], p2[0]], [p1[1], p2[1]], color=color, alpha=alpha, linewidth=linewidth, zorder=1)
-
-                graph_placeholder.pyplot(fig)
-                plt.close(fig)
+                # Dibujamos el cerebro (Red Neuronal) del mejor de esta ronda
+                draw_network_graph(st.session_state.ga.population[0])
     
                 time.sleep(1)
         
         # Limitamos los FPS para no saturar al servidor de Streamlit
-        elapsed_frame = time.time() - frame_start_time
-        target_frame_time = 1.0 / 30.0
-        if elapsed_frame < target_frame_time:
-            time.sleep(target_frame_time - elapsed_frame)
+        limit_display_rate(frame_start_time)
         
 else:
     # --- REAL-TIME PREVIEW WHEN PAUSED (New) ---
     # Si el juego está en pausa, mostramos una imagen estática
-    surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    surface = pygame.Surface((STREAM_WIDTH, STREAM_HEIGHT))
     st.session_state.engine.draw(surface, st.session_state.assets, debug_mode)
-    img_data = pygame.surfarray.array3d(surface)
-    img_data = img_data.transpose([1, 0, 2])
-    game_placeholder.image(img_data, channels="RGB", output_format="JPEG", width="stretch")
+    show_surface(surface)
     # ------------------------------------------
     
     # Use a separate info call so it doesn't overwrite the image
@@ -7,6 +7,14 @@
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 400
 FPS = 60 # Cuadros por segundo para que se vea fluido
+# Tamaño de la imagen que mandamos al navegador (el navegador la estira)
+STREAM_WIDTH = 400
+STREAM_HEIGHT = 200
+# Transmisión MJPEG del juego (game/streaming.py)
+STREAM_FPS = 30 # Frames por segundo que se codifican
+STREAM_QUALITY = 80 # Calidad del JPEG (1-95)
+STREAM_HOST = "127.0.0.1"
+STREAM_PORT = 8765
 
 # Físicas del juego (Para que el salto se sienta real)
 GRAVITY = 0.8
@@ -49,6 +57,9 @@ WORLD_H = SCREEN_HEIGHT
 SPEED_MIN = INITIAL_GAME_SPEED
 SPEED_MAX = 20 # El tope de velocidad para los cálculos
 
+# Checkpoints de toda la población (ai/checkpoint.py)
+CHECKPOINT_EVERY = 10 # Cada cuántas generaciones se guarda uno automático
+
 # Pesos del Algoritmo Genético
 W_MAX = 2.0 # Rango máximo de los pesos de las neuronas
 MUTATION_STD = 0.5 # Qué tanto ruido le metemos al mutar (ruido gaussiano)
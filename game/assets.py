@@ -5,11 +5,502 @@
 import pygame
 import json
 import os
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
 from PIL import Image, ImageFilter
+from config import *
 from game.spritesheet import SpriteSheet
 from game.animation import Animation
 
+# Imágenes sueltas del juego (clave en el diccionario de assets -> archivo en assets/)
+ASSET_FILES = {
+    "dino": "dino.png",
+    # "dino_run1": "dino_run1.png", # Deprecated if spritesheet exists
+    # "dino_run2": "dino_run2.png", 
+    "dino_jump": "dino_jump.png",
+    "car_0": "car_0.png",
+    "car_1": "car_1.png",
+    "car_2": "car_2.png",
+    "car_3": "car_3.png",
+    "car_4": "car_4.png",
+    "dron": "dron.png",
+    "cone": "cone.png",
+    "beach_ball": "beach_ball.png",
+    "cooler": "cooler.png",
+    "dumbbell": "dumbbell.png",
+    "surfboard": "surfboard.png",
+    "dumbbell_box": "dumbbell_box.png",
+    "ground": "ground.png",
+    "beach_net": "beach_net.png",
+    "bar_crouch": "bar_crouch.png"
+}
+
+# Tope de memoria para los sprites ya escalados (bytes). Sobra para todos los tamaños del juego.
+SPRITE_CACHE_BYTES = 64 * 1024 * 1024
+
+class SpriteCache:
+    """
+    Caché global de sprites ya escalados, compartida por todos los obstáculos y dinos.
+    La llave es (clave del asset, tamaño): cada dibujo se escala UNA vez por tamaño
+    y después todos los que lo usan reciben la misma Surface, sin volver a escalar.
+    Si pasamos de max_bytes, sacamos los que llevan más tiempo sin usarse (LRU).
+    """
+    def __init__(self, max_bytes=SPRITE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict() # (key, size) -> (original, escalado, bytes)
+
+    def get(self, key, source, size):
+        """Devuelve `source` escalado a `size`, escalándolo solo si no estaba ya en la caché."""
+        # Los sprites del atlas ya vienen al tamaño del juego: no hay nada que escalar
+        if source.get_size() == size:
+            return source
+        entry_key = (key, size)
+        entry = self._entries.get(entry_key)
+        # Si recargaron los assets, la misma clave apunta a otro dibujo: lo escalamos de nuevo
+        if entry is not None and entry[0] is source:
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        scaled = pygame.transform.scale(source, size)
+        nbytes = scaled.get_pitch() * scaled.get_height()
+        if entry is not None:
+            self.bytes -= entry[2]
+        self._entries[entry_key] = (source, scaled, nbytes)
+        self._entries.move_to_end(entry_key)
+        self.bytes += nbytes
+        # Nunca sacamos el que acabamos de meter (aunque solo él ya pase del tope)
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, _, old_bytes) = self._entries.popitem(last=False)
+            self.bytes -= old_bytes
+            self.evictions += 1
+        return scaled
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+# La caché que usan Obstacle.draw y Dino.draw
+sprite_cache = SpriteCache()
+
+def scale_rect(rect, scale):
+    """El mismo rect en una pantalla escalada (scale = 0.5 -> la mitad de 800x400)."""
+    if scale == 1:
+        return rect
+    return pygame.Rect(int(rect.x * scale), int(rect.y * scale), int(rect.width * scale), int(rect.height * scale))
+
+# --- CACHÉ DE ASSETS PREPROCESADOS ---
+# tools/generate_spritesheet.py deja aquí (dentro de assets/) los dibujos ya reducidos,
+# desenfocados y escalados, más un manifest.json con el tamaño y la fecha de cada original.
+# Si un original cambia, ese asset se vuelve a procesar desde el original al arrancar.
+ASSET_CACHE_DIR = ".cache"
+CACHE_MANIFEST = "manifest.json"
+CACHE_VERSION = 1 # Súbelo si cambia cómo procesamos los dibujos (invalida toda la caché)
+
+# Atlas: todos los sprites de obstáculos y del jugador, ya al tamaño del juego, empacados
+# en una sola imagen con su índice en el formato de SpriteSheet (también en assets/.cache).
+ATLAS_IMAGE = "atlas.png"
+ATLAS_INDEX = "atlas.json"
+# Escalas a las que se arma el atlas: la del mundo (800x400) y la del lienzo que manda app.py.
+# Con el atlas a la escala de la pantalla, los sprites se pegan tal cual, sin volver a escalarlos.
+ATLAS_SCALES = (1.0, STREAM_WIDTH / SCREEN_WIDTH)
+# Assets que se dibujan a su propio tamaño (no al de un obstáculo o del jugador):
+# a otra escala hay que multiplicar su tamaño (ver AssetRegistry y scale_asset)
+NATIVE_SIZE_ASSETS = ("human_anim", "coachwalk", "ground")
+
+def atlas_files(scale=1.0):
+    """(imagen, índice) del atlas de esa escala. El de escala 1 conserva los nombres de siempre."""
+    if scale == 1:
+        return ATLAS_IMAGE, ATLAS_INDEX
+    return f"atlas_x{scale:g}.png", f"atlas_x{scale:g}.json"
+
+def scaled_size(surface, scale):
+    return (int(surface.get_width() * scale), int(surface.get_height() * scale))
+
+def scale_asset(value, scale):
+    """Una imagen, lista de frames o Animation con todos sus frames escalados por `scale`."""
+    if scale == 1:
+        return value
+    if isinstance(value, pygame.Surface):
+        return pygame.transform.scale(value, scaled_size(value, scale))
+    if isinstance(value, Animation):
+        return Animation([scale_asset(frame, scale) for frame in value.frames], fps=value.fps, loop=value.loop)
+    return [scale_asset(frame, scale) for frame in value]
+
+def asset_scale(assets):
+    """A qué escala vienen los NATIVE_SIZE_ASSETS de `assets` (1 = tamaño del mundo)."""
+    return getattr(assets, "scale", 1.0)
+
+# Fondos del juego (nombre -> archivo en assets/)
+BACKGROUND_FILES = {
+    "sunrise": "background_sunrise.png",
+    "sunset": "background_sunset.png",
+    "night": "background_night.png"
+}
+
+class AssetRegistry(Mapping):
+    """
+    Diccionario de assets "perezoso": se usa igual que el de load_all() (Engine.draw no
+    nota la diferencia), pero cada dibujo se carga la primera vez que alguien lo pide.
+    Saber qué hay (len, iterar) solo revisa que existan los archivos, sin abrir ninguno.
+    Con prefetch() se van cargando todos en un hilo aparte mientras el juego ya corre.
+    scale: a qué escala se va a dibujar (ver LayeredRenderer). Usa el atlas de esa escala,
+    y lo que no venga de él y se dibuje a su propio tamaño (NATIVE_SIZE_ASSETS) se escala al cargarlo.
+    """
+    def __init__(self, assets_dir, use_cache=True, scale=1.0):
+        self.assets_dir = assets_dir
+        self.use_cache = use_cache
+        self.scale = scale
+        self.sources = AssetManager.asset_sources(assets_dir) if os.path.exists(assets_dir) else {}
+        # Solo los que tienen todos sus originales en disco
+        self._available = [key for key, paths in self.sources.items()
+                           if AssetManager.source_signature(assets_dir, paths) is not None]
+        if "dino_run" in self._available and "dino" not in self._available:
+            self._available.insert(self._available.index("dino_run") + 1, "dino")
+        self._loaded = {}
+        self._missing = set() # Los que fallaron al cargar (no los volvemos a intentar)
+        self._atlas_tried = not use_cache
+        self._lock = threading.RLock() # Para que el hilo de prefetch y el dibujo no carguen lo mismo dos veces
+        self._prefetch_thread = None
+
+    def __getitem__(self, key):
+        value = self._load(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        # Engine.draw pregunta "in" antes de usar un asset: ese es el momento de cargarlo
+        return self._load(key) is not None
+
+    def __iter__(self):
+        return (key for key in self._available if key not in self._missing)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def is_loaded(self, key):
+        return key in self._loaded
+
+    def _load(self, key):
+        with self._lock:
+            if key in self._loaded:
+                return self._loaded[key]
+            if key in self._missing or key not in self._available:
+                return None
+
+            value = None
+            if key == "dino" and "dino_run" in self._available:
+                # Use first frame as default static dino if not present
+                frames = self._load("dino_run")
+                if frames:
+                    value = frames[0]
+            if value is None and not self._atlas_tried:
+                # El atlas es un solo archivo: de una vez nos deja listos todos sus sprites
+                self._atlas_tried = True
+                self._loaded.update(AssetManager.load_atlas(self.assets_dir, self.sources, self.scale))
+                value = self._loaded.get(key)
+            if value is None and key in self.sources:
+                if self.use_cache:
+                    value = AssetManager.load_cache(self.assets_dir, {key: self.sources[key]}).get(key)
+                if not value:
+                    value = AssetManager.load_original(key, self.assets_dir)
+                if value and key in NATIVE_SIZE_ASSETS:
+                    value = scale_asset(value, self.scale)
+
+            if value:
+                self._loaded[key] = value
+                return value
+            self._missing.add(key)
+            return None
+
+    def prefetch(self, keys=None):
+        """Carga los assets (todos, o los de `keys`) en un hilo de fondo. Devuelve el hilo."""
+        if self._prefetch_thread is not None and self._prefetch_thread.is_alive():
+            return self._prefetch_thread
+        keys = list(self._available if keys is None else keys)
+
+        def run():
+            for key in keys:
+                self._load(key)
+
+        self._prefetch_thread = threading.Thread(target=run, name="AssetPrefetch", daemon=True)
+        self._prefetch_thread.start()
+        return self._prefetch_thread
+
 class AssetManager:
+    @staticmethod
+    def load_lazy(assets_dir, use_cache=True, prefetch=False, scale=1.0):
+        """
+        Como load_all(), pero sin cargar nada todavía (ver AssetRegistry).
+        prefetch=True empieza a cargarlos en segundo plano de una vez.
+        scale: escala a la que se van a dibujar (para usar el atlas de esa escala).
+        """
+        registry = AssetRegistry(assets_dir, use_cache, scale)
+        if prefetch:
+            registry.prefetch()
+        return registry
+
+    @staticmethod
+    def load_all(assets_dir, use_cache=True):
+        """
+        Carga TODOS los dibujos del juego (animaciones, fondos y obstáculos)
+        y los devuelve en un diccionario listo para Engine.draw().
+        Si hay caché preprocesada al día (ver build_cache) la usamos; lo que falte
+        o esté viejo se carga de los originales como siempre.
+        """
+        assets = {}
+        if not os.path.exists(assets_dir):
+            return assets
+
+        sources = AssetManager.asset_sources(assets_dir)
+        cached = {}
+        if use_cache:
+            # Primero el atlas (un solo archivo) y de la caché solo lo que el atlas no trae
+            cached = AssetManager.load_atlas(assets_dir, sources)
+            rest = {key: paths for key, paths in sources.items() if key not in cached}
+            cached.update(AssetManager.load_cache(assets_dir, rest))
+
+        # El orden importa: 1. animaciones del Dino, 1.5 humano, 1.6 fondos,
+        # 1.7 "coachwalk" y 2. las imágenes sueltas de los obstáculos
+        for key in sources:
+            # Don't overwrite if spritesheet already provided dino static
+            if key == "dino" and "dino" in assets:
+                continue
+            value = cached[key] if key in cached else AssetManager.load_original(key, assets_dir)
+            if value:
+                assets[key] = value
+                if key == "dino_run":
+                    # Use first frame as default static dino if not present
+                    assets["dino"] = value[0]
+
+        return assets
+
+    @staticmethod
+    def asset_sources(assets_dir):
+        """
+        Qué archivos originales usa cada asset: {clave: [rutas relativas a assets_dir]}.
+        Sirve para saber si la caché sigue al día. Devuelve las claves en el orden de carga.
+        """
+        sources = {}
+        spritesheet_json = "dino_run_spritesheet.json"
+        if os.path.exists(os.path.join(assets_dir, spritesheet_json)):
+            try:
+                with open(os.path.join(assets_dir, spritesheet_json), 'r') as f:
+                    image_filename = json.load(f).get("image")
+                sources["dino_run"] = [spritesheet_json, image_filename]
+            except Exception:
+                sources["dino_run"] = [spritesheet_json]
+
+        sources["human_anim"] = [os.path.join("sprites_human", "spritesheet.png"),
+                                 os.path.join("sprites_human", "spritesheet.json")]
+        sources["backgrounds"] = list(BACKGROUND_FILES.values())
+
+        coachwalk_dir = os.path.join("player", "coachwalk")
+        if os.path.exists(os.path.join(assets_dir, coachwalk_dir)):
+            sources["coachwalk"] = [os.path.join(coachwalk_dir, f)
+                                    for f in sorted(os.listdir(os.path.join(assets_dir, coachwalk_dir)))
+                                    if f.endswith(".png")]
+        else:
+            sources["coachwalk"] = [coachwalk_dir]
+
+        for key, filename in ASSET_FILES.items():
+            if os.path.exists(os.path.join(assets_dir, filename)):
+                sources[key] = [filename]
+        return sources
+
+    @staticmethod
+    def load_original(key, assets_dir):
+        """Carga (y procesa) un asset desde sus archivos originales."""
+        if key == "dino_run":
+            return AssetManager.load_spritesheet(os.path.join(assets_dir, "dino_run_spritesheet.json"), assets_dir)
+        if key == "human_anim":
+            return AssetManager.load_human_animation(assets_dir)
+        if key == "backgrounds":
+            return AssetManager.load_backgrounds(assets_dir)
+        if key == "coachwalk":
+            return AssetManager.load_coachwalk_animation(assets_dir)
+        return AssetManager.load_image(os.path.join(assets_dir, ASSET_FILES[key]))
+
+    @staticmethod
+    def source_signature(assets_dir, paths):
+        """{ruta: [tamaño, fecha]} de los originales, o None si falta alguno."""
+        signature = {}
+        for path in paths:
+            try:
+                stat = os.stat(os.path.join(assets_dir, path))
+            except OSError:
+                return None
+            signature[path.replace(os.sep, "/")] = [stat.st_size, stat.st_mtime_ns]
+        return signature
+
+    @staticmethod
+    def build_cache(assets_dir, sources=None):
+        """
+        Procesa todos los originales (lo lento: PIL, Lanczos, desenfoque, escalados) y guarda
+        el resultado ya listo para el juego en assets_dir/.cache, con su manifest.json.
+        Devuelve el manifest.
+        """
+        cache_dir = os.path.join(assets_dir, ASSET_CACHE_DIR)
+        os.makedirs(cache_dir, exist_ok=True)
+        if sources is None:
+            sources = AssetManager.asset_sources(assets_dir)
+
+        entries = {}
+        for key, paths in sources.items():
+            signature = AssetManager.source_signature(assets_dir, paths)
+            if signature is None:
+                continue # Faltan originales: en el juego se avisa al cargarlo
+            value = AssetManager.load_original(key, assets_dir)
+            if not value:
+                continue
+
+            entry = {"sources": signature}
+            if isinstance(value, pygame.Surface):
+                entry["kind"] = "image"
+                surfaces = {key: value}
+            elif isinstance(value, Animation):
+                entry.update(kind="animation", fps=value.fps, loop=value.loop)
+                surfaces = {f"{key}_{i}": frame for i, frame in enumerate(value.frames)}
+            elif isinstance(value, dict):
+                entry["kind"] = "dict"
+                surfaces = {f"{key}_{name}": surf for name, surf in value.items()}
+            else:
+                entry["kind"] = "frames"
+                surfaces = {f"{key}_{i}": frame for i, frame in enumerate(value)}
+
+            entry["files"] = []
+            for name, surf in surfaces.items():
+                filename = f"{name}.png"
+                pygame.image.save(surf, os.path.join(cache_dir, filename))
+                entry["files"].append({"file": filename, "alpha": bool(surf.get_flags() & pygame.SRCALPHA)})
+            if entry["kind"] == "dict":
+                for file_entry, name in zip(entry["files"], value):
+                    file_entry["name"] = name
+            entries[key] = entry
+
+        manifest = {"version": CACHE_VERSION, "assets": entries}
+        # Escribimos el manifest al final (y de golpe) para que nunca apunte a archivos a medias
+        tmp_path = os.path.join(cache_dir, CACHE_MANIFEST + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(cache_dir, CACHE_MANIFEST))
+        return manifest
+
+    @staticmethod
+    def load_cache(assets_dir, sources=None):
+        """
+        Carga de assets_dir/.cache los assets cuyos originales no cambiaron desde build_cache.
+        Devuelve {clave: asset} solo con los que estaban al día (puede estar vacío).
+        """
+        cache_dir = os.path.join(assets_dir, ASSET_CACHE_DIR)
+        manifest_path = os.path.join(cache_dir, CACHE_MANIFEST)
+        if not os.path.exists(manifest_path):
+            return {}
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            print(f"Error al leer la caché de assets {manifest_path}: {e}")
+            return {}
+        if manifest.get("version") != CACHE_VERSION:
+            return {}
+        if sources is None:
+            sources = AssetManager.asset_sources(assets_dir)
+
+        cached = {}
+        stale = []
+        for key, paths in sources.items():
+            entry = manifest["assets"].get(key)
+            if entry is None:
+                continue
+            if entry["sources"] != AssetManager.source_signature(assets_dir, paths):
+                stale.append(key)
+                continue
+            try:
+                surfaces = []
+                for file_entry in entry["files"]:
+                    surf = pygame.image.load(os.path.join(cache_dir, file_entry["file"]))
+                    surfaces.append(surf.convert_alpha() if file_entry["alpha"] else surf.convert())
+            except Exception as e:
+                print(f"Error al cargar {key} de la caché: {e}")
+                stale.append(key)
+                continue
+
+            kind = entry["kind"]
+            if kind == "image":
+                cached[key] = surfaces[0]
+            elif kind == "animation":
+                cached[key] = Animation(surfaces, fps=entry["fps"], loop=entry["loop"])
+            elif kind == "dict":
+                cached[key] = {f["name"]: surf for f, surf in zip(entry["files"], surfaces)}
+            else:
+                cached[key] = surfaces
+
+        if stale:
+            print(f"Caché de assets desactualizada ({', '.join(stale)}): se cargan los originales. "
+                  f"Ejecuta 'python tools/generate_spritesheet.py' para regenerarla.")
+        return cached
+
+    @staticmethod
+    def load_atlas(assets_dir, sources=None, scale=1.0):
+        """
+        Carga el atlas de sprites (ver tools/generate_spritesheet.py) con SpriteSheet:
+        una sola imagen, y cada sprite es una subsuperficie de ella (nada de copias).
+        Devuelve {clave: asset} solo con los assets cuyos originales no cambiaron.
+        scale: el atlas de qué escala (ver ATLAS_SCALES); si no lo hay, devuelve {}.
+        """
+        cache_dir = os.path.join(assets_dir, ASSET_CACHE_DIR)
+        image_name, index_name = atlas_files(scale)
+        image_path = os.path.join(cache_dir, image_name)
+        json_path = os.path.join(cache_dir, index_name)
+        if not os.path.exists(image_path) or not os.path.exists(json_path):
+            return {}
+        if sources is None:
+            sources = AssetManager.asset_sources(assets_dir)
+
+        try:
+            sheet = SpriteSheet(image_path, json_path)
+        except Exception as e:
+            print(f"Error al cargar el atlas {image_path}: {e}")
+            return {}
+        if sheet.data.get("version") != CACHE_VERSION or sheet.data.get("scale", 1.0) != scale:
+            return {}
+
+        # Solo los assets al día (los demás se cargan de la caché o de los originales)
+        entries = {key: entry for key, entry in sheet.data["assets"].items()
+                   if key in sources and entry["sources"] == AssetManager.source_signature(assets_dir, sources[key])}
+        frames = {key: [] for key in entries}
+        for i, frame_data in enumerate(sheet.frames_data):
+            if frame_data["key"] in frames:
+                frames[frame_data["key"]].append((frame_data.get("index", 0), sheet.get_frame(i)))
+
+        atlas = {}
+        for key, entry in entries.items():
+            surfaces = [surf for _, surf in sorted(frames[key], key=lambda f: f[0])]
+            if not surfaces:
+                continue
+            if entry["kind"] == "image":
+                atlas[key] = surfaces[0]
+            elif entry["kind"] == "animation":
+                atlas[key] = Animation(surfaces, fps=entry["fps"], loop=entry["loop"])
+            else:
+                atlas[key] = surfaces
+        return atlas
+
     @staticmethod
     def load_image(path):
         """Carga una imagen desde el disco y la convierte para Pygame."""
@@ -42,13 +533,7 @@ class AssetManager:
         Así los obstáculos se ven mejor y el fondo no distrae tanto.
         """
         backgrounds = {}
-        files = {
-            "sunrise": "background_sunrise.png",
-            "sunset": "background_sunset.png",
-            "night": "background_night.png"
-        }
-        
-        for key, filename in files.items():
+        for key, filename in BACKGROUND_FILES.items():
             path = os.path.join(assets_dir, filename)
             if not os.path.exists(path):
                 print(f"Fondo no encontrado: {path}")
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# course.py - Pistas de obstáculos pregrabadas
+# Como la velocidad solo depende del número de frame (INITIAL_GAME_SPEED + SPEED_INCREMENT * t),
+# podemos generar TODA la pista antes de empezar: en qué frame aparece cada obstáculo,
+# de qué tipo es, su variante y su hitbox. Así la pista se genera una vez por generación,
+# se comparte entre procesos, se guarda en disco y se repite sin tirar dados en cada frame.
+
+import random
+import zlib
+import numpy as np
+from config import *
+from .obstacle import pick_obstacle_kind, create_obstacle, OBSTACLE_KINDS
+
+# Cuántos frames generamos por defecto. 20000 frames son ~700.000 de distancia,
+# mucho más de lo que llega el mejor campeón guardado (145.019 pts).
+COURSE_FRAMES = 20000
+
+# Un registro compacto por obstáculo
+COURSE_DTYPE = np.dtype([
+    ("frame", np.int32),    # Frame en el que aparece (Engine.frame)
+    ("kind", np.int8),      # Índice en SPAWN_TABLE
+    ("variant", np.int8),   # Color del coche / altura del dron (0 si no aplica)
+    ("hitbox_x", np.int16), # Hitbox al aparecer (x, y, ancho, alto)
+    ("hitbox_y", np.int16),
+    ("hitbox_w", np.int16),
+    ("hitbox_h", np.int16),
+])
+
+def generate_course(seed=None, max_frames=COURSE_FRAMES):
+    """
+    Genera la pista que vería un Engine reiniciado con reset(seed=seed),
+    tirando los mismos dados en el mismo orden que Engine._update_world.
+    Devuelve un arreglo estructurado de NumPy (COURSE_DTYPE), ordenado por frame.
+    """
+    rng = random.Random(seed)
+    next_spawn_dist = rng.randint(MIN_SPAWN_DIST, MAX_SPAWN_DIST)
+    game_speed = INITIAL_GAME_SPEED
+    spawn_timer = 0
+    records = []
+
+    for frame in range(1, max_frames + 1):
+        game_speed += SPEED_INCREMENT
+        spawn_timer += game_speed
+        if spawn_timer >= next_spawn_dist:
+            spawn_timer = 0
+            next_spawn_dist = rng.randint(MIN_SPAWN_DIST, MAX_SPAWN_DIST)
+            kind = pick_obstacle_kind(rng.random())
+            obs = create_obstacle(kind, SCREEN_WIDTH, rng=rng)
+            records.append((frame, kind, obs.variant,
+                            obs.rect.x, obs.rect.y, obs.rect.width, obs.rect.height))
+
+    return np.array(records, dtype=COURSE_DTYPE)
+
+def course_seed(course):
+    """
+    Semilla que sale del contenido de la pista: la usa Engine para seguir sacando obstáculos
+    al azar cuando la pista se acaba. Así todos los procesos que reciben la misma pista
+    siguen con los mismos obstáculos.
+    """
+    return zlib.crc32(np.ascontiguousarray(course).tobytes())
+
+def save_course(path, course):
+    """Guarda la pista en un archivo .npy (unos pocos KB)."""
+    np.save(path, course, allow_pickle=False)
+
+def load_course(path):
+    """Carga una pista guardada con save_course."""
+    course = np.load(path, allow_pickle=False)
+    if course.dtype != COURSE_DTYPE:
+        raise ValueError(f"El archivo {path} no es una pista válida")
+    return course
+
+def describe_course(course):
+    """Resumen rápido: cuántos obstáculos de cada tipo tiene la pista."""
+    counts = np.bincount(course["kind"], minlength=len(OBSTACLE_KINDS))
+    return {cls.__name__: int(n) for cls, n in zip(OBSTACLE_KINDS, counts)}
@@ -5,9 +5,29 @@
 import pygame
 import math
 from config import *
+from .assets import sprite_cache, scale_rect, asset_scale
+
+# Hitbox: un poco más pequeño que el dibujo para ser justos
+DINO_PADDING_X = 10
+DINO_PADDING_Y = 12
 
 class Dino:
+    """
+    El corredor. Usa __slots__: con poblaciones grandes hay miles de dinos y así cada uno
+    ocupa mucho menos que con un __dict__. Todos los atributos se declaran aquí
+    (dead y fitness incluidos), y reset() lo deja como nuevo para reciclarlo.
+    """
+    __slots__ = ("x", "y", "width", "height", "ground_y", "is_jumping", "is_crouching", "vel_y",
+                 "crouch_timer", "crouch_frame_index", "rect", "dead", "fitness")
+    crouch_fps = 12 # Velocidad de la animación de cuando se agacha (coachwalk)
+
     def __init__(self):
+        # Caja de colisión (hitbox): se crea una vez y después solo se mueve
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.reset()
+
+    def reset(self):
+        """Vuelve al estado inicial (parado en el suelo y vivo), reusando su Rect."""
         # Posición inicial y tamaño (vienen de config.py)
         self.x = PLAYER_X
         self.y = GROUND_Y - PLAYER_HEIGHT
@@ -19,14 +39,14 @@ class Dino:
         self.is_jumping = False
         self.is_crouching = False
         self.vel_y = 0.0 # Velocidad vertical (para saltar y caer)
+        self.dead = False
+        self.fitness = 0.0 # Distancia a la que murió (mientras vive, Engine usa la distancia actual)
         
         # Para controlar la animación de cuando se agacha (coachwalk)
         self.crouch_timer = 0.0
         self.crouch_frame_index = 0
-        self.crouch_fps = 12 
         
-        # Caja de colisión (hitbox)
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect.update(self.x, self.y, self.width, self.height)
         
     def jump(self):
         """Hace que el personaje salte si está en el suelo."""
@@ -82,10 +102,9 @@ class Dino:
         if not hit_ground and self.y + self.height < target_ground_y:
             self.is_jumping = True 
         
-        # Ajustamos el hitbox (un poco más pequeño que el dibujo para ser justos)
-        padding_x = 10
-        padding_y = 12
-        self.rect = pygame.Rect(self.x + padding_x, self.y + padding_y, self.width - 2*padding_x, self.height - 2*padding_y)
+        # Ajustamos el hitbox (sin crear otro Rect: pygame trunca igual que al construirlo)
+        self.rect.update(self.x + DINO_PADDING_X, self.y + DINO_PADDING_Y,
+                         self.width - 2 * DINO_PADDING_X, self.height - 2 * DINO_PADDING_Y)
 
     def update_animation(self, dt):
         """Actualiza el contador de tiempo para saber qué cuadro del dibujo mostrar."""
@@ -105,13 +124,18 @@ class Dino:
             self.crouch_timer = 0.0
             self.crouch_frame_index = 0
 
-    def draw(self, screen, assets=None, frame_count=0):
-        """Dibuja al corredor en la pantalla."""
+    def draw(self, screen, assets=None, frame_count=0, scale=1.0):
+        """
+        Dibuja al corredor en la pantalla. Devuelve la zona que pintó (o None).
+        scale: tamaño de la pantalla respecto a 800x400 (se dibuja directo a ese tamaño).
+        """
         sprite = None
+        sprite_key = None # Con qué nombre lo guardamos en la caché de sprites
         if assets:
             if self.is_jumping:
-                if "dino_jump" in assets: sprite = assets["dino_jump"]
-                elif "dino" in assets: sprite = assets["dino"]
+                if "dino_jump" in assets: sprite_key = "dino_jump"
+                elif "dino" in assets: sprite_key = "dino"
+                if sprite_key: sprite = assets[sprite_key]
             else:
                 # Animación de correr
                 if "dino_run" in assets and isinstance(assets["dino_run"], list) and len(assets["dino_run"]) > 0:
@@ -120,30 +144,25 @@ class Dino:
                      frames = assets["dino_run"]
                      idx = (frame_count // 10) % len(frames)
                      sprite = frames[idx]
+                     sprite_key = ("dino_run", idx)
                 elif "dino_run1" in assets and "dino_run2" in assets:
                     # Legacy 2-frame individual files
                     if (frame_count // 10) % 2 == 0:
-                        sprite = assets["dino_run1"]
+                        sprite_key = "dino_run1"
                     else:
-                        sprite = assets["dino_run2"]
+                        sprite_key = "dino_run2"
+                    sprite = assets[sprite_key]
                 elif "dino" in assets:
+                   sprite_key = "dino"
                    sprite = assets["dino"]
         
         if sprite:
-            target_size = (int(self.width), int(self.height))
+            target_size = (int(self.width * scale), int(self.height * scale))
             
-            # --- OPTIMIZACIÓN: Caché de escalado ---
-            # Como los dinos tienen animaciones, guardamos la versión escalada de cada frame
-            if not hasattr(self, "_sprite_cache"):
-                self._sprite_cache = {}
-            
-            sprite_id = id(sprite) # Usamos el ID del objeto para identificar el frame
-            if sprite_id not in self._sprite_cache or self._sprite_cache[sprite_id][1] != target_size:
-                # Solo escalamos si es un frame nuevo o el tamaño cambió
-                self._sprite_cache[sprite_id] = (pygame.transform.scale(sprite, target_size), target_size)
-            
-            scaled_sprite = self._sprite_cache[sprite_id][0]
-            screen.blit(scaled_sprite, (self.x, self.y))
+            # --- OPTIMIZACIÓN: Caché de escalado global (game/assets.py) ---
+            # Cada frame de la animación se escala una sola vez y lo comparten todos los dinos
+            scaled_sprite = sprite_cache.get(sprite_key, sprite, target_size)
+            return screen.blit(scaled_sprite, (self.x * scale, self.y * scale))
         
         # Nuevo sistema de animación para humanos
         elif assets and "human_anim" in assets:
@@ -156,23 +175,32 @@ class Dino:
                 # Modulo index to loop
                 idx = self.crouch_frame_index % len(frames)
                 frame = frames[idx]
+                frame_key = ("coachwalk", idx)
             else:
                 # Default Idle/Run
                 anim = assets["human_anim"]
                 frame = anim.get_current_frame()
+                frame_key = ("human_anim", anim.index)
             
             if frame:
+                # En pantallas escaladas usamos el frame ya escalado (del atlas de esa escala
+                # o, si los assets vienen a otra, de la caché de sprites)
+                relative = scale / asset_scale(assets)
+                if relative != 1:
+                    size = (int(frame.get_width() * relative), int(frame.get_height() * relative))
+                    frame = sprite_cache.get(frame_key, frame, size)
+
                 # Centramos el dibujo en la caja de colisión
                 # Sprite X: center of hitbox - half sprite width
-                dest_x = (self.x + self.width / 2) - (frame.get_width() / 2)
+                dest_x = (self.x + self.width / 2) * scale - (frame.get_width() / 2)
                 
                 # Sprite Y: bottom of hitbox - sprite height
                 # hitbox bottom is self.y + self.height
-                dest_y = (self.y + self.height) - frame.get_height()
+                dest_y = (self.y + self.height) * scale - frame.get_height()
                 
-                screen.blit(frame, (dest_x, dest_y))
+                return screen.blit(frame, (dest_x, dest_y))
         
         else:
             # Si no hay dibujos, dibujamos un rectángulo gris
             color = (83, 83, 83) if not self.is_crouching else (150, 150, 150)
-            pygame.draw.rect(screen, color, self.rect)
+            return pygame.draw.rect(screen, color, scale_rect(self.rect, scale))
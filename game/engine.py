@@ -2,276 +2,336 @@
 # engine.py - El motor del juego. 
 # Aquí es donde se controla el movimiento, los obstáculos y las colisiones.
 
+import copy
 import pygame
 import random
+import numpy as np
 from config import *
-from .dino import Dino
-from .obstacle import (CarObstacle, Drone, ConeObstacle, BeachBall, CoolerObstacle, 
-                         DumbbellObstacle, SurfboardObstacle, DumbbellBoxObstacle,
-                         BeachNetObstacle, BarraLibreObstacle)
+from .course import course_seed
+from .dino import Dino, DINO_PADDING_X, DINO_PADDING_Y
+from .observation import OBS_DTYPE, obstacle_features, shared_rows, fill_player_ys
+from .obstacle import CarObstacle, pick_obstacle_kind, create_obstacle
+from .obstacle_queue import ObstacleQueue
+from .renderer import LayeredRenderer
+
+# --- RENDERIZADO FANTASMA ---
+# Si hay más de 50 agentes, no los dibujamos para evitar lag: solo 3 de referencia
+MAX_VISIBLE_DINOS = 50
+GHOST_DINOS = 3
+
+# Tolerancia para aterrizar en el techo de un coche
+ROOF_TOLERANCE = 30
 
 class Engine:
     """
     La clase Engine es como el "director de orquesta" del juego.
     """
-    def __init__(self):
+    def __init__(self, seed=None):
+        # Cada motor tiene su propio generador de azar: con la misma semilla,
+        # la pista de obstáculos es exactamente la misma (para comparar corridas)
+        self.rng = random.Random(seed)
         self.dinos = [] # Lista de corredores
-        self.obstacles = [] # Lista de obstáculos en pantalla
+        self.obstacles = ObstacleQueue() # Obstáculos en pantalla, de izquierda a derecha
         self.game_speed = INITIAL_GAME_SPEED
         self.score = 0
         self.spawn_timer = 0
         # Distancia para que aparezca el siguiente obstáculo
-        self.next_spawn_dist = random.randint(MIN_SPAWN_DIST, MAX_SPAWN_DIST)
+        self.next_spawn_dist = self.rng.randint(MIN_SPAWN_DIST, MAX_SPAWN_DIST)
         self.distance_traveled = 0
         self.game_over = False
+        self.frame = 0 # Cuántos frames lleva la ronda
+        # Pista pregrabada (ver game/course.py). Si es None, los obstáculos salen al azar.
+        self.course = None
+        self._course_idx = 0
+        # Matriz de entradas de la IA que se reusa entre frames (ver get_observations)
+        self._obs_buffer = np.empty((0, INPUT_SIZE), dtype=OBS_DTYPE)
 
-    def reset(self, num_dinos=1):
-        """Reinicia todo para una nueva ronda o generación."""
-        self.dinos = [Dino() for _ in range(num_dinos)]
-        self.obstacles = []
+    def reset(self, num_dinos=1, seed=None, course=None):
+        """
+        Reinicia todo para una nueva ronda o generación.
+        Si nos pasan una semilla, la pista de obstáculos queda fija (reproducible).
+        Si nos pasan una pista pregrabada (course), repetimos sus obstáculos
+        en vez de tirar dados en cada frame. Cuando la pista se acaba volvemos a tirar dados,
+        con una semilla que sale de la pista si no nos dieron otra (ver course_seed).
+        """
+        if seed is None and course is not None:
+            seed = course_seed(course)
+        if seed is not None:
+            self.rng.seed(seed)
+        self.course = course
+        self._course_idx = 0
+        self.frame = 0
+        # Reciclamos los dinos de la partida anterior (con su Rect) en vez de crear N nuevos
+        dinos = [dino for dino in self.dinos if type(dino) is Dino][:num_dinos]
+        for dino in dinos:
+            dino.reset()
+        dinos.extend(Dino() for _ in range(num_dinos - len(dinos)))
+        self.dinos = dinos
+        self.obstacles = ObstacleQueue()
         self.game_speed = INITIAL_GAME_SPEED
         self.score = 0
         self.spawn_timer = 0
-        self.next_spawn_dist = random.randint(MIN_SPAWN_DIST, MAX_SPAWN_DIST)
+        self.next_spawn_dist = self.rng.randint(MIN_SPAWN_DIST, MAX_SPAWN_DIST)
         self.distance_traveled = 0
         self.game_over = False
 
+    def add_obstacle(self, obs):
+        """Agrega un obstáculo a los que están en pantalla (útil para pruebas)."""
+        self.obstacles.append(obs)
+
     def clear_obstacles(self):
         """Limpia los obstáculos (útil para pruebas)."""
-        self.obstacles = []
+        self.obstacles = ObstacleQueue()
 
     def update(self):
         """Se ejecuta en cada frame para mover todo."""
         if self.game_over:
             return
+        # Sesiones viejas de Streamlit traen los obstáculos en una lista
+        if not isinstance(self.obstacles, ObstacleQueue):
+            self.obstacles = ObstacleQueue(self.obstacles)
+
+        self._update_world()
+        alive_dinos = self._update_dinos()
 
+        # Si ya no queda nadie vivo, se acaba la ronda
+        if alive_dinos == 0:
+            self.game_over = True
+
+    def _update_world(self):
+        """Avanza la velocidad, mueve los obstáculos y hace aparecer nuevos."""
         # Aumentamos la velocidad y la distancia
+        self.frame += 1
         self.game_speed += SPEED_INCREMENT
         self.distance_traveled += self.game_speed
         self.score = int(self.distance_traveled / 10)
 
-        # Movemos los obstáculos
-        for obs in self.obstacles:
-            obs.update(self.game_speed)
-        
-        # Quitamos los que ya se salieron de la pantalla
-        self.obstacles = [obs for obs in self.obstacles if not obs.removed]
+        # Movemos los obstáculos y quitamos los que ya se salieron de la pantalla
+        self.obstacles.update(self.game_speed)
+
+        # Si tenemos pista pregrabada, solo sacamos los obstáculos que tocan en este frame
+        # (cuando se acaba seguimos al azar: si no, los que sobrevivan no chocarían nunca)
+        if self.course is not None and self._course_idx < len(self.course):
+            self._spawn_from_course()
+            return
 
         # Lógica para aparecer nuevos obstáculos
         self.spawn_timer += self.game_speed
         if self.spawn_timer >= self.next_spawn_dist:
             self.spawn_timer = 0
-            self.next_spawn_dist = random.randint(MIN_SPAWN_DIST, MAX_SPAWN_DIST)
+            self.next_spawn_dist = self.rng.randint(MIN_SPAWN_DIST, MAX_SPAWN_DIST)
             
-            r = random.random()
-            # Probability Distribution (Total 1.0)
-            # Birds/Drones: ~10% (BIRD_PROBABILITY)
-            # Cars: Remaining (Default)
-            
-            # Elegimos un obstáculo al azar con diferentes probabilidades
-            if r < BIRD_PROBABILITY:
-                self.obstacles.append(Drone(SCREEN_WIDTH))
-            elif r < BIRD_PROBABILITY + 0.10: # 10% Red Playa
-                self.obstacles.append(BeachNetObstacle(SCREEN_WIDTH))
-            elif r < BIRD_PROBABILITY + 0.20: # 10% Barra Libre
-                self.obstacles.append(BarraLibreObstacle(SCREEN_WIDTH))
-            elif r < BIRD_PROBABILITY + 0.35: # 15% Cono
-                self.obstacles.append(ConeObstacle(SCREEN_WIDTH))
-            elif r < BIRD_PROBABILITY + 0.45: # 10% Pelota
-                self.obstacles.append(BeachBall(SCREEN_WIDTH))
-            elif r < BIRD_PROBABILITY + 0.55: # 10% Nevera
-                self.obstacles.append(CoolerObstacle(SCREEN_WIDTH))
-            elif r < BIRD_PROBABILITY + 0.65: # 10% Mancuerna
-                self.obstacles.append(DumbbellObstacle(SCREEN_WIDTH))
-            elif r < BIRD_PROBABILITY + 0.75: # 10% Tabla Surf
-                self.obstacles.append(SurfboardObstacle(SCREEN_WIDTH))
-            elif r < BIRD_PROBABILITY + 0.85: # 10% Caja Mancuernas
-                self.obstacles.append(DumbbellBoxObstacle(SCREEN_WIDTH))
-            else:
-                self.obstacles.append(CarObstacle(SCREEN_WIDTH))
+            # Elegimos un obstáculo al azar con diferentes probabilidades (ver SPAWN_TABLE)
+            kind = pick_obstacle_kind(self.rng.random())
+            self.obstacles.append(create_obstacle(kind, SCREEN_WIDTH, rng=self.rng))
+
+    def _spawn_from_course(self):
+        """Saca de la pista pregrabada los obstáculos que aparecen en este frame."""
+        course = self.course
+        while self._course_idx < len(course) and course["frame"][self._course_idx] <= self.frame:
+            record = course[self._course_idx]
+            self.obstacles.append(create_obstacle(int(record["kind"]), SCREEN_WIDTH,
+                                                  variant=int(record["variant"])))
+            self._course_idx += 1
 
+    def player_column(self):
+        """
+        Fase "gruesa" de las colisiones: todos los dinos comparten la misma X (PLAYER_X),
+        así que una vez por frame buscamos los obstáculos que cruzan su columna.
+        Devuelve (techos, peligros):
+        - techos: la Y del techo de cada coche que cruza al dino (en orden; si califican
+          varios, gana el último, igual que el bucle de antes).
+        - peligros: (arriba, abajo) de cada hitbox que cruza el hitbox del dino.
+        Con eso a cada dino solo le queda comparar alturas (la fase "fina").
+        """
+        roofs = []
+        for obs in self.obstacles.overlapping(PLAYER_X, PLAYER_X + PLAYER_WIDTH):
+            if isinstance(obs, CarObstacle):
+                roofs.append(obs.y + obs.roof_offset)
+
+        hit_left = PLAYER_X + DINO_PADDING_X
+        hit_right = hit_left + (PLAYER_WIDTH - 2 * DINO_PADDING_X)
+        hazards = [(obs.rect.top, obs.rect.bottom) for obs in self.obstacles.overlapping(hit_left, hit_right)
+                   if obs.rect.width > 0 and obs.rect.height > 0] # colliderect ignora los de tamaño 0
+        return roofs, hazards
+
+    def _update_dinos(self):
+        """Aplica físicas y colisiones a cada dino. Devuelve cuántos siguen vivos."""
+        roofs, hazards = self.player_column()
         alive_dinos = 0
         for dino in self.dinos:
-            if not hasattr(dino, "dead"): dino.dead = False
             if dino.dead: continue
             
+            # Lógica especial para saltar sobre el techo de los coches:
+            # aterrizamos si los pies están más o menos a la altura del techo o más arriba
+            # (con algo de tolerancia para no atravesarlo si apenas lo rozamos)
             target_ground = GROUND_Y
-            
-            # Lógica especial para saltar sobre el techo de los coches
-            for obs in self.obstacles:
-                if isinstance(obs, CarObstacle):
-                    # Check horizontal overlap
-                    # Dino is fixed at PLAYER_X to PLAYER_X + WIDTH
-                    # Obs is moving.
-                    dino_right = dino.x + dino.width
-                    
-                    # FIX: Use Hitbox (rect) boundaries for platform width, not sprite width.
-                    # This ensures platform matches the deadly zone width exactly.
-                    obs_left_hitbox = obs.rect.x
-                    obs_right_hitbox = obs.rect.x + obs.rect.width
-                    
-                    if (dino.x < obs_right_hitbox and dino_right > obs_left_hitbox):
-                        # Horizontal overlap. Now check if vertical position allows "landing"
-                        # We land if we are above the deadly part?
-                        # Actually, we land if we are roughly at or above the roof level.
-                        # Roof level is determined by safe_top_pct logic in CarObstacle.
-                        # update: hitbox_top_offset = height * 0.6
-                        # so roof y = obs.y + (height * 0.6)
-                        
-                        # We land if we are roughly at or above the roof level.
-                        # Roof level is determined by safe_top_pct logic in CarObstacle.
-                        # Now exposed as obs.roof_offset
-
-                        roof_offset = getattr(obs, 'roof_offset', 0)
-                        roof_y = obs.y + roof_offset
-                        
-                        # If dino bottom is close to roof_y or above it, snap to it?
-                        # Let's say if dino.y + dino.height <= roof_y + 30 (tolerance)
-                        # We use a slightly generous tolerance so you don't fall through if you are just skimming the edge
-                        if (dino.y + dino.height) <= (roof_y + 30):
-                             target_ground = roof_y
+            for roof_y in roofs:
+                if (dino.y + dino.height) <= (roof_y + ROOF_TOLERANCE):
+                    target_ground = roof_y
             
             # Actualizamos al dino y revisamos si chocó
+            # (en X ya sabemos que los peligros lo cruzan: solo falta ver la altura)
             dino.update(target_ground)
-            for obs in self.obstacles:
-                if dino.rect.colliderect(obs.rect):
+            top, bottom = dino.rect.top, dino.rect.bottom
+            for obs_top, obs_bottom in hazards:
+                if top < obs_bottom and obs_top < bottom:
                     dino.dead = True
                     dino.fitness = self.distance_traveled # Su puntuación final
                     break
             
             if not dino.dead:
                 alive_dinos += 1
-        
-        # Si ya no queda nadie vivo, se acaba la ronda
-        if alive_dinos == 0:
-            self.game_over = True
+
+        return alive_dinos
+
+    def alive_indices(self):
+        """Índices de los dinos que siguen vivos (en el mismo orden que self.dinos)."""
+        return [i for i, dino in enumerate(self.dinos) if not dino.dead]
+
+    def count_alive(self):
+        """Cuántos dinos siguen vivos."""
+        return sum(1 for dino in self.dinos if not dino.dead)
+
+    def get_fitnesses(self):
+        """Fitness de cada dino; los que siguen vivos llevan la distancia actual."""
+        return [dino.fitness if dino.dead else self.distance_traveled for dino in self.dinos]
+
+    def get_player_ys(self, indices):
+        """Altura (Y) de los dinos indicados, para armar las entradas de la IA."""
+        return [self.dinos[i].y for i in indices]
+
+    def apply_actions(self, indices, jump_mask, crouch_mask):
+        """
+        Aplica de golpe las decisiones de la IA (máscaras de saltar/agacharse)
+        a los dinos indicados en indices.
+        """
+        for i, jump, crouch in zip(indices, jump_mask, crouch_mask):
+            dino = self.dinos[i]
+            if jump:
+                dino.jump()
+
+            if crouch:
+                dino.crouch()
+            else:
+                dino.stop_crouch()
+
+    def idle_dinos(self, indices, crouch_mask):
+        """
+        ¿Están todos estos dinos quietos en el suelo, de forma que no saltar y mantener
+        crouch_mask los deja exactamente igual frame tras frame?
+        """
+        for i, crouch in zip(indices, crouch_mask):
+            dino = self.dinos[i]
+            if dino.is_jumping or dino.vel_y != 0 or dino.ground_y != GROUND_Y:
+                return False
+            if dino.is_crouching != bool(crouch) or dino.y != GROUND_Y - dino.height:
+                return False
+        return True
+
+    def path_clear(self):
+        """
+        ¿Puede avanzar un frame más sin que ningún obstáculo llegue a la columna del jugador?
+        El hitbox de cada obstáculo está dentro de su imagen, así que basta mirar obs.x.
+        """
+        reach = PLAYER_X + PLAYER_WIDTH + self.game_speed + SPEED_INCREMENT
+        # Los que ya pasaron quedan antes del cursor; van en orden, así que basta ver el siguiente
+        obs = self.obstacles.next_ahead()
+        return obs is None or obs.x >= reach
+
+    def skip_frames(self, frames):
+        """
+        Avanza el mundo (velocidad, distancia y obstáculos) sin tocar a los dinos.
+        Solo es correcto si están quietos (idle_dinos) y el camino está libre (path_clear).
+        """
+        for _ in range(frames):
+            self._update_world()
+
+    def save_world(self):
+        """Foto del mundo (todo menos los dinos) para poder volver atrás con restore_world()."""
+        obstacles = ObstacleQueue(_clone(obs) for obs in self.obstacles)
+        return (self.frame, self.game_speed, self.distance_traveled, self.score, self.spawn_timer,
+                self.next_spawn_dist, self._course_idx, self.rng.getstate(), obstacles)
+
+    def restore_world(self, world):
+        """Regresa el mundo a una foto tomada con save_world()."""
+        (self.frame, self.game_speed, self.distance_traveled, self.score, self.spawn_timer,
+         self.next_spawn_dist, self._course_idx, rng_state, self.obstacles) = world
+        self.rng.setstate(rng_state)
+
+    def visible_dinos(self):
+        """
+        Los dinos que draw() dibuja: todos los vivos, o solo 3 de referencia
+        (modo fantasma, sin mensaje) si hay más de MAX_VISIBLE_DINOS agentes.
+        """
+        alive = [dino for dino in self.dinos if not dino.dead]
+        if len(self.dinos) > MAX_VISIBLE_DINOS:
+            return alive[:GHOST_DINOS]
+        return alive
+
+    def snapshot(self):
+        """
+        Copia ligera del mundo para dibujarla desde otro hilo mientras este motor sigue
+        simulando: velocidad, distancia, obstáculos y solo los dinos que draw() mostraría.
+        Es un Engine normal (se dibuja con draw()), pero solo sirve para leer, no para update().
+        """
+        snap = Engine.__new__(Engine)
+        snap.frame = self.frame
+        snap.game_speed = self.game_speed
+        snap.score = self.score
+        snap.distance_traveled = self.distance_traveled
+        snap.game_over = self.game_over
+        snap.obstacles = ObstacleQueue(_clone(obs) for obs in self.obstacles)
+        snap.dinos = [_clone(dino) for dino in self.visible_dinos()]
+        return snap
+
+    def next_obstacle(self):
+        """El primer obstáculo que todavía no pasó al jugador (o None)."""
+        return self.obstacles.next_ahead()
 
     def get_game_state(self):
         """Devuelve info útil para la IA."""
-        next_obs = None
-        for obs in self.obstacles:
-            if obs.x + obs.width > PLAYER_X:
-                next_obs = obs
-                break
-        
         return {
             "speed": self.game_speed,
-            "next_obstacle": next_obs,
+            "next_obstacle": self.next_obstacle(),
             "distance": self.distance_traveled
         }
 
-    def draw(self, screen, assets=None, debug_mode=False):
-        """Dibuja todo en la pantalla de Pygame."""
-        # Cambio de fondo automático según la distancia (Amanecer -> Atardecer -> Noche)
-        if assets and "backgrounds" in assets:
-            backgrounds = assets["backgrounds"]
-            # Cycling logic
-            # 0-7000: set 0 (sunrise)
-            # 7000-14000: set 1 (sunset)
-            # 14000-21000: set 2 (night)
-            # etc.
-            
-            CYCLE_POINTS = 3333
-            TRANSITION_POINTS = 1000 # Increased for smoother/longer transition
-            
-            # Use distance_traveled directly as it matches the "Fitness" displayed to user
-            stage = int(self.distance_traveled / CYCLE_POINTS) % 3
-            offset = self.distance_traveled % CYCLE_POINTS
-            
-            bg_keys = ["sunrise", "sunset", "night"]
-            current_key = bg_keys[stage]
-            
-            # Draw current
-            if current_key in backgrounds:
-                 screen.blit(backgrounds[current_key], (0, 0))
-            else:
-                 screen.fill((255, 255, 255))
-            
-            # Transición suave entre fondos
-            # Wait, user said "Once achieved, makes a light transition".
-            # So if we just passed 7000 (offset is small), we want to fade FROM prev TO current.
-            # So draw Prev, then blend Current on top? 
-            # Or draw Current, then blend Prev on top with fading alpha?
-            # Let's draw Prev opaque, then Current with Alpha increasing 0->1.
-            
-            if offset < TRANSITION_POINTS and self.distance_traveled > 500: # Skip transition at very start
-                prev_stage = (stage - 1) % 3
-                prev_key = bg_keys[prev_stage]
-                
-                alpha = int(255 * (offset / TRANSITION_POINTS))
-                
-                # We need to draw PREV opaque first
-                if prev_key in backgrounds:
-                     screen.blit(backgrounds[prev_key], (0, 0))
-                
-                # Then CURRENT with alpha
-                if current_key in backgrounds:
-                     curr_surf = backgrounds[current_key]
-                     curr_surf.set_alpha(alpha)
-                     screen.blit(curr_surf, (0, 0))
-                     curr_surf.set_alpha(255) # Restore opaque for next frame/other uses
-            
-            
-        else:
-            screen.fill((255, 255, 255))
-        
-        # El suelo con scroll infinito
-        if assets and "ground" in assets:
-            ground_img = assets["ground"]
-            g_width = ground_img.get_width()
-            # Scroll offset based on distance
-            # We need to compute offset % g_width
-            offset = int(self.distance_traveled) % g_width
-            
-            # Draw 2 or more tiles to cover screen
-            # x = -offset
-            x = -offset
-            while x < SCREEN_WIDTH:
-                screen.blit(ground_img, (x, GROUND_Y))
-                x += g_width
-        else:
-            pygame.draw.line(screen, (83, 83, 83), (0, GROUND_Y), (SCREEN_WIDTH, GROUND_Y), 2)
-        
-        # Dibujamos obstáculos y dinos
-        for obs in self.obstacles:
-            obs.draw(screen, assets)
-            
-        # Global frame count for animation
-        frame_count = int(self.distance_traveled) # Use distance as proxy for frames or pass actual frames
-        
-        # --- RENDERIZADO FANTASMA ---
-        # Si hay más de 50 agentes, no los dibujamos para evitar lag
-        MAX_VISIBLE_DINOS = 50
-        
-        if len(self.dinos) <= MAX_VISIBLE_DINOS:
-            # Modo normal: dibujar todos los agentes
-            for dino in self.dinos:
-                if not getattr(dino, "dead", False):
-                    dino.draw(screen, assets, frame_count)
-        else:
-            # Modo fantasma: solo dibujar 3 agentes de referencia (sin mensaje)
-            drawn = 0
-            for dino in self.dinos:
-                if not getattr(dino, "dead", False) and drawn < 3:
-                    dino.draw(screen, assets, frame_count)
-                    drawn += 1
-
-        # Si activamos el modo depuración, vemos las cajas de colisión (hitboxes)
-        if debug_mode:
-            for obs in self.obstacles:
-                # Red for obstacles
-                pygame.draw.rect(screen, (255, 0, 0), obs.rect, 2)
-                
-                if isinstance(obs, CarObstacle):
-                    # Blue for Safe Roof
-                    # Draw a line or rect showing where the platform is
-                    roof_y = obs.y + getattr(obs, 'roof_offset', 0)
-                    start_x = obs.rect.x
-                    end_x = obs.rect.x + obs.rect.width
-                    pygame.draw.line(screen, (0, 0, 255), (start_x, roof_y), (end_x, roof_y), 3)
-            
-            for dino in self.dinos:
-                if not getattr(dino, "dead", False):
-                    # Green for dino
-                    pygame.draw.rect(screen, (0, 255, 0), dino.rect, 2)
+    def get_observations(self, indices=None):
+        """
+        Las entradas de la IA para los dinos indicados (None = los vivos): una matriz
+        (K, INPUT_SIZE) float32 ya normalizada, lista para PopulationBrain.decide.
+        La parte común (obstáculo y velocidad) se calcula una sola vez y se copia a todas
+        las filas; solo la columna PlayerY cambia entre agentes.
+        OJO: es una vista de un buffer que se reusa, el próximo llamado la sobrescribe.
+        """
+        if indices is None:
+            indices = self.alive_indices()
+        player_ys = self.get_player_ys(indices)
+        out = self._observation_rows(len(player_ys))
+        out[:] = shared_rows([obstacle_features(self.next_obstacle())], [self.game_speed])
+        fill_player_ys(out, player_ys)
+        return out
+
+    def _observation_rows(self, n):
+        """Las primeras n filas del buffer de entradas (crece cuando hace falta, nunca se achica)."""
+        buffer = getattr(self, "_obs_buffer", None) # Engines de sesiones viejas no lo tienen
+        if buffer is None or len(buffer) < n:
+            buffer = self._obs_buffer = np.empty((n, INPUT_SIZE), dtype=OBS_DTYPE)
+        return buffer[:n]
+
+    def draw(self, screen, assets=None, debug_mode=False, renderer=None):
+        """
+        Dibuja todo en la pantalla de Pygame (ver game/renderer.py).
+        Si pasamos el mismo renderer en cada frame, solo se repinta lo que cambió;
+        sin renderer se repinta la pantalla completa. Devuelve las zonas que cambiaron.
+        """
+        if renderer is None:
+            renderer = LayeredRenderer()
+        return renderer.draw(self, screen, assets, debug_mode)
 
+def _clone(obj):
+    """Copia superficial de un obstáculo o dino, con su propio rect (el original lo sigue moviendo)."""
+    clone = copy.copy(obj)
+    clone.rect = obj.rect.copy()
+    return clone
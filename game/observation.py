@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# observation.py - Lo que "ve" la IA, ya normalizado
+# Las 6 entradas de la red: DistX, ObsY, ObsW, ObsH, PlayerY y Speed, todas entre 0 y 1.
+# Las constantes de normalización de config.py se juntan aquí una sola vez en dos arreglos
+# (escala y desplazamiento), así armar las entradas es una multiplicación y una suma.
+# Lo usan Engine.get_observations (un frame) y build_inputs_batch de ai/brain.py (varios frames).
+
+import numpy as np
+from config import *
+
+OBS_DTYPE = np.float32
+# Posición de la altura del jugador y de la velocidad dentro del vector de entradas
+PLAYER_Y_INPUT = 4
+SPEED_INPUT = 5
+
+# entrada = valor * OBS_SCALE + OBS_OFFSET (y luego se limita a [0, 1])
+OBS_SCALE = np.array([1 / WORLD_W, 1 / WORLD_H, 1 / WORLD_W, 1 / WORLD_H, 1 / WORLD_H,
+                      1 / (SPEED_MAX - SPEED_MIN)], dtype=OBS_DTYPE)
+OBS_OFFSET = np.array([0, 0, 0, 0, 0, -SPEED_MIN / (SPEED_MAX - SPEED_MIN)], dtype=OBS_DTYPE)
+
+def obstacle_features(obs):
+    """
+    (DistX, ObsY, ObsW, ObsH) del obstáculo que viene, todavía sin normalizar.
+    IMPORTANTE: Usamos obs.rect (hitbox) en lugar de la imagen,
+    así la IA "ve" el peligro real.
+    """
+    if obs:
+        return (max(0, obs.rect.x - (PLAYER_X + PLAYER_WIDTH)), obs.rect.y, obs.rect.width, obs.rect.height)
+    # Sin obstáculo: distancia máxima y "en el suelo"
+    return (WORLD_W, GROUND_Y, 0, 0)
+
+def shared_rows(features, speeds):
+    """
+    La parte de las entradas que es igual para todos los agentes, una fila por frame:
+    (T, INPUT_SIZE) ya normalizada, con la columna PlayerY en cero.
+    features: T tuplas de obstacle_features | speeds: T velocidades.
+    """
+    rows = np.zeros((len(speeds), INPUT_SIZE), dtype=OBS_DTYPE)
+    rows[:, :4] = np.asarray(features, dtype=OBS_DTYPE).reshape(-1, 4)
+    rows[:, SPEED_INPUT] = speeds
+    rows *= OBS_SCALE
+    rows += OBS_OFFSET
+    np.clip(rows, 0, 1, out=rows)
+    rows[:, PLAYER_Y_INPUT] = 0
+    return rows
+
+def fill_player_ys(out, player_ys):
+    """Escribe la columna PlayerY (normalizada y limitada a [0, 1]) de las filas `out`."""
+    column = out[..., PLAYER_Y_INPUT]
+    np.multiply(player_ys, OBS_SCALE[PLAYER_Y_INPUT], out=column, casting="unsafe")
+    np.clip(column, 0, 1, out=column)
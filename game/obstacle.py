@@ -1,404 +1,275 @@
 # -*- coding: utf-8 -*-
 # obstacle.py - Todos los peligros que hay que esquivar
 # Aquí definimos desde coches hasta drones y tablas de surf.
+# Antes había diez clases casi iguales, cada una con su update copiado y sus paddings a mano.
+# Ahora todo lo que cambia entre tipos (tamaño, cuánto se hunde en la arena, hitbox, probabilidad
+# de aparecer e imagen) vive en una tabla, OBSTACLE_CATALOG, que se arma una sola vez al importar.
+# Las clases siguen existiendo (el resto del juego pregunta isinstance(obs, CarObstacle)),
+# pero ya solo apuntan a su fila de la tabla; coches y drones agregan su comportamiento especial.
 
+import bisect
 import pygame
 import math
 import random
+from collections import namedtuple
 from config import *
+from .assets import sprite_cache, scale_rect
+
+# Una fila del catálogo (todo en píxeles del mundo de 800x400):
+# - name: nombre del tipo ("car", "cone"...)
+# - weight: probabilidad de aparecer (None = lo que sobra hasta 1)
+# - width, height: tamaño de la imagen
+# - sinks: por variante, cuánto se hunde la imagen en la arena (y = GROUND_Y - height + sink);
+#   negativo = flota por encima del suelo (drones)
+# - hitbox: (dx, dy, ancho, alto) de la caja de colisión respecto a la esquina de la imagen
+# - spawn_hitbox: la caja que tiene al aparecer, antes de su primer update
+# - sprites, type_names: por variante, la clave de su imagen en los assets y su nombre
+ObstacleType = namedtuple("ObstacleType", "name weight width height sinks hitbox spawn_hitbox sprites type_names")
+
+def obstacle_type(name, weight, width, height, sink, hitbox, variants=1, sprite=None, spawn_hitbox=None):
+    """
+    Arma una fila del catálogo. sink puede ser un número o uno por variante.
+    sprite: clave de la imagen; con "{variant}" cambia según la variante (por defecto = name).
+    """
+    sinks = tuple(sink) if isinstance(sink, (tuple, list)) else (sink,) * variants
+    sprite = sprite or name
+    return ObstacleType(
+        name, weight, width, height, sinks, tuple(hitbox), tuple(spawn_hitbox or hitbox),
+        tuple(sprite.format(variant=v) for v in range(variants)),
+        tuple(f"{name}_{v}" if variants > 1 else name for v in range(variants)),
+    )
+
+# Coches: el doble de grandes que antes (1.8 -> 3.6) y más anchos (1.2 -> 1.5)
+CAR_HEIGHT = int(PLAYER_HEIGHT * 0.55 * 3.6)
+CAR_WIDTH = int(CAR_HEIGHT * 1.5)
+# El techo seguro es el 45% de arriba (antes 30%): casi la mitad del coche es caminable
+CAR_ROOF_OFFSET = int(CAR_HEIGHT * 0.45)
+CAR_PADDING_X = 85 # El hitbox solo cubre el "centro" del coche (~110px de ~280px)
+CAR_PADDING_BOTTOM = 20 # Para que no te mate rozar las llantas
+
+# El orden es el "tipo" que se guarda en las pistas grabadas (game/course.py): no reordenar.
+OBSTACLE_CATALOG = [
+    # Drones: flotan a tres alturas (10, 50 o 90 px sobre el suelo), hitbox reducido para esquivarlos
+    obstacle_type("dron", BIRD_PROBABILITY, 46, 40, sink=(-10, -50, -90), variants=3, sprite="dron",
+                  hitbox=(10, 10, 46 - 2 * 10, 40 - 2 * 10)),
+    # Red de playa: la parte peligrosa está arriba, HAY que agacharse
+    obstacle_type("beach_net", 0.10, 300, 200, sink=60,
+                  hitbox=(35, 40, 300 - 2 * 35, 200 - 160)),
+    # Barra libre: igual que la red, el hitbox es solo la barra horizontal (15px de grueso)
+    obstacle_type("bar_crouch", 0.10, 250, 145, sink=45,
+                  hitbox=(70, 25, 250 - 2 * 70, 15)),
+    # Cono: pequeño y letal, con bastante padding para ser justos
+    obstacle_type("cone", 0.15, 40, 50, sink=15,
+                  hitbox=(10, 10, 40 - 2 * 10, 50 - 10)),
+    # Del balón en adelante el hitbox llega justo hasta el suelo: alto = height - sink - padding de arriba
+    obstacle_type("beach_ball", 0.10, 100, 70, sink=20,
+                  hitbox=(30, 15, 100 - 2 * 30, 70 - 20 - 15)),
+    obstacle_type("cooler", 0.10, 100, 70, sink=20,
+                  hitbox=(25, 20, 100 - 2 * 25, 70 - 20 - 20)),
+    obstacle_type("dumbbell", 0.10, 70, 70, sink=30,
+                  hitbox=(15, 22, 70 - 2 * 15, 70 - 30 - 22)),
+    obstacle_type("surfboard", 0.10, 60, 120, sink=35,
+                  hitbox=(22, 20, 60 - 2 * 22, 120 - 35 - 20)),
+    obstacle_type("dumbbell_box", 0.10, 120, 120, sink=45,
+                  hitbox=(30, 30, 120 - 2 * 30, 120 - 45 - 30)),
+    # Coches: el resto de la probabilidad. Al aparecer su hitbox es toda la imagen;
+    # desde el primer update es el centro del coche, del techo para abajo
+    obstacle_type("car", None, CAR_WIDTH, CAR_HEIGHT, sink=50, variants=5, sprite="car_{variant}",
+                  hitbox=(CAR_PADDING_X, CAR_ROOF_OFFSET, CAR_WIDTH - 2 * CAR_PADDING_X,
+                          max(10, CAR_HEIGHT - CAR_ROOF_OFFSET - CAR_PADDING_BOTTOM)),
+                  spawn_hitbox=(0, 0, CAR_WIDTH, CAR_HEIGHT)),
+]
+
+# Las imágenes que se buscaban por nombre antes del catálogo (dumbbell_box antes que dumbbell)
+_LEGACY_SPRITES = ("cone", "beach_ball", "cooler", "dumbbell_box", "dumbbell",
+                   "beach_net", "bar_crouch", "surfboard", "dron")
+_legacy_types = {}
+
+def legacy_obstacle_type(width, height, type_name):
+    """
+    Fila improvisada para el constructor de antes del catálogo, Obstacle(x, width, height, type_name):
+    apoyado en el suelo, hitbox con 5px de padding y la imagen que se deduce del nombre.
+    """
+    key = (width, height, type_name)
+    kind = _legacy_types.get(key)
+    if kind is None:
+        sprite = type_name if "car" in type_name else next((name for name in _LEGACY_SPRITES if name in type_name), None)
+        kind = _legacy_types[key] = ObstacleType(
+            type_name, 0, width, height, (0,), (5, 5, width - 2 * 5, height - 2 * 5),
+            (0, 0, width, height), (sprite,), (type_name,))
+    return kind
 
 class Obstacle:
-    """Clase base para todos los obstáculos."""
-    def __init__(self, x, width, height, type_name):
+    """
+    Clase base para todos los obstáculos: un registro compacto (__slots__) que apunta a su
+    fila del catálogo (TYPE). Se mueve hacia la izquierda y lleva su hitbox en self.rect.
+    Las subclases del catálogo se crean con x (rng= y variant= opcionales) o con create_obstacle(kind, x).
+    Obstacle(x, width, height, type_name) sigue funcionando como antes (ver legacy_obstacle_type).
+    """
+    TYPE = None # Fila de OBSTACLE_CATALOG (la pone cada subclase)
+    VARIANTS = 1 # Cuántas versiones tiene (coches de colores, alturas del dron...)
+    __slots__ = ("kind", "variant", "x", "y", "width", "height", "rect", "removed", "hitbox", "sprite")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.TYPE is not None:
+            cls.VARIANTS = len(cls.TYPE.sprites)
+
+    def __init__(self, x, width=None, height=None, type_name=None, rng=random, variant=None):
+        # rng: el generador de azar del Engine (para pistas reproducibles)
+        # variant: si ya sabemos cuál es (por ejemplo, al repetir una pista grabada)
+        kind = self.TYPE
+        if kind is None:
+            if width is None or height is None or type_name is None:
+                raise TypeError("Obstacle(x, width, height, type_name) necesita el tamaño y el nombre; "
+                                "para los tipos del juego usa su clase o create_obstacle()")
+            kind = legacy_obstacle_type(width, height, type_name)
+        elif (width, height, type_name) != (None, None, None):
+            raise TypeError(f"{type(self).__name__} toma su tamaño de OBSTACLE_CATALOG: se crea con x (rng= y variant= opcionales)")
+        self.kind = kind
+        if variant is None:
+            variant = rng.randint(0, self.VARIANTS - 1) if self.VARIANTS > 1 else 0
+        self.variant = variant
         self.x = x
-        self.width = width
-        self.height = height
-        self.type_name = type_name
-        self.y = GROUND_Y - self.height
+        self.width = kind.width
+        self.height = kind.height
+        self.y = GROUND_Y - kind.height + kind.sinks[variant]
+        self.hitbox = kind.hitbox
+        self.sprite = kind.sprites[variant] # Con qué imagen se dibuja (clave en los assets)
+        dx, dy, w, h = kind.spawn_hitbox
         # El rect es para las colisiones
-        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+        self.rect = pygame.Rect(self.x + dx, self.y + dy, w, h)
         self.removed = False
 
+    @property
+    def type_name(self):
+        return self.kind.type_names[self.variant]
+
     def update(self, speed):
-        """Mueve el obstáculo hacia la izquierda."""
+        """Mueve el obstáculo hacia la izquierda (y su hitbox con él, sin crear otro Rect)."""
         self.x -= speed
-        # Ajustamos el hitbox para que sea un poco más permisivo
-        padding_x = 5
-        padding_y = 5
-        self.rect = pygame.Rect(self.x + padding_x, self.y + padding_y, self.width - 2*padding_x, self.height - 2*padding_y)
         if self.x < -self.width:
             self.removed = True
+        dx, dy, w, h = self.hitbox
+        self.rect.update(self.x + dx, self.y + dy, w, h) # pygame trunca igual que int()
+
+    def sprite_key(self):
+        """Con qué imagen (clave en el diccionario de assets) se dibuja este obstáculo."""
+        return self.sprite
 
-    def draw(self, screen, assets=None):
-        """Dibuja el obstáculo usando su imagen (sprite)."""
-        img_key = None
-        # Mapeamos el nombre del tipo con la imagen que cargamos en app.py
-        if "car" in self.type_name:
-            # type_name is like "car_0", "car_1", etc.
-            img_key = self.type_name 
-        elif "cone" in self.type_name:
-            img_key = "cone"
-        elif "beach_ball" in self.type_name:
-            img_key = "beach_ball"
-        elif "cooler" in self.type_name:
-            img_key = "cooler"
-        elif "dumbbell_box" in self.type_name:
-            img_key = "dumbbell_box"
-        elif "dumbbell" in self.type_name:
-            img_key = "dumbbell"
-        elif "beach_net" in self.type_name:
-            img_key = "beach_net"
-        elif "bar_crouch" in self.type_name:
-            img_key = "bar_crouch"
-        elif "surfboard" in self.type_name:
-            img_key = "surfboard"
-        elif "dron" in self.type_name:
-            img_key = "dron"
-            
-        if assets and img_key and img_key in assets and assets[img_key]:
-            # --- OPTIMIZACIÓN: Caché de escalado ---
-            target_size = (int(self.width), int(self.height))
-            if not hasattr(self, "_cached_sprite") or self._cached_size != target_size:
-                self._cached_sprite = pygame.transform.scale(assets[img_key], target_size)
-                self._cached_size = target_size
-            
-            screen.blit(self._cached_sprite, (self.x, self.y)) # Dibuja la imagen (visual)
+    def draw(self, screen, assets=None, scale=1.0):
+        """
+        Dibuja el obstáculo usando su imagen (sprite). Devuelve la zona de la pantalla que pintó.
+        scale: tamaño de la pantalla respecto a 800x400 (se dibuja directo a ese tamaño).
+        """
+        img_key = self.sprite
+        if assets and assets.get(img_key):
+            # --- OPTIMIZACIÓN: Caché de escalado global (game/assets.py) ---
+            # Todos los obstáculos del mismo tipo y tamaño comparten la misma imagen escalada
+            target_size = (int(self.width * scale), int(self.height * scale))
+            sprite = sprite_cache.get(img_key, assets[img_key], target_size)
+            return screen.blit(sprite, (self.x * scale, self.y * scale)) # Dibuja la imagen (visual)
         else:
             # Si no hay imagen, dibujamos un rectángulo gris
             color = (130, 130, 130)
-            pygame.draw.rect(screen, color, self.rect)
+            return pygame.draw.rect(screen, color, scale_rect(self.rect, scale))
+
+_CATALOG_BY_NAME = {kind.name: kind for kind in OBSTACLE_CATALOG}
 
 class CarObstacle(Obstacle):
     """Coches: son grandes y se pueden pisar por arriba (el techo es seguro)."""
-    def __init__(self, x):
-        variant = random.randint(0, 4)
-        # Dimensions for cars based on player size
-        # Formula: Double the previous size (1.8 -> 3.6)
-        height = int(PLAYER_HEIGHT * 0.55 * 3.6)
-        width = int(height * 1.5) # Widened from 1.2
-        type_name = f"car_{variant}"
-            
-        super().__init__(x, width, height, type_name)
-        
-        # Los hundimos un poco en el suelo para que no parezca que flotan
-        self.y += 50
-        self.rect.y = int(self.y)
+    TYPE = _CATALOG_BY_NAME["car"]
+    __slots__ = ("roof_offset",)
 
-    def update(self, speed):
-        # Move
-        self.x -= speed
-        if self.x < -self.width:
-            self.removed = True
-            
-        # --- AJUSTE DE HITBOX: Hacerlo más pequeño para que la IA aprenda a saltarlo ---
-        # Antes el techo seguro era 30%, ahora es 45% (casi la mitad del coche es caminable)
-        self.safe_top_pct = 0.45
-        self.roof_offset = int(self.height * self.safe_top_pct)
-        
-        # Aumentamos el padding horizontal para que el hitbox solo cubra el "centro" del coche
-        # Antes: 65px. Ahora: 85px (el coche tiene ~280px de ancho, así queda ~110px de hitbox)
-        padding_x = 85
-        
-        # Añadimos un poco de padding desde abajo también para que no te mate rozar las llantas
-        padding_bottom = 20
-        hitbox_height = self.height - self.roof_offset - padding_bottom
-        
-        self.rect = pygame.Rect(self.x + padding_x, self.y + self.roof_offset, 
-                               self.width - (2 * padding_x), max(10, hitbox_height))
+    def __init__(self, x, rng=random, variant=None):
+        super().__init__(x, rng=rng, variant=variant)
+        self.roof_offset = 0 # Hasta su primer update el techo está arriba de la imagen
 
+    def update(self, speed):
+        self.roof_offset = CAR_ROOF_OFFSET
+        super().update(speed)
 
 class Drone(Obstacle):
     """Drones: vuelan a diferentes alturas y flotan arriba y abajo."""
-    def __init__(self, x):
-        height_level = random.randint(0, 2)
-        width = 46
-        height = 40
-        type_name = f"dron_{height_level}"
-        
-        super().__init__(x, width, height, type_name)
-        
-        # Diferentes alturas según el nivel elegido
-        if height_level == 0:
-            self.base_y = GROUND_Y - height - 10
-        elif height_level == 1:
-            self.base_y = GROUND_Y - height - 50
-        else:
-            self.base_y = GROUND_Y - height - 90
-            
-        self.y = self.base_y
-        
-        # Reduced Hitbox for Drone
-        # User requested smaller hitbox to make it easier to dodge
-        padding = 10
-        self.rect = pygame.Rect(self.x + padding, self.y + padding, self.width - 2*padding, self.height - 2*padding)
+    TYPE = _CATALOG_BY_NAME["dron"]
+    __slots__ = ("base_y", "float_timer")
+
+    def __init__(self, x, rng=random, variant=None):
+        super().__init__(x, rng=rng, variant=variant)
+        self.base_y = self.y
         self.float_timer = 0.0
 
     def update(self, speed):
-        self.x -= speed
-        if self.x < -self.width:
-            self.removed = True
-            
         # Lógica para que suba y baje (seno)
         self.float_timer += 0.1
         self.y = self.base_y + math.sin(self.float_timer) * 20
-        
-        # Update hitbox with padding
-        padding = 10
-        self.rect.x = int(self.x + padding)
-        self.rect.y = int(self.y + padding)
+        super().update(speed)
 
 class ConeObstacle(Obstacle):
     """Cono: obstáculo pequeño en el suelo."""
-    def __init__(self, x):
-        # Cone is small. Let's make it roughly half player height.
-        # Let's try explicit pixels for clarity as requested -> "Small Lethal Obstacle"
-        height = 50 
-        width = 40 # Standard cone proportion
-        
-        type_name = "cone"
-        super().__init__(x, width, height, type_name)
-        
-        # Grounded
-        # Lowered by 10px to fix floating appearance
-        self.y = GROUND_Y - self.height + 15
-        
-        # Exact Hitbox with heavy padding to be fair
-        # Shrinking hitbox as requested (padding 5 -> 10)
-        padding = 10
-        self.rect = pygame.Rect(self.x + padding, self.y + padding, self.width - 2*padding, self.height - padding)
-
-    def update(self, speed):
-        self.x -= speed
-        if self.x < -self.width:
-            self.removed = True
-        
-        # Update rect position with padding
-        padding = 10
-        self.rect.x = int(self.x + padding)
-        # y is static relative to ground
+    TYPE = _CATALOG_BY_NAME["cone"]
+    __slots__ = ()
 
 class BeachBall(Obstacle):
     """Pelota de playa: ancha pero bajita."""
-    def __init__(self, x):
-        # Increased size as requested (60 -> 70)
-        width = 100
-        height = 70
-        type_name = "beach_ball"
-        super().__init__(x, width, height, type_name)
-        
-        # STRICT Ground Alignment + sink 10px
-        # Lowered 10px to avoid floating
-        self.y = GROUND_Y - self.height + 20
-        
-       # Padded hitbox: Narrower and shorter (very low profile)
-        # Horizontal: 10px each side -> 50px width
-        # Top: 45px padding -> 25px height (stops at ground)
-        self.padding_x = 30
-        self.padding_top = 15
-        
-        hitbox_y = self.y + self.padding_top
-        hitbox_height = GROUND_Y - hitbox_y
-        
-        self.rect = pygame.Rect(self.x + self.padding_x, hitbox_y, 
-                               self.width - 2*self.padding_x, hitbox_height)
-
-    def update(self, speed):
-        self.x -= speed
-        if self.x < -self.width: self.removed = True
-        
-        # Sync hitbox
-        self.rect.x = int(self.x + self.padding_x)
+    TYPE = _CATALOG_BY_NAME["beach_ball"]
+    __slots__ = ()
 
 class CoolerObstacle(Obstacle):
     """Nevera: obstáculo rectangular medio."""
-    def __init__(self, x):
-        # Cooler dimensions (Medium-Small, Boxy)
-        # Resized: 60x50 -> 80x70
-        width = 100
-        height = 70
-        type_name = "cooler"
-        super().__init__(x, width, height, type_name)
-        
-        # Grounded: Sink +10px
-        self.y = GROUND_Y - self.height + 20
-        
-        # Hitbox: Adjusted to match bulk of the cooler
-        self.padding_x = 25
-        self.padding_top = 20
-        
-        hitbox_y = self.y + self.padding_top
-        hitbox_height = GROUND_Y - hitbox_y
-        
-        self.rect = pygame.Rect(self.x + self.padding_x, hitbox_y, 
-                               self.width - 2*self.padding_x, hitbox_height)
-        
-    def update(self, speed):
-        self.x -= speed
-        if self.x < -self.width:
-            self.removed = True
-            
-        self.rect.x = int(self.x + self.padding_x)
+    TYPE = _CATALOG_BY_NAME["cooler"]
+    __slots__ = ()
 
 class DumbbellObstacle(Obstacle):
     """Mancuerna: muy pequeña y difícil de ver si vas rápido."""
-    def __init__(self, x):
-        # Dumbbell: Small, low obstacle
-        # Resized: 70x70
-        width = 70
-        height = 70
-        type_name = "dumbbell"
-        super().__init__(x, width, height, type_name)
-        
-        # Grounded: Sink +30px to sit on the sand
-        self.y = GROUND_Y - self.height + 30
-        
-        # Padded hitbox: Narrower and shorter (very low profile)
-        # Horizontal: 10px each side -> 50px width
-        # Top: 45px padding -> 25px height (stops at ground)
-        self.padding_x = 15
-        self.padding_top = 22
-        
-        hitbox_y = self.y + self.padding_top
-        hitbox_height = GROUND_Y - hitbox_y
-        
-        self.rect = pygame.Rect(self.x + self.padding_x, hitbox_y, 
-                               self.width - 2*self.padding_x, hitbox_height)
-
-    def update(self, speed):
-        self.x -= speed
-        if self.x < -self.width: self.removed = True
-        
-        # Sync hitbox
-        self.rect.x = int(self.x + self.padding_x)
+    TYPE = _CATALOG_BY_NAME["dumbbell"]
+    __slots__ = ()
 
 class SurfboardObstacle(Obstacle):
     """Tabla de surf: alta y delgada."""
-    def __init__(self, x):
-        # Surfboard: Tall, thin obstacle
-        # Resized: 30x80 -> 60x120
-        width = 60
-        height = 120
-        type_name = "surfboard"
-        super().__init__(x, width, height, type_name)
-        
-        # Grounded: Sink +45px to "stick" to the sand better
-        self.y = GROUND_Y - self.height + 35
-        
-        # Padded hitbox: Narrower and shorter to match surfboard shape
-        # Left/Right padding: 22px each -> 16px center
-        # Top padding: 10px (to reach the blue tip)
-        self.padding_x = 22
-        self.padding_top = 20
-        
-        # Height adjustment: Make hitbox stop at the ground level (GROUND_Y)
-        # Rect Y is self.y + padding_top
-        # Ground is at GROUND_Y
-        # So height = GROUND_Y - (self.y + padding_top)
-        hitbox_y = self.y + self.padding_top
-        hitbox_height = GROUND_Y - hitbox_y
-        
-        self.rect = pygame.Rect(self.x + self.padding_x, hitbox_y, 
-                               self.width - 2 * self.padding_x, hitbox_height)
-
-    def update(self, speed):
-        self.x -= speed
-        if self.x < -self.width: self.removed = True
-        
-        # Sync hitbox position
-        self.rect.x = int(self.x + self.padding_x)
+    TYPE = _CATALOG_BY_NAME["surfboard"]
+    __slots__ = ()
 
 class DumbbellBoxObstacle(Obstacle):
     """Caja de mancuernas: pesada y grande."""
-    def __init__(self, x):
-        # Box: Heavy, bit larger than cooler
-        # Resized: 120x120
-        width = 120
-        height = 120
-        type_name = "dumbbell_box"
-        super().__init__(x, width, height, type_name)
-        
-        # Grounded: Sink +30px to sit on the sand
-        self.y = GROUND_Y - self.height + 45
-        
-        # Padded hitbox: Narrower and shorter (very low profile)
-        # Horizontal: 10px each side -> 50px width
-        # Top: 45px padding -> 25px height (stops at ground)
-        self.padding_x = 30
-        self.padding_top = 30
-        
-        hitbox_y = self.y + self.padding_top
-        hitbox_height = GROUND_Y - hitbox_y
-        
-        self.rect = pygame.Rect(self.x + self.padding_x, hitbox_y, 
-                               self.width - 2*self.padding_x, hitbox_height)
-
-    def update(self, speed):
-        self.x -= speed
-        if self.x < -self.width: self.removed = True
-        
-        # Sync hitbox
-        self.rect.x = int(self.x + self.padding_x)
+    TYPE = _CATALOG_BY_NAME["dumbbell_box"]
+    __slots__ = ()
 
 class BeachNetObstacle(Obstacle):
     """Red de playa: está alta, así que HAY que agacharse."""
-    def __init__(self, x):
-        # Beach Net: Taller, suspended. Must crouch.
-        width = 300
-        height = 200
-        type_name = "beach_net"
-        super().__init__(x, width, height, type_name)
-        
-        # Position: Suspended. Bottom of sprite should be at GROUND_Y - offset.
-        # But image might have poles. Let's assume the "lethal" part starts high.
-        # Standing head is at GROUND_Y - 95.
-        # Crouching head is at GROUND_Y - 40.
-        # Let's place the bottom of the lethal zone at GROUND_Y - 55.
-        self.y = GROUND_Y - height + 60 # Visual sink
-        
-        # Hitbox (Top zone)
-        # Lethal padding from bottom: we want the bottom of the hitbox to be GROUND_Y - 55
-        # hitbox_bottom = y + height - padding_bottom = GROUND_Y - 55
-        # (GROUND_Y - height + 10) + height - padding_bottom = GROUND_Y - 55
-        # GROUND_Y + 10 - padding_bottom = GROUND_Y - 55 => padding_bottom = 65
-        self.padding_bottom = 160
-        self.padding_x = 35
-        self.padding_top = 40
-        
-        self.rect = pygame.Rect(self.x + self.padding_x, self.y + self.padding_top,
-                               self.width - 2*self.padding_x, self.height - self.padding_bottom)
-
-    def update(self, speed):
-        self.x -= speed
-        if self.x < -self.width: self.removed = True
-        self.rect.x = int(self.x + self.padding_x)
+    TYPE = _CATALOG_BY_NAME["beach_net"]
+    __slots__ = ()
 
 class BarraLibreObstacle(Obstacle):
     """Barra libre: igual que la red, obliga a agacharse."""
-    def __init__(self, x):
-        # Bar: Thin, suspended. Must crouch.
-        # User defined size
-        width = 250
-        height = 145
-        type_name = "bar_crouch"
-        super().__init__(x, width, height, type_name)
-        
-        # Grounded: Sink slightly to sit on sand
-        self.y = GROUND_Y - height + 45
-
-        # Hitbox: Elevated to the horizontal bar
-        # Horizontal: 20px padding
-        # Top: 10px padding to reach the bar
-        # Height: 15px for the bar thickness
-        self.padding_x = 70
-        self.padding_top = 25
-        self.hitbox_height = 15
-        
-        self.rect = pygame.Rect(self.x + self.padding_x, self.y + self.padding_top,
-                               self.width - 2*self.padding_x, self.hitbox_height)
+    TYPE = _CATALOG_BY_NAME["bar_crouch"]
+    __slots__ = ()
 
-    def update(self, speed):
-        self.x -= speed
-        if self.x < -self.width: self.removed = True
-        
-        # Sync hitbox
-        self.rect.x = int(self.x + self.padding_x)
+# La clase de cada fila del catálogo, en el mismo orden (el índice es el "tipo")
+_CLASSES = {cls.TYPE.name: cls for cls in (CarObstacle, Drone, ConeObstacle, BeachBall, CoolerObstacle,
+                                            DumbbellObstacle, SurfboardObstacle, DumbbellBoxObstacle,
+                                            BeachNetObstacle, BarraLibreObstacle)}
+OBSTACLE_KINDS = [_CLASSES[kind.name] for kind in OBSTACLE_CATALOG]
+
+def _spawn_thresholds():
+    """Probabilidades acumuladas del catálogo; el que tiene weight = None se queda con lo que sobra."""
+    thresholds, total = [], 0.0
+    for kind in OBSTACLE_CATALOG:
+        if kind.weight is None:
+            thresholds.append(float("inf"))
+        else:
+            total += kind.weight
+            thresholds.append(total)
+    return thresholds
+
+# Tabla de aparición: (probabilidad acumulada, clase), en el orden del catálogo
+SPAWN_THRESHOLDS = _spawn_thresholds()
+SPAWN_TABLE = list(zip(SPAWN_THRESHOLDS, OBSTACLE_KINDS))
+
+def pick_obstacle_kind(r):
+    """Convierte un número al azar r en [0, 1) en el tipo de obstáculo (índice de SPAWN_TABLE)."""
+    return min(bisect.bisect_right(SPAWN_THRESHOLDS, r), len(SPAWN_THRESHOLDS) - 1)
+
+def create_obstacle(kind, x, rng=random, variant=None):
+    """Crea un obstáculo del tipo indicado. Si no nos dan variante, la elige rng."""
+    return OBSTACLE_KINDS[kind](x, rng=rng, variant=variant)
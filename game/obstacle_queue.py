@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# obstacle_queue.py - Los obstáculos en pantalla, ordenados de izquierda a derecha
+# Antes eran una lista normal: cada frame se armaba otra lista para quitar los que salían,
+# get_game_state la recorría para encontrar el siguiente obstáculo, y cada dino la volvía a
+# recorrer para los techos de los coches y para las colisiones.
+# Como todos aparecen a la derecha y se mueven a la misma velocidad, siempre están en orden:
+# los que salen por la izquierda se sacan del frente de una deque, y un cursor recuerda
+# dónde empiezan los que todavía no pasaron al jugador.
+
+from collections import deque
+from itertools import islice
+from config import *
+
+class ObstacleQueue:
+    """
+    Se usa como la lista de antes (for, len, append, [i]), pero además:
+    - update(speed): mueve todos y saca los que ya se salieron de la pantalla.
+    - next_ahead(): el primer obstáculo que todavía no pasó al jugador.
+    - overlapping(left, right): solo los que cruzan una franja (la columna del jugador).
+
+    Invariante: ordenados por x. Si alguien mete uno fuera de orden (ej: las herramientas
+    de diseño lo ponen a media pantalla), se acomoda en su lugar.
+    """
+    def __init__(self, obstacles=()):
+        self._items = deque()
+        self._cursor = 0 # Todos los de antes del cursor ya pasaron al jugador
+        for obs in obstacles:
+            self.append(obs)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __repr__(self):
+        return f"ObstacleQueue({list(self._items)!r})"
+
+    def append(self, obs):
+        items = self._items
+        if items and obs.x < items[-1].x:
+            # Fuera de orden: lo acomodamos (raro, solo pasa con obstáculos puestos a mano)
+            ordered = sorted(list(items) + [obs], key=lambda o: o.x)
+            items.clear()
+            items.extend(ordered)
+            self._cursor = 0
+        else:
+            items.append(obs)
+
+    def clear(self):
+        self._items.clear()
+        self._cursor = 0
+
+    def update(self, speed):
+        """Mueve todos los obstáculos y saca los que ya se salieron por la izquierda."""
+        items = self._items
+        removed = 0
+        for obs in items:
+            obs.update(speed)
+            if obs.removed:
+                removed += 1
+        if not removed:
+            return
+        # Normalmente los que salen son los del frente
+        while items and items[0].removed:
+            items.popleft()
+            removed -= 1
+            self._cursor = max(0, self._cursor - 1)
+        if removed:
+            # Uno más angosto salió antes que el de adelante: filtramos como antes
+            kept = [obs for obs in items if not obs.removed]
+            items.clear()
+            items.extend(kept)
+            self._cursor = 0
+
+    def _advance_cursor(self):
+        """Mueve el cursor al primero que no ha pasado al jugador (los que pasan ya no vuelven)."""
+        items = self._items
+        cursor = self._cursor
+        while cursor < len(items) and items[cursor].x + items[cursor].width <= PLAYER_X:
+            cursor += 1
+        self._cursor = cursor
+        return cursor
+
+    def next_ahead(self):
+        """El primer obstáculo que todavía no pasó al jugador (o None)."""
+        cursor = self._advance_cursor()
+        return self._items[cursor] if cursor < len(self._items) else None
+
+    def ahead(self):
+        """Los obstáculos desde next_ahead() en adelante, de izquierda a derecha."""
+        return islice(self._items, self._advance_cursor(), None)
+
+    def overlapping(self, left, right):
+        """
+        Los obstáculos cuyo hitbox cruza la franja horizontal [left, right), en orden.
+        Sirve para franjas dentro de la columna del jugador (left >= PLAYER_X): los que
+        están antes del cursor ya pasaron y el hitbox siempre está dentro de la imagen,
+        así que paramos en el primero cuya imagen empieza después de la franja.
+        """
+        found = []
+        for obs in self.ahead():
+            if obs.x >= right:
+                break
+            if obs.rect.x < right and obs.rect.x + obs.rect.width > left:
+                found.append(obs)
+        return found
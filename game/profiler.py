@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# profiler.py - Cronómetros por fase para saber en qué se va cada frame
+# Envolvemos cada parte del bucle principal (entradas, red, motor, dibujo, envío al navegador...)
+# con un cronómetro con nombre y guardamos los últimos N frames para sacar percentiles.
+
+import csv
+import time
+from collections import deque
+import numpy as np
+
+class _Phase:
+    """Cronómetro de una fase. Se usa con `with profiler.phase("nombre"):`."""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        current = self.profiler._current
+        current[self.name] = current.get(self.name, 0.0) + (time.perf_counter() - self.start)
+        return False
+
+class _NoPhase:
+    """Cronómetro vacío: cuando el perfilador está apagado no medimos nada."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_PHASE = _NoPhase()
+
+class FrameProfiler:
+    """
+    Junta cuánto tarda cada fase del frame (en segundos) y guarda los últimos
+    `window` frames para sacar promedio y percentiles (p50, p95, p99).
+    Si una fase corre varias veces en el mismo frame (ej: sim_speed > 1), se suman.
+    """
+    def __init__(self, window=300, enabled=True):
+        self.enabled = enabled
+        self.window = window
+        self.frames = deque(maxlen=window) # Un diccionario {fase: segundos} por frame
+        self.total_frames = 0
+        self._current = {}
+        self._phases = {}
+
+    def phase(self, name):
+        """Cronómetro para una fase del frame actual."""
+        if not self.enabled:
+            return _NO_PHASE
+        timer = self._phases.get(name)
+        if timer is None:
+            timer = self._phases[name] = _Phase(self, name)
+        return timer
+
+    def end_frame(self):
+        """Cierra el frame actual y lo guarda en la ventana."""
+        if not self.enabled:
+            return
+        if self._current:
+            self.frames.append(self._current)
+            self.total_frames += 1
+        self._current = {}
+
+    def reset(self):
+        self.frames.clear()
+        self.total_frames = 0
+        self._current = {}
+
+    def phase_names(self):
+        """Nombres de las fases en el orden en que aparecieron por primera vez."""
+        return list(self._phases)
+
+    def stats(self):
+        """
+        Resumen por fase en milisegundos:
+        {fase: {"frames", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "share"}}
+        share = qué fracción del tiempo medido total se lleva esa fase.
+        """
+        summary = {}
+        totals = {}
+        for name in self.phase_names():
+            values = np.array([frame[name] for frame in self.frames if name in frame]) * 1000
+            if len(values) == 0:
+                continue
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            summary[name] = {
+                "frames": len(values),
+                "mean_ms": float(values.mean()),
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "max_ms": float(values.max()),
+            }
+            totals[name] = values.sum()
+        grand_total = sum(totals.values()) or 1.0
+        for name in summary:
+            summary[name]["share"] = float(totals[name] / grand_total)
+        return summary
+
+    def table(self):
+        """Lo mismo que stats(), pero como lista de filas (para st.dataframe o pandas)."""
+        return [{"fase": name, **{k: round(v, 3) for k, v in values.items()}}
+                for name, values in self.stats().items()]
+
+    def export_csv(self, path_or_file):
+        """Guarda los tiempos de cada frame de la ventana (en ms) en un CSV: una columna por fase."""
+        names = self.phase_names()
+        own_file = isinstance(path_or_file, str)
+        f = open(path_or_file, "w", newline="") if own_file else path_or_file
+        try:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + names)
+            first = self.total_frames - len(self.frames)
+            for i, frame in enumerate(self.frames):
+                writer.writerow([first + i] + [round(frame[name] * 1000, 4) if name in frame else ""
+                                               for name in names])
+        finally:
+            if own_file:
+                f.close()
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+# renderer.py - Dibujo por capas para Engine.draw
+# Antes, cada frame pintábamos el fondo completo de 800x400 (dos en las transiciones,
+# cambiándole el alpha al fondo compartido), el suelo y todos los sprites.
+# Ahora el dibujo va por capas:
+#   1. Fondo: una imagen ya lista por cada paso de la transición (se arma una vez y se guarda).
+#   2. Suelo: la franja que se desplaza, se repinta entera cada frame.
+#   3. Sprites: obstáculos, dinos y hitboxes. Solo restauramos el fondo donde hubo
+#      sprites el frame anterior, en vez de repintar toda la pantalla.
+
+import pygame
+from collections import OrderedDict
+from config import *
+from .assets import sprite_cache, scale_rect, asset_scale
+from .obstacle import CarObstacle
+
+# Ciclo de fondos según la distancia (Amanecer -> Atardecer -> Noche)
+BACKGROUND_KEYS = ["sunrise", "sunset", "night"]
+CYCLE_POINTS = 3333
+TRANSITION_POINTS = 1000 # Increased for smoother/longer transition
+TRANSITION_START = 500 # Skip transition at very start
+# En cuántos pasos se reparte la transición (32 pasos = el alpha sube de 8 en 8)
+TRANSITION_STEPS = 32
+# Cuántos fondos armados guardamos (solo se usan los de la transición actual, en orden)
+MAX_CACHED_BACKGROUNDS = 8
+
+# Si las zonas a restaurar cubren más que esto de la pantalla, conviene repintarla entera
+MAX_DIRTY_FRACTION = 0.5
+
+WHITE = (255, 255, 255)
+GROUND_LINE_COLOR = (83, 83, 83)
+
+def background_step(distance):
+    """
+    Qué fondo toca a esta distancia: (fondo anterior, fondo actual, paso).
+    Fuera de las transiciones el fondo anterior es None y el paso es TRANSITION_STEPS.
+    """
+    stage = int(distance / CYCLE_POINTS) % 3
+    offset = distance % CYCLE_POINTS
+    current_key = BACKGROUND_KEYS[stage]
+    if offset < TRANSITION_POINTS and distance > TRANSITION_START:
+        alpha = int(255 * (offset / TRANSITION_POINTS))
+        return BACKGROUND_KEYS[(stage - 1) % 3], current_key, alpha * TRANSITION_STEPS // 256
+    return None, current_key, TRANSITION_STEPS
+
+def step_alpha(step):
+    """El alpha con el que se mezcla el fondo nuevo en un paso de la transición (0 a 255)."""
+    return min(255, step * 255 // (TRANSITION_STEPS - 1))
+
+class BackgroundCache:
+    """
+    Fondos ya armados: el fondo tal cual fuera de las transiciones, y durante una
+    transición una mezcla (anterior + nuevo con alpha) por cada paso, armada una sola vez.
+    Nunca le cambiamos el alpha al fondo compartido de los assets: mezclamos sobre copias.
+    """
+    def __init__(self, max_entries=MAX_CACHED_BACKGROUNDS):
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # (anterior, actual, paso) -> (fondos, superficie)
+
+    def get(self, backgrounds, distance, size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+        """
+        Devuelve (llave, superficie) del fondo a esta distancia, ya al tamaño `size`.
+        superficie = None -> fondo blanco.
+        """
+        key, surface = self._get(backgrounds, distance)
+        if surface is not None and surface.get_size() != size:
+            # Pantalla escalada: el fondo se escala una vez (por paso) en la caché de sprites
+            surface = sprite_cache.get(("background",) + key, surface, size)
+        return key, surface
+
+    def _get(self, backgrounds, distance):
+        key = background_step(distance)
+        prev_key, current_key, step = key
+        if prev_key is None:
+            return key, backgrounds.get(current_key)
+
+        entry = self._entries.get(key)
+        # Si recargaron los assets, el mismo paso se vuelve a armar con los fondos nuevos
+        if entry is not None and entry[0] is backgrounds:
+            self._entries.move_to_end(key)
+            return key, entry[1]
+
+        surface = self._blend(backgrounds.get(prev_key), backgrounds.get(current_key), step_alpha(step))
+        self._entries[key] = (backgrounds, surface)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return key, surface
+
+    @staticmethod
+    def _blend(prev_surf, current_surf, alpha):
+        # El mismo orden que antes: actual, encima el anterior opaco y encima el actual con alpha
+        if prev_surf is not None:
+            surface = prev_surf.copy()
+        elif current_surf is not None:
+            surface = current_surf.copy()
+        else:
+            surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            surface.fill(WHITE)
+            return surface
+        if current_surf is not None:
+            faded = current_surf.copy()
+            faded.set_alpha(alpha)
+            surface.blit(faded, (0, 0))
+        return surface
+
+    def clear(self):
+        self._entries.clear()
+
+# Compartida por todos los renderers (los fondos armados no dependen de la pantalla)
+background_cache = BackgroundCache()
+
+def merge_rects(rects):
+    """
+    Junta los rectángulos que se tocan en uno solo (los dinos suelen estar uno encima del otro).
+    Restaurar un poco de más no importa: después se vuelve a pintar todo lo que va encima.
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+class LayeredRenderer:
+    """
+    Dibuja un Engine por capas sobre la MISMA pantalla frame tras frame.
+    Recuerda qué zonas pintó con sprites en el frame anterior: si el fondo no cambió,
+    solo restaura esas zonas (y la franja del suelo) en vez de repintar los 800x400.
+    Si la pantalla es otra o cambió el fondo (paso de transición, assets nuevos), repinta todo.
+
+    Ojo: asume que nadie más pinta sobre esa pantalla entre un frame y otro
+    (si pasa, llama a invalidate()).
+
+    La pantalla puede ser más chica que 800x400 (ej: 400x200 para el navegador): todo se
+    dibuja directo a ese tamaño con sprites ya escalados, sin dibujar en grande y reducir.
+    scale=None lo calcula del ancho de la pantalla.
+    """
+    def __init__(self, scale=None):
+        self.scale = scale
+        self._screen = None
+        self._background_key = None
+        self._background = None
+        self._dirty = [] # Zonas pintadas encima del fondo en el frame anterior
+        self.full_redraws = 0
+        self.partial_redraws = 0
+
+    def invalidate(self):
+        """Obliga a repintar todo en el próximo frame."""
+        self._screen = None
+
+    def draw(self, engine, screen, assets=None, debug_mode=False):
+        """Dibuja todo en la pantalla de Pygame. Devuelve la lista de zonas que cambiaron."""
+        scale = self.scale if self.scale is not None else screen.get_width() / SCREEN_WIDTH
+        width = int(SCREEN_WIDTH * scale)
+        ground_y = GROUND_Y * scale
+
+        # 1. Fondo
+        if assets and "backgrounds" in assets:
+            size = (width, int(SCREEN_HEIGHT * scale))
+            background_key, background = background_cache.get(assets["backgrounds"], engine.distance_traveled, size)
+        else:
+            background_key, background = None, None
+
+        full = (screen is not self._screen or background_key != self._background_key or
+                background is not self._background)
+        if not full:
+            restore = merge_rects(self._dirty)
+            screen_area = screen.get_width() * screen.get_height()
+            full = sum(rect.width * rect.height for rect in restore) > MAX_DIRTY_FRACTION * screen_area
+        if full:
+            if background is not None:
+                screen.blit(background, (0, 0))
+            else:
+                screen.fill(WHITE)
+            changed = [screen.get_rect()]
+            self.full_redraws += 1
+        else:
+            # Solo borramos lo que pintamos encima del fondo el frame anterior
+            changed = restore
+            for rect in changed:
+                if background is not None:
+                    screen.blit(background, rect, rect)
+                else:
+                    screen.fill(WHITE, rect)
+            self.partial_redraws += 1
+        self._screen = screen
+        self._background_key = background_key
+        self._background = background
+
+        # 2. El suelo con scroll infinito (se mueve cada frame: lo repintamos entero)
+        dirty = []
+        if assets and "ground" in assets:
+            ground_img = assets["ground"]
+            relative = scale / asset_scale(assets)
+            if relative != 1:
+                ground_img = sprite_cache.get("ground", ground_img, (int(ground_img.get_width() * relative),
+                                                                     int(ground_img.get_height() * relative)))
+            g_width = ground_img.get_width()
+            band = pygame.Rect(0, ground_y, width, ground_img.get_height()).clip(screen.get_rect())
+            if not full:
+                if background is not None:
+                    screen.blit(background, band, band)
+                else:
+                    screen.fill(WHITE, band)
+            # Scroll offset based on distance
+            x = -(int(engine.distance_traveled * scale) % g_width)
+            while x < width:
+                screen.blit(ground_img, (x, ground_y))
+                x += g_width
+            dirty.append(band)
+        else:
+            # La línea no se mueve, pero los sprites del frame anterior pudieron taparla
+            pygame.draw.line(screen, GROUND_LINE_COLOR, (0, ground_y), (width, ground_y), max(1, round(2 * scale)))
+
+        # 3. Obstáculos y dinos
+        for obs in engine.obstacles:
+            dirty.append(obs.draw(screen, assets, scale))
+
+        # Global frame count for animation
+        frame_count = int(engine.distance_traveled) # Use distance as proxy for frames or pass actual frames
+
+        # --- RENDERIZADO FANTASMA (ver Engine.visible_dinos) ---
+        visible = engine.visible_dinos()
+        for dino in visible:
+            dirty.append(dino.draw(screen, assets, frame_count, scale))
+
+        # Si activamos el modo depuración, vemos las cajas de colisión (hitboxes)
+        if debug_mode:
+            for obs in engine.obstacles:
+                # Red for obstacles
+                dirty.append(pygame.draw.rect(screen, (255, 0, 0), scale_rect(obs.rect, scale), 2))
+
+                if isinstance(obs, CarObstacle):
+                    # Blue for Safe Roof
+                    # Draw a line or rect showing where the platform is
+                    roof_y = (obs.y + obs.roof_offset) * scale
+                    start_x = obs.rect.x * scale
+                    end_x = (obs.rect.x + obs.rect.width) * scale
+                    dirty.append(pygame.draw.line(screen, (0, 0, 255), (start_x, roof_y), (end_x, roof_y), 3))
+
+            for dino in visible:
+                # Green for dino
+                dirty.append(pygame.draw.rect(screen, (0, 255, 0), scale_rect(dino.rect, scale), 2))
+
+        self._dirty = [rect for rect in dirty if rect]
+        if full:
+            return changed
+        return merge_rects(changed + self._dirty)
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+# streaming.py - Transmisión del juego como video MJPEG (y grabación a archivo)
+# Cada frame que mostrábamos pasaba por game_placeholder.image(...): Streamlit volvía a
+# armar el elemento y lo mandaba por el websocket, y eso ponía el techo de FPS de la página.
+# Aquí el bucle solo deja el último lienzo (push) y un hilo lo pasa a JPEG a ritmo fijo.
+# Los JPEG se sirven por HTTP como un stream MJPEG (el navegador lo muestra con un <img>)
+# y/o se van escribiendo a un archivo de video.
+
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pygame
+from PIL import Image
+from config import *
+
+BOUNDARY = "frame" # Separador entre JPEGs del stream multipart
+
+class FrameEncoder:
+    """
+    Hilo que toma el último lienzo publicado con push() y lo pasa a JPEG `fps` veces por segundo.
+    Si llegan varios lienzos entre dos ticks solo se codifica el último (los demás se cuentan
+    en frames_dropped); si no llegó ninguno, no se codifica nada.
+    Los que quieran los JPEG esperan con wait_frame() o se registran con add_sink().
+    """
+    def __init__(self, fps=STREAM_FPS, quality=STREAM_QUALITY):
+        self.fps = fps
+        self.quality = quality
+        self.frames_encoded = 0
+        self.frames_dropped = 0
+        self.error = None # Si el hilo se cae, aquí queda la excepción
+        self._pending = None # (tamaño, bytes RGB) del último lienzo sin codificar
+        self._lock = threading.Lock()
+        self._frame_ready = threading.Condition()
+        self._latest = (0, None) # (número de frame, JPEG)
+        self._sinks = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="FrameEncoder", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        with self._frame_ready:
+            self._frame_ready.notify_all() # Despierta a los clientes que esperan un frame
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def stopped(self):
+        """True si lo detuvieron (stop) o si el hilo se cayó (ver self.error): ya no habrá frames nuevos."""
+        return self._stop.is_set()
+
+    def push(self, surface):
+        """Deja el lienzo para el próximo tick. Copia los pixeles: el lienzo se puede seguir usando."""
+        data = pygame.image.tobytes(surface, "RGB")
+        with self._lock:
+            if self._pending is not None:
+                self.frames_dropped += 1
+            self._pending = (surface.get_size(), data)
+
+    def add_sink(self, sink):
+        """sink(jpeg_bytes) se llama desde el hilo con cada frame nuevo."""
+        self._sinks.append(sink)
+
+    def remove_sink(self, sink):
+        if sink in self._sinks:
+            self._sinks.remove(sink)
+
+    @property
+    def latest(self):
+        """(número de frame, JPEG) del último frame codificado. JPEG = None si todavía no hay."""
+        return self._latest
+
+    def wait_frame(self, last_seq=0, timeout=1.0):
+        """Espera un frame más nuevo que last_seq. Devuelve (seq, JPEG), o el mismo si se acabó el tiempo."""
+        with self._frame_ready:
+            self._frame_ready.wait_for(lambda: self._latest[0] != last_seq or self._stop.is_set(), timeout)
+            return self._latest
+
+    # --- Dentro del hilo ---
+
+    def _run(self):
+        try:
+            next_tick = time.perf_counter()
+            while not self._stop.is_set():
+                with self._lock:
+                    pending, self._pending = self._pending, None
+                if pending is not None:
+                    self._publish(self.encode(*pending))
+
+                # Ritmo fijo (si nos atrasamos no intentamos recuperar los ticks perdidos)
+                next_tick = max(next_tick + 1.0 / self.fps, time.perf_counter())
+                self._stop.wait(max(0.0, next_tick - time.perf_counter()))
+        except Exception as e:
+            self.error = e
+            self._stop.set()
+
+    def encode(self, size, data):
+        buffer = io.BytesIO()
+        Image.frombytes("RGB", size, data).save(buffer, "JPEG", quality=self.quality)
+        return buffer.getvalue()
+
+    def _publish(self, jpeg):
+        with self._frame_ready:
+            self._latest = (self._latest[0] + 1, jpeg)
+            self.frames_encoded += 1
+            self._frame_ready.notify_all()
+        for sink in list(self._sinks):
+            sink(jpeg)
+
+class _MJPEGHandler(BaseHTTPRequestHandler):
+    """/stream.mjpg -> video MJPEG (multipart/x-mixed-replace), /frame.jpg -> el último frame."""
+
+    def do_GET(self):
+        encoder = self.server.encoder
+        path = self.path.split("?")[0]
+        if path in ("/", "/stream.mjpg"):
+            self._send_stream(encoder)
+        elif path == "/frame.jpg":
+            seq, jpeg = encoder.wait_frame(timeout=1.0)
+            if jpeg is None:
+                self.send_error(503, "Todavía no hay frames")
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(jpeg)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(jpeg)
+        else:
+            self.send_error(404)
+
+    def _send_stream(self, encoder):
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        seq = 0
+        try:
+            # Si el codificador se detiene, wait_frame ya no espera: salimos para no girar en vacío
+            while not self.server.stopping.is_set() and not encoder.stopped:
+                new_seq, jpeg = encoder.wait_frame(seq, timeout=1.0)
+                if jpeg is None or new_seq == seq:
+                    continue
+                seq = new_seq
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                 f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii"))
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass # El navegador cerró la pestaña
+
+    def log_message(self, format, *args):
+        pass # Sin un renglón en la consola por cada petición
+
+class MJPEGServer:
+    """
+    Servidor HTTP local que transmite los frames de un FrameEncoder.
+    port=0 deja que el sistema elija un puerto libre (ver self.port).
+    """
+    def __init__(self, encoder, host=STREAM_HOST, port=STREAM_PORT):
+        self.encoder = encoder
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Abre el puerto y empieza a atender en un hilo. Lanza OSError si el puerto está ocupado."""
+        if self._server is not None:
+            return
+        server = ThreadingHTTPServer((self.host, self.port), _MJPEGHandler)
+        server.daemon_threads = True
+        server.encoder = self.encoder
+        server.stopping = threading.Event()
+        self._server = server
+        self.port = server.server_address[1]
+        self._thread = threading.Thread(target=server.serve_forever, name="MJPEGServer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.stopping.set() # Los clientes del stream salen en el próximo frame
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(2.0)
+        self._server = None
+        self._thread = None
+
+    def is_running(self):
+        return self._server is not None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/stream.mjpg"
+
+class VideoRecorder:
+    """
+    Graba los frames de un FrameEncoder a un archivo MJPEG (JPEGs uno tras otro, sin contenedor).
+    Se abre con VLC o ffplay, y se pasa a mp4 con:
+        ffmpeg -framerate 30 -f mjpeg -i partida.mjpeg partida.mp4
+    """
+    def __init__(self, encoder, path):
+        self.encoder = encoder
+        self.path = path
+        self.frames_written = 0
+        self._file = open(path, "wb")
+        self._lock = threading.Lock()
+        encoder.add_sink(self._write)
+
+    def _write(self, jpeg):
+        with self._lock:
+            if self._file is not None:
+                self._file.write(jpeg)
+                self.frames_written += 1
+
+    def close(self):
+        self.encoder.remove_sink(self._write)
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
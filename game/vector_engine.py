@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+# vector_engine.py - Motor "vectorizado" para poblaciones grandes.
+# En lugar de recorrer los dinos uno por uno, guardamos su estado en arreglos de NumPy
+# y aplicamos gravedad, aterrizajes y colisiones a toda la población de golpe.
+
+import numpy as np
+from config import *
+from .engine import Engine, MAX_VISIBLE_DINOS, GHOST_DINOS, DINO_PADDING_X, DINO_PADDING_Y, ROOF_TOLERANCE
+
+JUMP_VELOCITY = -13.5 # Impulso del salto (igual que Dino.jump)
+AIR_CROUCH_BOOST = 2.0 # "Caída rápida" al agacharse en el aire (igual que Dino.crouch)
+
+class VectorEngine(Engine):
+    """
+    Igual que Engine, pero el estado de los dinos vive en arreglos (estructura de arreglos):
+    y, vel_y, height, is_jumping, is_crouching, ground_y, dead y fitness.
+    Las reglas son EXACTAMENTE las de Dino y CarObstacle, solo que aplicadas a todos a la vez.
+
+    self.dinos se sigue llenando con objetos Dino, pero solo para dibujar:
+    visible_dinos() les copia el estado de los arreglos (sync_dinos) a los que se van a dibujar.
+    """
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self._allocate(0)
+
+    def _allocate(self, n):
+        """Crea los arreglos de estado para n dinos, todos parados en el suelo."""
+        self.y = np.full(n, float(GROUND_Y - PLAYER_HEIGHT))
+        self.vel_y = np.zeros(n)
+        self.height = np.full(n, float(PLAYER_HEIGHT))
+        self.is_jumping = np.zeros(n, dtype=bool)
+        self.is_crouching = np.zeros(n, dtype=bool)
+        self.ground_y = np.full(n, float(GROUND_Y))
+        self.dead = np.zeros(n, dtype=bool)
+        self.fitness = np.zeros(n)
+
+    def reset(self, num_dinos=1, seed=None, course=None):
+        super().reset(num_dinos, seed, course)
+        self._allocate(num_dinos)
+
+    def _update_dinos(self):
+        alive = np.flatnonzero(~self.dead)
+        if alive.size == 0:
+            return 0
+
+        y = self.y[alive]
+        vel_y = self.vel_y[alive]
+        height = self.height[alive]
+        is_jumping = self.is_jumping[alive]
+        ground_y = self.ground_y[alive]
+
+        # 1. Techo de los coches: la columna del jugador se calcula una sola vez por frame
+        # (Engine.player_column) y aquí cada techo se prueba contra toda la población.
+        # Si varios coches califican, gana el último (igual que en el bucle original).
+        roofs, hazards = self.player_column()
+        target_ground = np.full(alive.size, float(GROUND_Y))
+        for roof_y in roofs:
+            target_ground[(y + height) <= (roof_y + ROOF_TOLERANCE)] = roof_y
+
+        # 2. Gravedad (Dino.update)
+        vel_y = vel_y + GRAVITY
+        y = y + vel_y
+
+        # Aterrizamos solo si veníamos cayendo
+        hit_ground = ((y + height) >= target_ground) & (vel_y > 0)
+        y = np.where(hit_ground, target_ground - height, y)
+        vel_y = np.where(hit_ground, 0.0, vel_y)
+        is_jumping = np.where(hit_ground, False, is_jumping)
+        ground_y = np.where(hit_ground, target_ground, ground_y)
+
+        # Si se sale de una plataforma, vuelve a estar en el aire
+        is_jumping |= ~hit_ground & ((y + height) < target_ground)
+
+        self.y[alive] = y
+        self.vel_y[alive] = vel_y
+        self.is_jumping[alive] = is_jumping
+        self.ground_y[alive] = ground_y
+
+        # 3. Colisiones: en X ya sabemos que los peligros cruzan al dino, solo falta la altura.
+        # Cada peligro es un intervalo (arriba, abajo) y se compara con todos los dinos a la vez.
+        # El hitbox del dino es pygame.Rect(x + 10, y + 12, w - 20, h - 24);
+        # pygame trunca hacia cero al construir el Rect, por eso usamos np.trunc.
+        if hazards:
+            hit_top = np.trunc(y + DINO_PADDING_Y)
+            hit_bottom = hit_top + (height - 2 * DINO_PADDING_Y)
+
+            intervals = np.array(hazards, dtype=float)
+            collided = ((hit_top[:, None] < intervals[None, :, 1]) &
+                        (intervals[None, :, 0] < hit_bottom[:, None])).any(axis=1)
+            dead_now = alive[collided]
+            self.dead[dead_now] = True
+            self.fitness[dead_now] = self.distance_traveled
+
+        return int(alive.size - np.count_nonzero(self.dead[alive]))
+
+    def apply_actions(self, indices, jump_mask, crouch_mask):
+        """Versión vectorizada de Dino.jump / Dino.crouch / Dino.stop_crouch."""
+        indices = np.asarray(indices, dtype=int)
+        jump_mask = np.asarray(jump_mask, dtype=bool)
+        crouch_mask = np.asarray(crouch_mask, dtype=bool)
+
+        # Saltar: solo si no está ya en el aire
+        jumpers = indices[jump_mask & ~self.is_jumping[indices]]
+        self.is_jumping[jumpers] = True
+        self.vel_y[jumpers] = JUMP_VELOCITY
+        # Si estaba agachado, recupera su altura (ya está en el aire, no se mueve Y)
+        uncrouched = jumpers[self.is_crouching[jumpers]]
+        self.is_crouching[uncrouched] = False
+        self.height[uncrouched] = PLAYER_HEIGHT
+
+        # Agacharse
+        crouchers = indices[crouch_mask]
+        self.is_crouching[crouchers] = True
+        self.height[crouchers] = CROUCH_HEIGHT
+        grounded = crouchers[~self.is_jumping[crouchers]]
+        self.y[grounded] = self.ground_y[grounded] - CROUCH_HEIGHT
+        airborne = crouchers[self.is_jumping[crouchers]]
+        self.vel_y[airborne] += AIR_CROUCH_BOOST
+
+        # Dejar de agacharse
+        standers = indices[~crouch_mask]
+        self.is_crouching[standers] = False
+        self.height[standers] = PLAYER_HEIGHT
+        grounded = standers[~self.is_jumping[standers]]
+        self.y[grounded] = self.ground_y[grounded] - PLAYER_HEIGHT
+
+    def alive_indices(self):
+        return np.flatnonzero(~self.dead)
+
+    def idle_dinos(self, indices, crouch_mask):
+        indices = np.asarray(indices, dtype=int)
+        idle = (~self.is_jumping[indices] & (self.vel_y[indices] == 0) &
+                (self.ground_y[indices] == GROUND_Y) &
+                (self.is_crouching[indices] == np.asarray(crouch_mask, dtype=bool)) &
+                (self.y[indices] == GROUND_Y - self.height[indices]))
+        return bool(idle.all())
+
+    def count_alive(self):
+        return int(np.count_nonzero(~self.dead))
+
+    def get_fitnesses(self):
+        return np.where(self.dead, self.fitness, self.distance_traveled).tolist()
+
+    def get_player_ys(self, indices):
+        return self.y[indices]
+
+    def sync_dinos(self, indices=None):
+        """Copia el estado de los arreglos a los objetos Dino (solo para dibujarlos)."""
+        if indices is None:
+            indices = range(len(self.dinos))
+        for i in indices:
+            dino = self.dinos[i]
+            dino.dead = bool(self.dead[i])
+            if dino.dead:
+                dino.fitness = float(self.fitness[i])
+                continue
+            dino.y = float(self.y[i])
+            dino.vel_y = float(self.vel_y[i])
+            dino.height = int(self.height[i])
+            dino.is_jumping = bool(self.is_jumping[i])
+            dino.is_crouching = bool(self.is_crouching[i])
+            dino.ground_y = float(self.ground_y[i])
+            dino.rect.update(dino.x + DINO_PADDING_X, dino.y + DINO_PADDING_Y,
+                             dino.width - 2 * DINO_PADDING_X, dino.height - 2 * DINO_PADDING_Y)
+
+    def visible_dinos(self):
+        # Solo sincronizamos los que se van a dibujar
+        alive = np.flatnonzero(~self.dead)
+        if len(self.dinos) > MAX_VISIBLE_DINOS:
+            alive = alive[:GHOST_DINOS]
+        self.sync_dinos(alive)
+        return [self.dinos[i] for i in alive]
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+# benchmark.py - Mide qué tan rápido corren las partes calientes del juego y de la IA
+# Uso:
+#   python tools/benchmark.py                               -> imprime los resultados en JSON
+#   python tools/benchmark.py --save-baseline base.json     -> guarda los resultados como referencia
+#   python tools/benchmark.py --baseline base.json          -> compara contra la referencia
+# Si algo salió más lento que la referencia (más allá de --tolerance), termina con código 1,
+# así se puede usar antes de desplegar para atrapar regresiones.
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+# No necesitamos ventana ni el mensaje de bienvenida de Pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Para poder importar los módulos del juego corriendo desde la raíz o desde tools/
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pygame
+from config import *
+from ai.brain import Genome, NeuralNetwork, PopulationBrain
+from ai.genetic_algo import GeneticAlgorithm
+from game.assets import AssetManager
+from game.course import generate_course
+from game.engine import Engine
+from game.renderer import LayeredRenderer
+from game.vector_engine import VectorEngine
+
+ASSETS_DIR = os.path.join(ROOT, "assets")
+SEED = 1234 # Misma pista y mismos cerebros en cada corrida
+
+def best_time(func, repeat):
+    """Corre func() varias veces y se queda con el tiempo más rápido (el menos ruidoso)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def result(value, unit, higher_is_better):
+    return {"value": round(value, 3), "unit": unit, "higher_is_better": higher_is_better}
+
+# --- Benchmarks -------------------------------------------------------------
+
+def bench_engine_update(engine_cls, population, frames, repeat):
+    """Frames por segundo de engine.update() con N agentes controlados por cerebros al azar."""
+    rng = np.random.default_rng(SEED)
+    brain = PopulationBrain([Genome(rng=rng) for _ in range(population)])
+    course = generate_course(SEED)
+    engine = engine_cls()
+
+    def run():
+        # Solo medimos update(); la IA y las entradas no cuentan
+        engine.reset(num_dinos=population, course=course)
+        elapsed = 0.0
+        for _ in range(frames):
+            if engine.game_over:
+                engine.reset(num_dinos=population, course=course)
+            alive = engine.alive_indices()
+            inputs = engine.get_observations(alive)
+            jump, crouch = brain.decide(inputs, alive)
+            engine.apply_actions(alive, jump, crouch)
+            start = time.perf_counter()
+            engine.update()
+            elapsed += time.perf_counter() - start
+        return elapsed
+
+    best = min(run() for _ in range(repeat))
+    return result(frames / best, "fps", True)
+
+def bench_nn_activate(calls, repeat):
+    """Cuántas veces por segundo piensa una sola red (NeuralNetwork.activate)."""
+    rng = np.random.default_rng(SEED)
+    net = NeuralNetwork(Genome(rng=rng))
+    inputs = rng.random(INPUT_SIZE)
+
+    def run():
+        for _ in range(calls):
+            net.activate(inputs)
+    return result(calls / best_time(run, repeat), "calls/s", True)
+
+def bench_population_decide(population, calls, repeat):
+    """Agentes por segundo de PopulationBrain.decide (toda la población en una pasada)."""
+    rng = np.random.default_rng(SEED)
+    brain = PopulationBrain([Genome(rng=rng) for _ in range(population)])
+    inputs = rng.random((population, INPUT_SIZE))
+    indices = np.arange(population)
+
+    def run():
+        for _ in range(calls):
+            brain.decide(inputs, indices)
+    return result(population * calls / best_time(run, repeat), "agents/s", True)
+
+def bench_next_generation(population, repeat):
+    """Milisegundos que tarda GeneticAlgorithm.next_generation en armar la siguiente generación."""
+    ga = GeneticAlgorithm(seed=SEED)
+    ga.set_params(population, ga.mutation_rate, ga.selection_ratio, ga.elitism_count)
+    fitnesses = np.random.default_rng(SEED).random(population) * 1000
+    return result(best_time(lambda: ga.next_generation(fitnesses), repeat) * 1000, "ms", False)
+
+def bench_engine_draw(assets, frames, repeat, layered=False, size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+    """
+    Milisegundos por frame de Engine.draw (10 agentes, a media pista para que haya obstáculos).
+    El juego avanza entre frames; solo medimos el dibujo.
+    layered=True reusa un LayeredRenderer (como app.py), así que solo se repinta lo que
+    cambió; sin él se repinta la pantalla entera en cada frame.
+    size: tamaño del lienzo (app.py dibuja directo a STREAM_WIDTH x STREAM_HEIGHT).
+    """
+    screen = pygame.Surface(size)
+    engine = Engine(seed=SEED)
+    engine.reset(num_dinos=10, course=generate_course(SEED))
+    for _ in range(150):
+        engine.update()
+    world = engine.save_world()
+    renderer = LayeredRenderer() if layered else None
+
+    def run():
+        engine.restore_world(world)
+        elapsed = 0.0
+        for _ in range(frames):
+            engine.skip_frames(1)
+            start = time.perf_counter()
+            engine.draw(screen, assets, renderer=renderer)
+            elapsed += time.perf_counter() - start
+        return elapsed
+    # El primer dibujo llena los cachés de sprites y fondos; no lo contamos
+    run()
+    return result(min(run() for _ in range(repeat)) / frames * 1000, "ms/frame", False)
+
+def bench_asset_load(repeat):
+    """Segundos que tarda en cargar todos los dibujos (lo que espera la app al arrancar)."""
+    assets = {}
+
+    def run():
+        assets.update(AssetManager.load_all(ASSETS_DIR))
+    return result(best_time(run, repeat), "s", False), assets
+
+def run_benchmarks(quick=False):
+    """Corre todos los benchmarks y devuelve {nombre: resultado}."""
+    scale = 0.2 if quick else 1.0
+    repeat = 3 if quick else 5
+    frames = max(20, int(300 * scale))
+    results = {}
+
+    for population in (10, 100, 1000):
+        results[f"engine_update_{population}"] = bench_engine_update(Engine, population, frames, repeat)
+        results[f"vector_engine_update_{population}"] = bench_engine_update(VectorEngine, population, frames, repeat)
+
+    results["nn_activate"] = bench_nn_activate(max(1000, int(20000 * scale)), repeat)
+    results["population_decide_1000"] = bench_population_decide(1000, max(20, int(200 * scale)), repeat)
+
+    for population in (100, 1000, 10000):
+        results[f"ga_next_generation_{population}"] = bench_next_generation(population, repeat)
+
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    draw_frames = max(10, int(100 * scale))
+    results["engine_draw_no_assets"] = bench_engine_draw(None, draw_frames, repeat)
+    results["asset_load"], assets = bench_asset_load(1 if quick else 2)
+    results["engine_draw_assets"] = bench_engine_draw(assets, draw_frames, repeat)
+    results["engine_draw_layered"] = bench_engine_draw(assets, draw_frames, repeat, layered=True)
+    results["engine_draw_stream"] = bench_engine_draw(assets, draw_frames, repeat, layered=True,
+                                                      size=(STREAM_WIDTH, STREAM_HEIGHT))
+    return results
+
+# --- Comparación contra la referencia ---------------------------------------
+
+def compare(results, baseline, tolerance):
+    """
+    Compara contra una corrida guardada. Devuelve la lista de regresiones:
+    (nombre, antes, ahora, cambio) para todo lo que empeoró más que `tolerance` (0.2 = 20%).
+    """
+    regressions = []
+    print(f"{'benchmark':32s} {'referencia':>14s} {'actual':>14s} {'cambio':>9s}")
+    for name, current in results.items():
+        if name not in baseline:
+            print(f"{name:32s} {'-':>14s} {current['value']:>14.3f}   (nuevo)")
+            continue
+        before = baseline[name]["value"]
+        now = current["value"]
+        if before == 0:
+            continue
+        # Positivo = mejor, negativo = peor (sin importar si el número debe subir o bajar)
+        change = (now - before) / before if current["higher_is_better"] else (before - now) / before
+        flag = "  <-- REGRESIÓN" if change < -tolerance else ""
+        print(f"{name:32s} {before:>14.3f} {now:>14.3f} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append((name, before, now, change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del motor, la red y el algoritmo genético.")
+    parser.add_argument("--output", default=None, help="Guardar los resultados en este archivo JSON")
+    parser.add_argument("--baseline", default=None, help="Resultados de referencia (JSON) para comparar")
+    parser.add_argument("--save-baseline", default=None, help="Guardar estos resultados como la nueva referencia")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Cuánto puede empeorar algo antes de contarlo como regresión (0.2 = 20%%)")
+    parser.add_argument("--quick", action="store_true", help="Menos iteraciones (más rápido, más ruidoso)")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": run_benchmarks(quick=args.quick),
+    }
+    text = json.dumps(report, indent=2)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+    if not args.output and not args.baseline:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(report["results"], baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regresión(es) de rendimiento.")
+            sys.exit(1)
+        print("\nSin regresiones.")
+
+if __name__ == "__main__":
+    main()
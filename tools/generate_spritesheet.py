@@ -1,8 +1,14 @@
 import os
+import sys
 import glob
 import json
+import time
+import argparse
 from PIL import Image
 
+# Para poder importar los módulos del juego corriendo desde la raíz o desde tools/
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 def generate_spritesheet():
     # Configuration
     INPUT_DIR = os.path.join("assets", "sprites_human")
@@ -85,5 +91,166 @@ def generate_spritesheet():
         json.dump(json_output, f, indent=4)
     print(f"Saved {OUTPUT_JSON}")
 
+# Ancho del atlas y espacio entre sprites (para que ninguno "sangre" sobre el vecino)
+ATLAS_WIDTH = 1024
+ATLAS_PADDING = 1
+
+def init_pygame():
+    """Pygame necesita una "pantalla" para convert()/convert_alpha(), aunque sea fantasma."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import pygame
+    pygame.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+    return pygame
+
+def game_sprite_sizes():
+    """
+    Tamaño con el que el juego dibuja cada sprite: {clave del asset: (ancho, alto)}.
+    Los obstáculos se miden creando uno de cada tipo (y variante); el jugador usa PLAYER_WIDTH x PLAYER_HEIGHT.
+    """
+    from config import PLAYER_WIDTH, PLAYER_HEIGHT
+    from game.obstacle import OBSTACLE_KINDS, create_obstacle
+
+    sizes = {}
+    for kind, cls in enumerate(OBSTACLE_KINDS):
+        for variant in range(cls.VARIANTS):
+            obs = create_obstacle(kind, 0, variant=variant)
+            sizes[obs.sprite_key()] = (int(obs.width), int(obs.height))
+    for key in ("dino", "dino_jump", "dino_run", "dino_run1", "dino_run2"):
+        sizes[key] = (PLAYER_WIDTH, PLAYER_HEIGHT)
+    return sizes
+
+def pack_shelves(sizes, width=ATLAS_WIDTH, padding=ATLAS_PADDING):
+    """
+    Empaca rectángulos en filas ("estantes"): los ordenamos de más alto a más bajo y
+    los vamos poniendo de izquierda a derecha; cuando no caben, abrimos otra fila.
+    sizes = lista de (ancho, alto). Devuelve (posiciones (x, y) en el mismo orden, alto total).
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf_h = 0
+    for i in order:
+        w, h = sizes[i]
+        if x + w > width and x > 0:
+            y += shelf_h + padding
+            x = shelf_h = 0
+        positions[i] = (x, y)
+        x += w + padding
+        shelf_h = max(shelf_h, h)
+    return positions, y + shelf_h
+
+def build_sprite_atlas(assets_dir="assets", scale=1.0):
+    """
+    Junta TODOS los sprites de obstáculos y del jugador, ya escalados al tamaño con el
+    que se dibujan en el juego, en un solo PNG + un JSON en el formato de SpriteSheet
+    (assets/.cache/atlas.png y atlas.json). Los fondos no van: tienen su propia caché.
+    scale: escala de la pantalla donde se dibujan (la de app.py es 0.5); el atlas de
+    cada escala va en su propio archivo (ver atlas_files).
+    """
+    pygame = init_pygame()
+    from game.assets import AssetManager, ASSET_CACHE_DIR, CACHE_VERSION, NATIVE_SIZE_ASSETS, atlas_files, scaled_size
+    from game.animation import Animation
+
+    sprite_sizes = game_sprite_sizes()
+    sources = AssetManager.asset_sources(assets_dir)
+    entries, names, surfaces = {}, [], []
+    for key, paths in sources.items():
+        if key == "backgrounds":
+            continue
+        signature = AssetManager.source_signature(assets_dir, paths)
+        if signature is None:
+            continue
+        value = AssetManager.load_original(key, assets_dir)
+        if not value:
+            continue
+
+        entry = {"sources": signature}
+        if isinstance(value, pygame.Surface):
+            entry["kind"] = "image"
+            frames = [value]
+        elif isinstance(value, Animation):
+            entry.update(kind="animation", fps=value.fps, loop=value.loop)
+            frames = value.frames
+        else:
+            entry["kind"] = "frames"
+            frames = value
+        # El mismo escalado que haría el juego al dibujarlo (pixel por pixel igual).
+        # El humano, el coachwalk y el suelo ya vienen al tamaño del juego: solo se escalan por `scale`.
+        size = sprite_sizes.get(key)
+        if size is not None:
+            size = (int(size[0] * scale), int(size[1] * scale))
+        for index, frame in enumerate(frames):
+            target = size if size is not None else scaled_size(frame, scale) if key in NATIVE_SIZE_ASSETS else None
+            if target is not None and frame.get_size() != target:
+                frame = pygame.transform.scale(frame, target)
+            names.append((key, index))
+            surfaces.append(frame)
+        entries[key] = entry
+
+    positions, height = pack_shelves([surf.get_size() for surf in surfaces])
+    atlas = pygame.Surface((ATLAS_WIDTH, max(1, height)), pygame.SRCALPHA)
+    frames_data = []
+    for (key, index), surf, (x, y) in zip(names, surfaces, positions):
+        atlas.blit(surf, (x, y))
+        frames_data.append({
+            "name": f"{key}_{index}",
+            "key": key,
+            "index": index,
+            "x": x,
+            "y": y,
+            "w": surf.get_width(),
+            "h": surf.get_height()
+        })
+
+    cache_dir = os.path.join(assets_dir, ASSET_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    image_name, index_name = atlas_files(scale)
+    pygame.image.save(atlas, os.path.join(cache_dir, image_name))
+    json_output = {
+        "image": image_name,
+        "version": CACHE_VERSION,
+        "scale": scale,
+        "assets": entries,
+        "frames": frames_data
+    }
+    with open(os.path.join(cache_dir, index_name), 'w') as f:
+        json.dump(json_output, f, indent=2)
+    print(f"Atlas x{scale:g} de {len(frames_data)} sprites ({ATLAS_WIDTH}x{height}) en {os.path.join(cache_dir, image_name)}")
+
+def build_asset_cache(assets_dir="assets"):
+    """
+    Build step: procesa todos los dibujos (reducir a 500px, desenfocar fondos, escalar
+    el humano y el coachwalk) y los guarda ya listos en assets/.cache con un manifest.
+    Así el juego arranca cargando PNGs chiquitos en vez de los originales de 2 MB.
+    Al final arma también los atlas de sprites (build_sprite_atlas), uno por cada escala de ATLAS_SCALES.
+    """
+    init_pygame()
+    from game.assets import AssetManager, ASSET_CACHE_DIR, ATLAS_SCALES
+
+    start = time.perf_counter()
+    manifest = AssetManager.build_cache(assets_dir)
+    print(f"Caché de {len(manifest['assets'])} assets en {os.path.join(assets_dir, ASSET_CACHE_DIR)} "
+          f"({time.perf_counter() - start:.1f}s)")
+    for scale in ATLAS_SCALES:
+        build_sprite_atlas(assets_dir, scale)
+
+    # Cuánto tarda ahora el arranque en frío
+    start = time.perf_counter()
+    AssetManager.load_all(assets_dir)
+    print(f"Carga desde la caché: {(time.perf_counter() - start) * 1000:.0f} ms")
+
 if __name__ == "__main__":
-    generate_spritesheet()
+    parser = argparse.ArgumentParser(description="Genera la hoja de sprites del humano, la caché de assets y el atlas de sprites.")
+    parser.add_argument("--no-cache", action="store_true", help="Solo la hoja de sprites (sin la caché ni el atlas)")
+    parser.add_argument("--cache-only", action="store_true", help="Solo la caché de assets y el atlas")
+    parser.add_argument("--assets", default="assets", help="Carpeta de assets (por defecto: assets)")
+    args = parser.parse_args()
+
+    if not args.cache_only:
+        generate_spritesheet()
+    if not args.no_cache:
+        build_asset_cache(args.assets)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# train.py - Entrenamiento desde la terminal (sin Streamlit)
+# Uso: python train.py --generations 500 --population 1000
+# Pensado para dejar al algoritmo genético corriendo toda la noche en un servidor.
+
+import argparse
+import os
+
+# No necesitamos ventana ni el mensaje de bienvenida de Pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from config import *
+from ai.trainer import HeadlessTrainer
+from game.course import load_course
+from ai.genetic_algo import GENOMES_DIR
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrena a los corredores sin interfaz gráfica.")
+    parser.add_argument("--generations", type=int, default=100, help="Cuántas generaciones entrenar")
+    parser.add_argument("--population", type=int, default=POPULATION_SIZE, help="Tamaño de la población")
+    parser.add_argument("--strategy", choices=["HOF", "GEN", "DYNAMIC"], default="HOF",
+                        help="Estrategia de evolución (igual que en la app)")
+    parser.add_argument("--output", default=GENOMES_DIR, help="Carpeta para historial y campeones")
+    parser.add_argument("--save-every", type=int, default=10,
+                        help="Guardar historial/campeón cada N generaciones (0 = solo al final)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos para evaluar la población en paralelo (ej: os.cpu_count())")
+    parser.add_argument("--no-vector", action="store_true",
+                        help="Usar el motor normal (un objeto por dino) en vez del vectorizado")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Semilla para que el entrenamiento sea reproducible")
+    parser.add_argument("--course", default=None,
+                        help="Pista pregrabada (.npy de game/course.py) para usar en todas las generaciones")
+    parser.add_argument("--load", default=None, help="Campeón para sembrar la población inicial (nombre en la base de campeones o archivo .pkl)")
+    parser.add_argument("--max-frames", type=int, default=None,
+                        help="Cortar cada generación después de N frames (los vivos se quedan con su distancia)")
+    parser.add_argument("--fitness-cap", type=float, default=None,
+                        help="Cortar cada generación cuando la distancia llegue a este valor")
+    parser.add_argument("--no-fast-forward", action="store_true",
+                        help="Simular frame por frame los tramos sin obstáculos (más lento, mismo resultado)")
+    parser.add_argument("--checkpoint-every", type=int, default=0,
+                        help="Guardar un checkpoint de toda la población cada N generaciones (0 = nunca)")
+    parser.add_argument("--resume", nargs="?", const="latest", default=None,
+                        help="Seguir desde un checkpoint (el último de <output>/checkpoints, o la ruta "
+                             "de un .npz). Con --generations cuenta el total: no se repiten generaciones")
+    parser.add_argument("--quiet", action="store_true", help="No imprimir el progreso de cada generación")
+    args = parser.parse_args()
+
+    course = load_course(args.course) if args.course else None
+    trainer = HeadlessTrainer(population_size=args.population, strategy=args.strategy,
+                              vectorized=not args.no_vector, output_dir=args.output,
+                              save_every=args.save_every, verbose=not args.quiet,
+                              workers=args.workers, seed=args.seed, course=course,
+                              max_frames=args.max_frames, fitness_cap=args.fitness_cap,
+                              fast_forward=not args.no_fast_forward,
+                              checkpoint_every=args.checkpoint_every)
+    generations = args.generations
+    if args.resume:
+        if not trainer.resume(None if args.resume == "latest" else args.resume):
+            print("No hay checkpoints para reanudar; empezamos de cero.")
+        # Volver a correr el mismo comando después de un corte termina en la misma generación
+        generations = max(0, args.generations - (trainer.ga.generation - 1))
+    elif args.load:
+        success, msg = trainer.ga.load_best_genome(args.load, directory=args.output)
+        print(msg)
+        if not success:
+            return
+
+    trainer.train(generations)
+
+if __name__ == "__main__":
+    main()